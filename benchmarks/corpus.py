@@ -0,0 +1,109 @@
+"""
+Générateur de corpus de messages du canal source (format réel)
+Exemple: #N620. 1(4♠️7♦️J♣️) - ✅4(9♣️5♠️) #T5
+Variantes produites: messages en cours (⏰), messages 🔰, messages finalisés (✅)
+et éditions (une version ⏰ suivie de la version finale du même numéro).
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SUITS = ["♠️", "♥️", "♦️", "♣️"]
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+RANK_POINTS = {"A": 1, "10": 0, "J": 0, "Q": 0, "K": 0}
+
+# Proportions observées sur le canal: la plupart des messages sont finalisés
+PENDING_RATIO = 0.15   # ⏰ (partie en cours)
+SPECIAL_RATIO = 0.05   # 🔰
+
+
+def _points(cards: List[Tuple[str, str]]) -> int:
+    return sum(RANK_POINTS.get(rank, int(rank) if rank.isdigit() else 0) for rank, _ in cards) % 10
+
+
+def _hand(rng: random.Random, size: int, distinct_suits: bool = False) -> List[Tuple[str, str]]:
+    suits = rng.sample(SUITS, size) if distinct_suits else [rng.choice(SUITS) for _ in range(size)]
+    return [(rng.choice(RANKS), suit) for suit in suits]
+
+
+def _format_hand(cards: List[Tuple[str, str]]) -> str:
+    return "".join(f"{rank}{suit}" for rank, suit in cards)
+
+
+def game_message(numero: int, rng: random.Random, state: str = "final",
+                 sizes: Optional[Tuple[int, int]] = None) -> Dict[str, object]:
+    """
+    Message d'une partie.
+    state: 'final' (✅ sur le gagnant), 'pending' (⏰) ou 'special' (🔰)
+    Retourne {"numero", "text", "state", "winner"}.
+    """
+    if sizes is None:
+        sizes = rng.choice([(2, 2), (3, 2), (2, 3), (3, 3), (3, 2), (2, 2)])
+    joueur = _hand(rng, sizes[0], distinct_suits=sizes[0] == 3 and rng.random() < 0.6)
+    banquier = _hand(rng, sizes[1], distinct_suits=sizes[1] == 3 and rng.random() < 0.6)
+    joueur_points, banquier_points = _points(joueur), _points(banquier)
+
+    winner = None
+    if joueur_points > banquier_points:
+        winner = "Joueur"
+    elif banquier_points > joueur_points:
+        winner = "Banquier"
+
+    joueur_mark = "✅" if state == "final" and winner == "Joueur" else ""
+    banquier_mark = "✅" if state == "final" and winner == "Banquier" else ""
+    prefix = {"pending": "⏰", "special": "🔰"}.get(state, "")
+    text = (f"{prefix}#N{numero}. {joueur_mark}{joueur_points}({_format_hand(joueur)}) - "
+            f"{banquier_mark}{banquier_points}({_format_hand(banquier)}) #T{joueur_points + banquier_points}")
+    if state == "final" and winner is None:
+        # Égalité: le canal marque tout de même le message comme finalisé
+        text += " ✅"
+    return {"numero": numero, "text": text, "state": state, "winner": winner}
+
+
+def generate_messages(count: int, start: int = 1, seed: int = 42) -> List[Dict[str, object]]:
+    """
+    Flux de messages tel que reçu par le bot, éditions comprises:
+    une partie sur PENDING_RATIO arrive d'abord en ⏰ puis est éditée en version finale.
+    """
+    rng = random.Random(seed)
+    messages = []
+    for numero in range(start, start + count):
+        roll = rng.random()
+        if roll < SPECIAL_RATIO:
+            messages.append({**game_message(numero, rng, "special"), "edit": False})
+            continue
+        if roll < SPECIAL_RATIO + PENDING_RATIO:
+            messages.append({**game_message(numero, rng, "pending"), "edit": False})
+            messages.append({**game_message(numero, rng, "final"), "edit": True})
+            continue
+        messages.append({**game_message(numero, rng, "final"), "edit": False})
+    return messages
+
+
+def generate_results(count: int, start: int = 1, seed: int = 42,
+                     day: Optional[datetime] = None) -> List[Dict[str, object]]:
+    """Résultats déjà enregistrés (format de data/game_results.yaml), un numéro sur deux"""
+    rng = random.Random(seed)
+    day = day or datetime(2025, 1, 1, 1, 0, 0)
+    results = []
+    for index in range(count):
+        numero = start + index * 2  # Les numéros consécutifs ne sont jamais enregistrés
+        moment = day + timedelta(seconds=index * 60)
+        winner = rng.choice(["Joueur", "Banquier"])
+        cards = _format_hand(_hand(rng, 3, distinct_suits=True))
+        results.append({
+            "numero": numero,
+            "date": moment.strftime("%Y-%m-%d"),
+            "heure": moment.strftime("%H:%M:%S"),
+            "cartes_groupe1": cards,
+            "gagnant": winner,
+            "message_complet": f"#N{numero}. ✅({cards})"
+        })
+    return results
+
+
+def iter_verification_messages(numbers: List[int], seed: int = 7) -> Iterator[Dict[str, object]]:
+    """Messages finalisés 2+2 cartes (seuls valides pour la vérification du prédicteur)"""
+    rng = random.Random(seed)
+    for numero in numbers:
+        yield game_message(numero, rng, "final", sizes=(2, 2))
@@ -0,0 +1,163 @@
+"""
+Client Telethon simulé pour rejouer des mises à jour sans réseau
+Reproduit les méthodes utilisées par les gestionnaires de main.py (get_me, send_message,
+edit_message, send_file, upload_file) et conserve la liste des appels effectués.
+Peut simuler la latence réseau et les limites de débit de Telegram (FloodWait).
+"""
+import asyncio
+import itertools
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from telethon import errors
+
+
+class FakeUser:
+    def __init__(self, user_id: int):
+        self.id = user_id
+
+
+class FakeDocument:
+    def __init__(self, file_name: str):
+        self.file_name = file_name
+
+
+class FakeMessage:
+    """Message Telegram minimal (attributs lus par les gestionnaires)"""
+
+    def __init__(self, message_id: int, chat_id: int, text: str = "", date: Optional[datetime] = None,
+                 document: Optional[FakeDocument] = None):
+        self.id = message_id
+        self.chat_id = chat_id
+        self.message = text
+        self.date = date or datetime.now(timezone.utc)
+        self.document = document
+        self.media = document
+
+    @property
+    def text(self) -> str:
+        return self.message
+
+
+class FakeEvent:
+    """Événement NewMessage / MessageEdited simulé"""
+
+    def __init__(self, client: "FakeTelegramClient", message: FakeMessage, sender_id: Optional[int] = None,
+                 is_channel: bool = True, is_group: bool = False):
+        self.client = client
+        self.message = message
+        self.chat_id = message.chat_id
+        self.sender_id = sender_id if sender_id is not None else message.chat_id
+        self.is_channel = is_channel
+        self.is_group = is_group
+        self.is_private = not is_channel and not is_group
+
+    async def respond(self, text: str, **kwargs) -> FakeMessage:
+        return await self.client.send_message(self.chat_id, text, **kwargs)
+
+
+class FloodLimiter:
+    """
+    Seau à jetons par discussion: au-delà de rate messages/s (rafale de burst),
+    Telegram répond FloodWait avec le nombre de secondes à attendre.
+    Les demandes en attente réservent leur jeton: l'attente s'allonge avec la file.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[Any, Tuple[float, float]] = {}
+
+    def reserve(self, chat) -> float:
+        """Réserve un envoi, retourne l'attente imposée (secondes)"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(chat, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - updated) * self.rate) - 1
+        self._buckets[chat] = (tokens, now)
+        return -tokens / self.rate if tokens < 0 else 0.0
+
+    def release(self, chat):
+        """Rend le jeton d'un envoi refusé"""
+        tokens, updated = self._buckets[chat]
+        self._buckets[chat] = (tokens + 1, updated)
+
+
+class FakeTelegramClient:
+    """
+    Client simulé: chaque appel est compté et conservé.
+    latency / latency_jitter: durée simulée des appels réseau (secondes)
+    flood_rate / flood_burst: limite de débit par discussion (None = illimité)
+    flood_sleep_threshold: comme Telethon, les attentes FloodWait inférieures au seuil sont
+    dormies automatiquement, les autres lèvent FloodWaitError
+    on_call: fonction appelée après chaque appel réussi (méthode, détails)
+    keep_calls: conserver le détail des appels (désactiver pour les longs tests de charge)
+    """
+
+    def __init__(self, me_id: int = 1, latency: float = 0.0, latency_jitter: float = 0.0,
+                 flood_rate: Optional[float] = None, flood_burst: int = 20, flood_sleep_threshold: float = 60,
+                 on_call: Optional[Callable[[str, Dict[str, Any]], None]] = None, keep_calls: bool = True,
+                 seed: int = 11):
+        self.me = FakeUser(me_id)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.flood = FloodLimiter(flood_rate, flood_burst) if flood_rate else None
+        self.flood_sleep_threshold = flood_sleep_threshold
+        self.on_call = on_call
+        self.keep_calls = keep_calls
+        self.calls: List[Dict[str, Any]] = []
+        self.counts: Counter = Counter()
+        self.flood_waits = 0
+        self.flood_wait_seconds = 0.0
+        self.flood_errors = 0
+        self._ids = itertools.count(1)
+        self._rng = random.Random(seed)
+
+    async def _call(self, method: str, **details) -> None:
+        if self.flood is not None and "entity" in details:
+            wait = self.flood.reserve(details["entity"])
+            if wait > self.flood_sleep_threshold:
+                self.flood.release(details["entity"])
+                self.flood_errors += 1
+                raise errors.FloodWaitError(request=None, capture=int(wait) + 1)
+            if wait > 0:
+                self.flood_waits += 1
+                self.flood_wait_seconds += wait
+                await asyncio.sleep(wait)
+        if self.latency or self.latency_jitter:
+            await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.latency_jitter,
+                                                                          self.latency_jitter)))
+        self.counts[method] += 1
+        if self.keep_calls:
+            self.calls.append({"method": method, **details})
+        if self.on_call is not None:
+            self.on_call(method, details)
+
+    async def get_me(self) -> FakeUser:
+        return self.me
+
+    async def send_message(self, entity, text: str = "", **kwargs) -> FakeMessage:
+        await self._call("send_message", entity=entity, text=text)
+        return FakeMessage(next(self._ids), entity, text)
+
+    async def edit_message(self, entity, message, text: str = "", **kwargs) -> FakeMessage:
+        message_id = getattr(message, "id", message)
+        await self._call("edit_message", entity=entity, message_id=message_id, text=text)
+        return FakeMessage(message_id, entity, text)
+
+    async def upload_file(self, file, file_name: Optional[str] = None, **kwargs) -> FakeDocument:
+        await self._call("upload_file", file=str(file), file_name=file_name)
+        return FakeDocument(file_name or str(file))
+
+    async def send_file(self, entity, file, caption: Optional[str] = None, **kwargs) -> FakeMessage:
+        await self._call("send_file", entity=entity, caption=caption)
+        document = file if isinstance(file, FakeDocument) else FakeDocument(str(file))
+        return FakeMessage(next(self._ids), entity, caption or "", document=document)
+
+    def on(self, *args, **kwargs):
+        return lambda handler: handler
+
+    async def disconnect(self):
+        return None
@@ -0,0 +1,299 @@
+"""
+Test de charge de bout en bout des gestionnaires de main.py
+Le bot est importé dans un répertoire temporaire avec un client Telegram simulé
+(latence des envois/éditions, limites de débit FloodWait) puis reçoit un flux synthétique
+du canal source par paliers de débit croissants.
+
+Usage (depuis la racine du dépôt):
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --rates 1,5,20 --duration 30 --edit-ratio 0.3 --edit-storm 5
+    python benchmarks/load_test.py --excel-density 0.5 --latency 0.1 --flood-rate 1 --output charge.json
+
+Chaque mise à jour est traitée dans sa propre tâche (comme Telethon), à l'heure prévue:
+si la boucle asyncio sature, le retard s'ajoute à la latence mesurée.
+Le rapport indique par palier:
+- la latence des gestionnaires et le retard de démarrage (p50 / p99)
+- la latence de bout en bout, de la publication dans le canal source au lancement
+  puis à l'édition (vérification) de la prédiction dans le canal d'affichage
+- les attentes et erreurs FloodWait, le nombre maximal de gestionnaires simultanés
+- la croissance mémoire (RSS et, avec --tracemalloc, la mémoire Python allouée)
+"""
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import game_message  # noqa: E402
+from fake_telegram import FakeEvent, FakeMessage, FakeTelegramClient  # noqa: E402
+from replay import DEFAULT_ADMIN, DEFAULT_CHANNEL, DEFAULT_DISPLAY_CHANNEL, load_bot  # noqa: E402
+from run import quiet, summarize  # noqa: E402
+
+# Heure de publication (time.monotonic) de la mise à jour en cours de traitement
+posted_at: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("posted_at", default=None)
+
+
+def rss_bytes() -> int:
+    """Mémoire résidente du processus (maximum atteint si /proc n'est pas disponible)"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def stage_updates(start: int, rate: float, duration: float, edit_ratio: float, edit_storm: int,
+                  storm_interval: float, channel: int, rng: random.Random, first_id: int) -> List[Dict[str, Any]]:
+    """
+    Mises à jour d'un palier: rate parties/s pendant duration secondes.
+    Une partie sur edit_ratio est publiée en ⏰ puis éditée edit_storm fois
+    (versions ⏰ successives, la dernière finalisée) toutes les storm_interval secondes.
+    'at' est l'heure de publication relative au début du palier.
+    """
+    updates = []
+    count = max(1, int(rate * duration))
+    for index in range(count):
+        numero = start + index
+        message_id = first_id + index
+        at = index / rate
+        if rng.random() < edit_ratio:
+            states = ["pending"] * max(1, edit_storm) + ["final"]
+            for step, state in enumerate(states):
+                updates.append({"at": at + step * storm_interval, "id": message_id, "chat": channel,
+                                "edit": 1 if step else 0, "numero": numero,
+                                "text": game_message(numero, rng, state)["text"]})
+        else:
+            updates.append({"at": at, "id": message_id, "chat": channel, "edit": 0, "numero": numero,
+                            "text": game_message(numero, rng, "final")["text"]})
+    updates.sort(key=lambda update: update["at"])
+    return updates
+
+
+def excel_rows(start: int, count: int, density: float, rng: random.Random) -> List[tuple]:
+    """Prédictions Excel (Date & Heure, Numéro, Victoire) pour une partie sur density"""
+    day = datetime(2025, 1, 1, 1, 0, 0)
+    return [((day + timedelta(minutes=index)).strftime("%Y-%m-%d %H:%M:%S"), start + index,
+             rng.choice(["Joueur", "Banquier"]))
+            for index in range(count) if rng.random() < density]
+
+
+class LoadProbe:
+    """Collecte les latences de bout en bout à partir des appels du client simulé"""
+
+    def __init__(self, display_channel: int):
+        self.display_channel = display_channel
+        self.e2e = {"launch": [], "edit": []}
+
+    def on_call(self, method: str, details: Dict[str, Any]):
+        if details.get("entity") != self.display_channel:
+            return
+        started = posted_at.get()
+        if started is None:
+            return
+        kind = "launch" if method == "send_message" else "edit" if method == "edit_message" else None
+        if kind:
+            self.e2e[kind].append(int((time.monotonic() - started) * 1e9))
+
+    def reset(self):
+        self.e2e = {"launch": [], "edit": []}
+
+
+async def run_stage(bot, client: FakeTelegramClient, probe: LoadProbe, updates: List[Dict[str, Any]],
+                    rate: float, drain_timeout: float) -> Dict[str, Any]:
+    """Publie les mises à jour à l'heure prévue et attend la fin de leur traitement"""
+    handler_ns: List[int] = []
+    start_lag_ns: List[int] = []
+    in_flight = 0
+    max_in_flight = 0
+    failures = 0
+    calls_before = sum(client.counts.values())
+    waits_before, errors_before = client.flood_waits, client.flood_errors
+    wait_seconds_before = client.flood_wait_seconds
+    probe.reset()
+
+    async def deliver(update: Dict[str, Any], scheduled: float):
+        nonlocal in_flight, max_in_flight, failures
+        posted_at.set(scheduled)
+        start_lag_ns.append(int((time.monotonic() - scheduled) * 1e9))
+        message = FakeMessage(update["id"], update["chat"], update["text"], date=datetime.now(timezone.utc))
+        event = FakeEvent(client, message)
+        handler = bot.handle_edited_message if update["edit"] else bot.handle_message
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        begin = time.perf_counter_ns()
+        try:
+            await handler(event)
+        except Exception:
+            failures += 1
+        finally:
+            handler_ns.append(time.perf_counter_ns() - begin)
+            in_flight -= 1
+
+    tasks = []
+    started = time.monotonic()
+    for update in updates:
+        scheduled = started + update["at"]
+        delay = scheduled - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(deliver(update, scheduled)))
+    published = time.monotonic() - started
+
+    done, pending = await asyncio.wait(tasks, timeout=drain_timeout) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+    wall = time.monotonic() - started
+    games = len({update["numero"] for update in updates})
+    published = max(published, games / rate)  # La dernière partie occupe aussi son intervalle
+
+    return {
+        "target_rate": rate,
+        "games": games,
+        "updates": len(updates),
+        "achieved_rate": round(games / published, 2) if published else None,
+        "wall_s": round(wall, 3),
+        "drain_s": round(wall - published, 3),
+        "unfinished": len(pending),
+        "handler_errors": failures,
+        "max_in_flight": max_in_flight,
+        "handler": summarize("handler", len(handler_ns), handler_ns),
+        "start_lag": summarize("start_lag", len(start_lag_ns), start_lag_ns),
+        "e2e_launch": summarize("e2e_launch", len(probe.e2e["launch"]), probe.e2e["launch"]),
+        "e2e_edit": summarize("e2e_edit", len(probe.e2e["edit"]), probe.e2e["edit"]),
+        "telegram_calls": sum(client.counts.values()) - calls_before,
+        "flood_waits": client.flood_waits - waits_before,
+        "flood_wait_s": round(client.flood_wait_seconds - wait_seconds_before, 3),
+        "flood_errors": client.flood_errors - errors_before
+    }
+
+
+def memory_sample(traced: bool) -> Dict[str, Any]:
+    sample = {"rss_bytes": rss_bytes()}
+    if traced:
+        current, peak = tracemalloc.get_traced_memory()
+        sample.update({"python_bytes": current, "python_peak_bytes": peak})
+    return sample
+
+
+async def run_load(bot, client: FakeTelegramClient, probe: LoadProbe, args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    rates = [float(rate) for rate in args.rates.split(",") if rate]
+    plans = []
+    numero = 1
+    message_id = 1
+    for rate in rates:
+        updates = stage_updates(numero, rate, args.duration, args.edit_ratio, args.edit_storm,
+                                args.storm_interval, args.channel, rng, message_id)
+        games = len({update["numero"] for update in updates})
+        plans.append((rate, updates))
+        numero += games
+        message_id += games
+
+    # Les prédictions couvrent tous les paliers (le Projet 2 les lance au fil du flux)
+    if args.excel_density > 0:
+        bot.excel_manager.import_records(excel_rows(1, numero, args.excel_density, rng), replace_mode=True)
+
+    memory_start = memory_sample(args.tracemalloc)
+    stages = []
+    for rate, updates in plans:
+        stage = await run_stage(bot, client, probe, updates, rate, args.drain_timeout)
+        stage["memory"] = memory_sample(args.tracemalloc)
+        stages.append(stage)
+        print(f"{rate:>7.1f} parties/s  {stage['achieved_rate'] or 0:>7.1f} obtenues  "
+              f"gestionnaire p99 {stage['handler']['p99_ms']:>9.2f} ms  "
+              f"bout en bout p99 {stage['e2e_edit']['p99_ms']:>9.2f} ms  "
+              f"flood {stage['flood_waits']:>4} ({stage['flood_errors']} erreurs)  "
+              f"RSS {stage['memory']['rss_bytes'] / 1048576:>7.1f} Mo", file=sys.__stdout__, flush=True)
+
+    memory_end = memory_sample(args.tracemalloc)
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "stages": stages,
+        "memory": {
+            "start": memory_start,
+            "end": memory_end,
+            "growth_bytes": memory_end["rss_bytes"] - memory_start["rss_bytes"],
+            "python_growth_bytes": (memory_end["python_bytes"] - memory_start["python_bytes"]
+                                    if args.tracemalloc else None)
+        },
+        "final": {
+            "results": bot.results_manager.get_stats()["total"],
+            "excel_predictions": bot.excel_manager.get_stats()
+        }
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Test de charge des gestionnaires du bot")
+    parser.add_argument("--rates", default="1,5,20", help="Débits successifs en parties/s (séparés par des virgules)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Durée de chaque palier (secondes)")
+    parser.add_argument("--edit-ratio", type=float, default=0.15, help="Part des parties publiées en ⏰ puis éditées")
+    parser.add_argument("--edit-storm", type=int, default=1, help="Nombre d'éditions ⏰ avant la version finale")
+    parser.add_argument("--storm-interval", type=float, default=0.2, help="Intervalle entre éditions (secondes)")
+    parser.add_argument("--excel-density", type=float, default=0.3, help="Part des parties ayant une prédiction Excel")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latence simulée des appels Telegram (secondes)")
+    parser.add_argument("--latency-jitter", type=float, default=0.03, help="Variation de la latence (secondes)")
+    parser.add_argument("--flood-rate", type=float, default=1.0, help="Envois par seconde et par discussion (0 = illimité)")
+    parser.add_argument("--flood-burst", type=int, default=20, help="Rafale tolérée avant FloodWait")
+    parser.add_argument("--flood-threshold", type=float, default=60.0,
+                        help="Attente FloodWait dormie automatiquement (au-delà: FloodWaitError)")
+    parser.add_argument("--drain-timeout", type=float, default=120.0,
+                        help="Attente maximale de fin de traitement après chaque palier (secondes)")
+    parser.add_argument("--channel", type=int, default=DEFAULT_CHANNEL, help="Canal source simulé")
+    parser.add_argument("--display-channel", type=int, default=DEFAULT_DISPLAY_CHANNEL, help="Canal d'affichage")
+    parser.add_argument("--no-transfer", action="store_true", help="Désactiver le transfert des messages à l'admin")
+    parser.add_argument("--tracemalloc", action="store_true", help="Mesurer aussi la mémoire Python (plus lent)")
+    parser.add_argument("--seed", type=int, default=17)
+    parser.add_argument("--output", default=None, help="Fichier JSON du rapport")
+    parser.add_argument("--verbose", action="store_true", help="Afficher les journaux du bot")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output) if args.output else None
+    previous = os.getcwd()
+    workdir = Path(tempfile.mkdtemp(prefix="load-"))
+    probe = LoadProbe(args.display_channel)
+    client = FakeTelegramClient(latency=args.latency, latency_jitter=args.latency_jitter,
+                                flood_rate=args.flood_rate or None, flood_burst=args.flood_burst,
+                                flood_sleep_threshold=args.flood_threshold, on_call=probe.on_call,
+                                keep_calls=False, seed=args.seed)
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    try:
+        output_guard = contextlib.nullcontext() if args.verbose else quiet()
+        with output_guard:
+            if not args.verbose:
+                logging.disable(logging.INFO)
+            bot = load_bot(workdir, client, args.channel, args.display_channel, DEFAULT_ADMIN)
+            bot.transfer_enabled = not args.no_transfer
+            report = asyncio.run(run_load(bot, client, probe, args))
+    finally:
+        if args.tracemalloc:
+            tracemalloc.stop()
+        logging.disable(logging.NOTSET)
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Rejeu d'un journal de mises à jour du canal à travers les gestionnaires de main.py
+Le bot est importé dans un répertoire temporaire (aucune donnée réelle n'est modifiée)
+et son client Telethon est remplacé par FakeTelegramClient: aucun accès réseau.
+
+Usage (depuis la racine du dépôt):
+    python benchmarks/replay.py data/captures/updates-2025-01-01.ndjson
+    python benchmarks/replay.py capture.ndjson.gz --speed 60      # 1 minute réelle = 1 seconde
+    python benchmarks/replay.py --generate 1440 --excel predictions.xlsx --output replay.json
+
+--speed 0 (défaut): aussi vite que possible. Le rapport indique la latence par mise à jour
+(p50 / p99), les appels Telegram simulés et l'état final (résultats, prédictions).
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import generate_messages  # noqa: E402
+from fake_telegram import FakeEvent, FakeMessage, FakeTelegramClient  # noqa: E402
+from run import quiet, summarize  # noqa: E402
+from update_capture import read_updates  # noqa: E402
+
+DEFAULT_CHANNEL = -1001000000001
+DEFAULT_DISPLAY_CHANNEL = -1001000000002
+DEFAULT_ADMIN = 1000
+
+
+def generated_updates(count: int, channel: int = DEFAULT_CHANNEL, interval: float = 60.0) -> List[Dict[str, Any]]:
+    """Mises à jour synthétiques (une partie par minute, éditions comprises)"""
+    updates = []
+    started = time.time()
+    message_ids = {}
+    for message in generate_messages(count):
+        numero = message["numero"]
+        if not message["edit"]:
+            message_ids[numero] = len(message_ids) + 1
+        recv = started + numero * interval + (interval / 2 if message["edit"] else 0)
+        updates.append({"id": message_ids[numero], "chat": channel, "date": int(recv), "recv": recv,
+                        "edit": 1 if message["edit"] else 0, "text": message["text"]})
+    return updates
+
+
+def load_bot(workdir: Path, client: FakeTelegramClient, channel: int,
+             display_channel: Optional[int], admin_id: int):
+    """Importe main.py dans workdir et remplace son client Telegram par le client simulé"""
+    os.environ.setdefault("API_ID", "1")
+    os.environ.setdefault("API_HASH", "replay")
+    os.environ.setdefault("BOT_TOKEN", "replay")
+    os.environ["ADMIN_ID"] = str(admin_id)
+    os.environ.pop("CAPTURE_UPDATES", None)  # Ne pas réenregistrer le rejeu
+    os.environ["LEADER_LEASE_SECONDS"] = "0"  # Pas d'élection: le bot rejoué traite tout
+    os.chdir(workdir)
+
+    bot = importlib.import_module("main")
+    bot.client = client
+    bot.upload_cache.client = client
+    bot.restore_state()
+    bot.detected_stat_channel = channel
+    bot.detected_display_channel = display_channel
+    bot.transfer_enabled = True
+    return bot
+
+
+async def replay(bot, client: FakeTelegramClient, updates: Iterable[Dict[str, Any]],
+                 speed: float = 0.0) -> Dict[str, Any]:
+    """Transmet chaque mise à jour au gestionnaire correspondant, retourne le rapport"""
+    latencies = {"new": [], "edit": []}
+    previous_recv = None
+    wall_started = time.perf_counter()
+
+    for update in updates:
+        recv = update.get("recv") or update.get("date")
+        if speed and previous_recv is not None and recv is not None:
+            delay = (recv - previous_recv) / speed
+            if delay > 0:
+                await asyncio.sleep(delay)
+        previous_recv = recv
+
+        sent_at = datetime.fromtimestamp(update["date"], timezone.utc) if update.get("date") else None
+        message = FakeMessage(update["id"], update["chat"], update["text"], date=sent_at)
+        event = FakeEvent(client, message)
+        kind = "edit" if update.get("edit") else "new"
+        handler = bot.handle_edited_message if kind == "edit" else bot.handle_message
+
+        begin = time.perf_counter_ns()
+        await handler(event)
+        latencies[kind].append(time.perf_counter_ns() - begin)
+
+    wall = time.perf_counter() - wall_started
+    samples = latencies["new"] + latencies["edit"]
+    return {
+        "updates": len(samples),
+        "wall_s": round(wall, 3),
+        "updates_per_s": round(len(samples) / wall, 1) if wall else None,
+        "latency": summarize("all", len(samples), samples),
+        "latency_new": summarize("new", len(latencies["new"]), latencies["new"]),
+        "latency_edit": summarize("edit", len(latencies["edit"]), latencies["edit"]),
+        "telegram_calls": dict(client.counts),
+        "results": bot.results_manager.get_stats()["total"],
+        "excel_predictions": bot.excel_manager.get_stats()
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Rejeu des mises à jour du canal source")
+    parser.add_argument("capture", nargs="?", help="Journal .ndjson ou .ndjson.gz")
+    parser.add_argument("--generate", type=int, default=0, help="Rejouer N parties synthétiques")
+    parser.add_argument("--speed", type=float, default=0.0, help="Facteur d'accélération (0 = maximum)")
+    parser.add_argument("--channel", type=int, default=None, help="Canal source (défaut: celui du journal)")
+    parser.add_argument("--display-channel", type=int, default=DEFAULT_DISPLAY_CHANNEL,
+                        help="Canal d'affichage des prédictions Excel (0 pour désactiver le Projet 2)")
+    parser.add_argument("--excel", default=None, help="Fichier Excel de prédictions à importer avant le rejeu")
+    parser.add_argument("--output", default=None, help="Fichier JSON du rapport")
+    parser.add_argument("--verbose", action="store_true", help="Afficher les journaux du bot")
+    args = parser.parse_args(argv)
+
+    if args.capture:
+        updates = list(read_updates(os.path.abspath(args.capture)))
+    elif args.generate:
+        updates = generated_updates(args.generate)
+    else:
+        parser.error("Indiquer un journal à rejouer ou --generate N")
+    if not updates:
+        parser.error("Journal vide")
+
+    channel = args.channel or updates[0]["chat"]
+    excel = os.path.abspath(args.excel) if args.excel else None
+    output = os.path.abspath(args.output) if args.output else None
+    previous = os.getcwd()
+    workdir = Path(tempfile.mkdtemp(prefix="replay-"))
+    client = FakeTelegramClient()
+
+    try:
+        output_guard = contextlib.nullcontext() if args.verbose else quiet()
+        with output_guard:
+            if not args.verbose:
+                logging.disable(logging.INFO)
+            bot = load_bot(workdir, client, channel, args.display_channel or None, DEFAULT_ADMIN)
+            if excel:
+                bot.excel_manager.import_excel(excel)
+            report = asyncio.run(replay(bot, client, updates, args.speed))
+    finally:
+        logging.disable(logging.NOTSET)
+        os.chdir(previous)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Benchmarks du chemin de traitement des messages
+Mesure débit et percentiles de latence pour 1k, 10k et 100k parties enregistrées:
+- GameResultsManager.process_message
+- CardPredictor.verify_prediction
+- ExcelPredictionManager.find_close_prediction / verify_excel_prediction
+- GameResultsManager.export_to_txt / ExcelPredictionManager.import_excel
+
+Usage (depuis la racine du dépôt):
+    python benchmarks/run.py
+    python benchmarks/run.py --scales 1000,10000 --budget 2 --only process_message
+    python benchmarks/run.py --compare benchmarks/results/20250101-120000.json
+
+Les résultats sont écrits en JSON dans benchmarks/results/ pour comparer les exécutions.
+Chaque scénario s'exécute dans un répertoire temporaire (les gestionnaires écrivent dans data/).
+Les benchmarks Excel plafonnent le nombre de prédictions à MAX_NUMERO // 2 (numéros un sur deux).
+La sortie console des gestionnaires est ignorée pendant les mesures.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import generate_messages, generate_results, iter_verification_messages  # noqa: E402
+
+DEFAULT_SCALES = (1000, 10000, 100000)
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+class _NullWriter(io.TextIOBase):
+    def write(self, text):
+        return len(text)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Ignore les print() des gestionnaires pendant une mesure"""
+    with contextlib.redirect_stdout(_NullWriter()):
+        yield
+
+
+@contextlib.contextmanager
+def scratch_dir():
+    """Répertoire de travail temporaire (data/ et fichiers exportés)"""
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench-") as directory:
+        os.chdir(directory)
+        try:
+            yield Path(directory)
+        finally:
+            os.chdir(previous)
+
+
+def measure(name: str, scale: int, func: Callable[[Any], Any], inputs: Iterable[Any],
+            budget: float, min_iterations: int = 5, max_iterations: int = 100000) -> Dict[str, Any]:
+    """Appelle func sur chaque entrée jusqu'à épuisement du budget (au moins min_iterations appels)"""
+    samples = []
+    started = time.perf_counter()
+    with quiet():
+        for item in inputs:
+            begin = time.perf_counter_ns()
+            func(item)
+            samples.append(time.perf_counter_ns() - begin)
+            if len(samples) >= max_iterations:
+                break
+            if len(samples) >= min_iterations and time.perf_counter() - started >= budget:
+                break
+    return summarize(name, scale, samples)
+
+
+def summarize(name: str, scale: int, samples: List[int]) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    total_s = sum(samples) / 1e9
+
+    def percentile(p: float) -> float:
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+        return ordered[index] / 1e6
+
+    return {
+        "name": name,
+        "scale": scale,
+        "iterations": len(samples),
+        "total_s": round(total_s, 6),
+        "ops_per_s": round(len(samples) / total_s, 2) if total_s else None,
+        "mean_ms": round(statistics.fmean(samples) / 1e6, 4) if samples else 0.0,
+        "p50_ms": round(percentile(50), 4),
+        "p90_ms": round(percentile(90), 4),
+        "p99_ms": round(percentile(99), 4),
+        "max_ms": round(ordered[-1] / 1e6, 4) if ordered else 0.0
+    }
+
+
+# ---------- scénarios ----------
+
+def bench_process_message(scale: int, budget: float) -> Dict[str, Any]:
+    from game_results_manager import GameResultsManager
+
+    with scratch_dir():
+        with quiet():
+            manager = GameResultsManager()
+            stored = generate_results(scale)
+            manager.import_state(stored)
+            # Les nouveaux messages suivent les parties déjà enregistrées
+            messages = generate_messages(max(2000, scale // 10), start=stored[-1]["numero"] + 2)
+        return measure("process_message", scale, manager.process_message,
+                       (message["text"] for message in messages), budget)
+
+
+def bench_verify_prediction(scale: int, budget: float) -> Dict[str, Any]:
+    from predictor import CardPredictor
+
+    with quiet():
+        predictor = CardPredictor()
+        # Une prédiction en attente tous les 3 numéros sur la plage simulée
+        for numero in range(1, scale * 3, 3):
+            predictor.add_prediction(numero, "♠♥♣")
+    numbers = list(range(scale * 3 - 3000, scale * 3 + 3000))
+    return measure("verify_prediction", scale, predictor.verify_prediction,
+                   (message["text"] for message in iter_verification_messages(numbers)), budget)
+
+
+def _excel_scale(scale: int) -> int:
+    """
+    Nombre de prédictions Excel pour une échelle: les numéros générés vont de 1 à 2 × scale - 1,
+    le stockage n'accepte pas plus de MAX_NUMERO (taille plafonnée, indiquée dans le résultat)
+    """
+    from excel_prediction_store import MAX_NUMERO
+
+    return min(scale, MAX_NUMERO // 2)
+
+
+def _excel_manager(scale: int):
+    from excel_importer import ExcelPredictionManager
+
+    manager = ExcelPredictionManager(autoload=False)
+    rows = [(f"{r['date']} {r['heure']}", r["numero"], r["gagnant"]) for r in generate_results(scale)]
+    result = manager.import_records(rows, replace_mode=True)
+    if not result["success"] or result.get("out_of_range"):
+        raise RuntimeError(f"Import des prédictions du benchmark incomplet: {result}")
+    return manager
+
+
+def bench_find_close_prediction(scale: int, budget: float) -> Dict[str, Any]:
+    rng = random.Random(3)
+    scale = _excel_scale(scale)
+    with scratch_dir():
+        with quiet():
+            manager = _excel_manager(scale)
+        numbers = (rng.randrange(1, scale * 2) for _ in range(1000000))
+        return measure("find_close_prediction", scale, manager.find_close_prediction, numbers, budget)
+
+
+def bench_verify_excel_prediction(scale: int, budget: float) -> Dict[str, Any]:
+    rng = random.Random(5)
+    scale = _excel_scale(scale)
+    with scratch_dir():
+        with quiet():
+            manager = _excel_manager(scale)
+        targets = [int(numero) for numero in list(manager.store.iter_pending())[:5000]]
+        messages = {message["numero"]: message["text"]
+                    for message in iter_verification_messages([numero + offset for numero in targets
+                                                               for offset in range(3)])}
+
+        def cases():
+            while True:
+                numero = rng.choice(targets)
+                offset = rng.randrange(3)
+                yield numero, offset, manager.store.victoire(numero)
+
+        def verify(case):
+            numero, offset, expected = case
+            manager.verify_excel_prediction(numero + offset, messages[numero + offset], numero, expected, offset)
+
+        return measure("verify_excel_prediction", scale, verify, cases(), budget)
+
+
+def bench_export_to_txt(scale: int, budget: float) -> Dict[str, Any]:
+    from game_results_manager import GameResultsManager
+
+    with scratch_dir():
+        with quiet():
+            manager = GameResultsManager()
+            manager.import_state(generate_results(scale))
+        paths = (f"export_{index}.xlsx" for index in range(1000))
+        return measure("export_to_txt", scale, manager.export_to_txt, paths, budget, min_iterations=1)
+
+
+def bench_import_excel(scale: int, budget: float) -> Dict[str, Any]:
+    from game_results_manager import GameResultsManager
+    from excel_importer import ExcelPredictionManager
+
+    scale = _excel_scale(scale)
+    with scratch_dir():
+        with quiet():
+            results = GameResultsManager()
+            results.import_state(generate_results(scale))
+            path = results.export_to_txt("import.xlsx")
+            manager = ExcelPredictionManager(autoload=False)
+        return measure("import_excel", scale, manager.import_excel, (path for _ in range(1000)), budget,
+                       min_iterations=1)
+
+
+BENCHMARKS = {
+    "process_message": bench_process_message,
+    "verify_prediction": bench_verify_prediction,
+    "find_close_prediction": bench_find_close_prediction,
+    "verify_excel_prediction": bench_verify_excel_prediction,
+    "export_to_txt": bench_export_to_txt,
+    "import_excel": bench_import_excel,
+}
+
+
+# ---------- exécution et comparaison ----------
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def run(scales: List[int], names: List[str], budget: float) -> Dict[str, Any]:
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "budget_s": budget,
+        "results": []
+    }
+    for scale in scales:
+        for name in names:
+            result = BENCHMARKS[name](scale, budget)
+            report["results"].append(result)
+            print(f"{name:<24} {result['scale']:>7} parties  {result['iterations']:>6} appels  "
+                  f"{result['ops_per_s'] or 0:>10.1f} op/s  p50 {result['p50_ms']:>9.3f} ms  "
+                  f"p99 {result['p99_ms']:>9.3f} ms", flush=True)
+    return report
+
+
+def compare(current: Dict[str, Any], previous_path: str):
+    """Affiche l'évolution de p50 et du débit par rapport à une exécution précédente"""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {(r["name"], r["scale"]): r for r in json.load(f)["results"]}
+    print(f"\nComparaison avec {previous_path}:")
+    for result in current["results"]:
+        before = previous.get((result["name"], result["scale"]))
+        if not before or not before.get("p50_ms") or not before.get("ops_per_s"):
+            continue
+        p50_ratio = result["p50_ms"] / before["p50_ms"] if before["p50_ms"] else 0
+        ops_ratio = (result["ops_per_s"] or 0) / before["ops_per_s"]
+        print(f"{result['name']:<24} {result['scale']:>7}  p50 ×{p50_ratio:.2f}  débit ×{ops_ratio:.2f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Benchmarks du traitement des messages")
+    parser.add_argument("--scales", default=",".join(map(str, DEFAULT_SCALES)),
+                        help="Nombres de parties enregistrées (séparés par des virgules)")
+    parser.add_argument("--only", default="", help=f"Scénarios à exécuter parmi: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--budget", type=float, default=3.0, help="Durée de mesure par scénario (secondes)")
+    parser.add_argument("--output", default=None, help="Fichier JSON de sortie")
+    parser.add_argument("--compare", default=None, help="Fichier JSON d'une exécution précédente")
+    args = parser.parse_args(argv)
+
+    scales = [int(scale) for scale in args.scales.split(",") if scale]
+    names = [name for name in args.only.split(",") if name] or list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Scénario inconnu: {', '.join(unknown)}")
+
+    report = run(scales, names, args.budget)
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nRésultats enregistrés: {output}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Registre des canaux sources surveillés
+Chaque canal a son propre contexte: résultats, prédictions Excel, canal d'affichage,
+messages transférés et verrou. Les fichiers d'un canal sont isolés dans data/channels/<id>/,
+les canaux ne partagent donc ni fichier ni verrou.
+Le canal principal (configuré avec /set_channel) garde les fichiers historiques à la racine de data/.
+"""
+import asyncio
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import logging
+import yaml
+
+from excel_importer import ExcelPredictionManager
+from game_results_manager import GameResultsManager
+
+logger = logging.getLogger(__name__)
+
+
+class ChannelContext:
+    """État d'un canal source"""
+
+    def __init__(self, channel_id: Optional[int], display_channel: Optional[int],
+                 results_manager: GameResultsManager, excel_manager: ExcelPredictionManager,
+                 transferred_messages: Optional[Dict[int, int]] = None, data_dir: Optional[str] = None):
+        self.channel_id = channel_id
+        self.display_channel = display_channel
+        self.results_manager = results_manager
+        self.excel_manager = excel_manager
+        # Identifiants propres au canal: les numéros de messages se répètent d'un canal à l'autre
+        self.transferred_messages = transferred_messages if transferred_messages is not None else {}
+        self.data_dir = data_dir
+        # Sérialise le traitement des messages du canal (enregistrement + prédictions Excel)
+        self.lock = asyncio.Lock()
+        self.processed = 0
+
+    def info(self) -> Dict[str, Any]:
+        info = {
+            "channel_id": self.channel_id,
+            "display_channel": self.display_channel,
+            "data_dir": self.data_dir,
+            "processed": self.processed
+        }
+        # Sans gestionnaires: l'état du canal appartient à un processus de travail (worker_pool)
+        if self.results_manager is not None:
+            info["results"] = self.results_manager.get_stats()["total"]
+        if self.excel_manager is not None:
+            info["excel_predictions"] = self.excel_manager.get_stats()
+        return info
+
+
+class ChannelRegistry:
+    """
+    Canaux sources supplémentaires, persistés dans data/channels.yaml
+    owns_state=False: les contextes n'ont pas de gestionnaires (fichiers tenus par les
+    processus de travail du mode superviseur, voir worker_pool.py)
+    """
+
+    def __init__(self, config_file: str = "data/channels.yaml", base_dir: str = "data/channels",
+                 owns_state: bool = True):
+        self.config_file = Path(config_file)
+        self.base_dir = Path(base_dir)
+        self.owns_state = owns_state
+        self._channels: Dict[int, ChannelContext] = {}
+
+    def _create_context(self, channel_id: int, display_channel: Optional[int]) -> ChannelContext:
+        data_dir = self.base_dir / str(channel_id)
+        if not self.owns_state:
+            return ChannelContext(channel_id, display_channel, None, None, data_dir=str(data_dir))
+        data_dir.mkdir(parents=True, exist_ok=True)
+        return ChannelContext(
+            channel_id,
+            display_channel,
+            GameResultsManager(str(data_dir)),
+            ExcelPredictionManager(predictions_file=str(data_dir / "excel_predictions.yaml"),
+                                   snapshots_dir=str(data_dir / "snapshots" / "excel_predictions")),
+            data_dir=str(data_dir)
+        )
+
+    def context_for(self, channel_id: int, display_channel: Optional[int] = None) -> ChannelContext:
+        """Contexte du canal, créé si besoin sans l'enregistrer dans data/channels.yaml"""
+        ctx = self._channels.get(channel_id)
+        if ctx is None:
+            ctx = self._create_context(channel_id, display_channel)
+            self._channels[channel_id] = ctx
+        else:
+            ctx.display_channel = display_channel
+        return ctx
+
+    def load(self) -> int:
+        """
+        Charge les canaux enregistrés, retourne leur nombre.
+        Les contextes sont toujours reconstruits: après une élection, les fichiers ont pu être
+        modifiés par l'ancienne instance leader depuis le chargement en attente.
+        """
+        self._channels = {}
+        try:
+            if not self.config_file.exists():
+                return 0
+            with open(self.config_file, "r", encoding="utf-8") as f:
+                entries = yaml.safe_load(f) or []
+            for entry in entries:
+                channel_id = int(entry["channel_id"])
+                self._channels[channel_id] = self._create_context(channel_id, entry.get("display_channel"))
+            logger.info("✅ %s canaux supplémentaires chargés", len(self._channels))
+        except Exception as e:
+            logger.error("❌ Erreur chargement des canaux: %s", e)
+        return len(self._channels)
+
+    def save(self):
+        try:
+            self.config_file.parent.mkdir(parents=True, exist_ok=True)
+            entries = [{"channel_id": ctx.channel_id, "display_channel": ctx.display_channel}
+                       for ctx in self._channels.values()]
+            temp_file = self.config_file.with_suffix(".tmp")
+            with open(temp_file, "w", encoding="utf-8") as f:
+                yaml.safe_dump(entries, f, allow_unicode=True, default_flow_style=False)
+            temp_file.replace(self.config_file)
+        except Exception as e:
+            logger.error("❌ Erreur sauvegarde des canaux: %s", e)
+
+    def add(self, channel_id: int, display_channel: Optional[int] = None) -> ChannelContext:
+        """Ajoute un canal (ou change son canal d'affichage s'il est déjà enregistré)"""
+        ctx = self.context_for(channel_id, display_channel)
+        self.save()
+        return ctx
+
+    def remove(self, channel_id: int) -> bool:
+        """Retire un canal (ses fichiers sont conservés)"""
+        if self._channels.pop(channel_id, None) is None:
+            return False
+        self.save()
+        return True
+
+    def get(self, channel_id: int) -> Optional[ChannelContext]:
+        return self._channels.get(channel_id)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self._channels
+
+    def __iter__(self) -> Iterator[ChannelContext]:
+        return iter(list(self._channels.values()))
+
+    def __len__(self) -> int:
+        return len(self._channels)
+
+    def info(self) -> List[Dict[str, Any]]:
+        return [ctx.info() for ctx in self]
@@ -0,0 +1,412 @@
+"""
+Modèles des packages de déploiement Render.com (/deploy et /deploy_duo2)
+Champs remplacés à la construction du package: {created}, {created_short} (date de
+construction, heure du Bénin) et {version}. Le package est ensuite réutilisé tant que
+les fichiers sources et la configuration ne changent pas (voir package_builder.py).
+"""
+
+REQUIREMENTS = """telethon==1.35.0
+aiohttp==3.9.5
+python-dotenv==1.0.1
+pyyaml==6.0.1
+openpyxl==3.1.2
+"""
+
+RENDER_YAML = """services:
+  - type: web
+    name: {service}
+    env: python
+    region: frankfurt
+    plan: starter
+    buildCommand: pip install -r requirements.txt
+    startCommand: python main.py
+    envVars:
+      - key: PORT
+        value: 10000
+      - key: API_ID
+        sync: false
+      - key: API_HASH
+        sync: false
+      - key: BOT_TOKEN
+        sync: false
+      - key: ADMIN_ID
+        sync: false
+      - key: TELEGRAM_SESSION
+        sync: false
+"""
+
+ENV_EXAMPLE = """# Variables d'environnement pour le bot Telegram
+# Ne jamais committer ces valeurs réelles !
+
+API_ID=votre_api_id
+API_HASH=votre_api_hash
+BOT_TOKEN=votre_bot_token
+ADMIN_ID=votre_admin_id
+PORT=10000
+"""
+
+DUO_ENV_EXAMPLE = """# Variables d'environnement Render.com
+# NE JAMAIS committer les valeurs réelles!
+
+API_ID=votre_api_id
+API_HASH=votre_api_hash
+BOT_TOKEN=votre_bot_token
+ADMIN_ID=votre_admin_id
+PORT=10000
+TELEGRAM_SESSION=votre_session_string_ici"""
+
+PROCFILE = "web: python main.py"
+
+RUNTIME = "python-3.11.0"
+
+DATA_GITKEEP = "# Dossier pour fichiers YAML\n# Créé automatiquement par le bot\n"
+
+# ==================== /deploy: Projet 1 ====================
+README = """# Bot Telegram - Package de Déploiement Render.com
+
+📅 **Créé le:** {created} (Heure Bénin UTC+1)
+📦 **Version:** {version}
+
+## 🚀 Instructions de déploiement sur Render.com
+
+### Étape 1: Créer un repository GitHub
+1. Créez un nouveau repository sur GitHub
+2. Uploadez tous les fichiers de ce package
+
+### Étape 2: Déployer sur Render.com
+1. Connectez-vous à [render.com](https://render.com)
+2. Cliquez sur **"New +"** → **"Web Service"**
+3. Connectez votre repository GitHub
+4. Render détectera automatiquement `render.yaml`
+
+### Étape 3: Configurer les Variables d'Environnement
+Dans la section **Environment** de Render.com, ajoutez:
+- **PORT**: 10000 (déjà configuré)
+- **API_ID**: Obtenez-le sur https://my.telegram.org
+- **API_HASH**: Obtenez-le sur https://my.telegram.org
+- **BOT_TOKEN**: Créez un bot avec @BotFather sur Telegram
+- **ADMIN_ID**: Obtenez votre ID avec @userinfobot sur Telegram
+
+### Étape 4: Déployer
+1. Cliquez sur **"Create Web Service"**
+2. Attendez le déploiement (2-3 minutes)
+3. Le bot sera en ligne 24/7 !
+
+## ✅ Fonctionnalités principales
+
+- ✅ **Détection automatique**: Reconnaît les parties avec 3 cartes différentes
+- ✅ **Export quotidien**: Génère un fichier Excel à 00h59 (UTC+1)
+- ✅ **Réinitialisation auto**: Reset automatique à 01h00
+- ✅ **Statistiques en temps réel**: Taux de victoire Joueur/Banquier
+
+## 📊 Commandes disponibles
+
+- `/start` - Démarrer le bot et voir les informations
+- `/status` - Voir les statistiques actuelles
+- `/fichier` - Exporter les résultats en Excel
+- `/reset` - Réinitialiser la base de données manuellement
+- `/deploy` - Créer un nouveau package de déploiement
+- `/help` - Afficher l'aide complète
+
+## 🎯 Critères d'enregistrement
+
+### ✅ Parties enregistrées:
+- Premier groupe: **exactement 3 cartes de couleurs différentes**
+- Deuxième groupe: **PAS 3 cartes**
+- Gagnant identifiable: **Joueur** ou **Banquier**
+
+### ❌ Parties ignorées:
+- Match nul
+- Les deux groupes ont 3 cartes
+- Pas de numéro de jeu identifiable
+
+## ⚙️ Configuration technique
+
+- **Langage**: Python 3.11
+- **Timezone**: Africa/Porto-Novo (UTC+1)
+- **Port**: 10000 (Render.com)
+- **Export automatique**: 00h59 chaque jour
+- **Reset automatique**: 01h00 chaque jour
+
+---
+*Package généré automatiquement*
+*Dernière mise à jour: {created_short}*
+"""
+
+CAPTION = """📦 **Package Render.com - Kouamé**
+
+📅 {created_short} (Bénin)
+📁 Kouamé.zip
+✅ Port 10000 configuré
+✅ Export à 00h59
+✅ Reset à 01h00"""
+
+# ==================== /deploy_duo2: Projet 1 + Projet 2 ====================
+DUO_README = """# 📦 Package "Render Final V2" - Bot Telegram Render.com
+
+📅 **Créé le:** {created} (Heure Bénin UTC+1)
+📦 **Version:** {version} - V2
+🚀 **Optimisé pour:** Render.com (Port 10000) avec StringSession
+
+---
+
+## 🆕 Nouveautés Version 2
+
+### **Format d'affichage des prédictions:**
+- Format: 🔵{{numéro}} 👗 𝐕𝟏/𝐕𝟐👗 statut: ⏳
+- 𝐕𝟏 = Joueur
+- 𝐕𝟐 = Banquier
+- Statuts: ⏳ (attente), ✅0️⃣/✅1️⃣/✅2️⃣ (succès), ⭕✍🏻 (échec)
+
+### **Notifications désactivées:**
+- Plus de notification admin lors du lancement des prédictions
+- Messages uniquement dans le canal d'affichage
+
+---
+
+## 🎯 Contenu du Package
+
+### ✅ **Projet 1: Stockage de Résultats**
+- 📊 Surveillance de canal source automatique
+- 💾 Stockage parties avec 3 cartes différentes
+- 📤 Export Excel quotidien à 00h59 (UTC+1)
+- 🔄 Reset automatique à 01h00
+- 🎯 Détection automatique du gagnant (Joueur/Banquier)
+- ❌ Filtrage des numéros consécutifs
+- 📥 **Import automatique dans Projet 2 après export**
+
+### ✅ **Projet 2: Système de Prédictions Excel**
+- 📥 Import de prédictions Excel (.xlsx)
+- 🚀 Lancement automatique basé sur proximité (tolérance 0-4)
+- 🔢 **Filtrage automatique des numéros consécutifs**
+- ✅ Vérification avec offsets (0, 1, 2)
+- 🎨 Format compact: 🔵{{numéro}} 👗 𝐕𝟏/𝐕𝟐👗
+- 📊 Statistiques en temps réel
+
+---
+
+## 📋 Fichiers Inclus dans le Package
+
+### **Code Source (Projet 1 + Projet 2):**
+- ✅ `main.py` - Fichier principal (projets fusionnés)
+- ✅ `game_results_manager.py` - Gestionnaire résultats Projet 1
+- ✅ `yaml_manager.py` - Gestionnaire données YAML
+- ✅ `predictor.py` - Système de prédictions Projet 2
+- ✅ `excel_importer.py` - Import et gestion Excel Projet 2
+- ✅ Modules complémentaires (`*.py`) dont dépend `main.py`
+
+### **Configuration Render.com:**
+- ✅ `render.yaml` - Déploiement automatique
+- ✅ `Procfile` - Commande de démarrage
+- ✅ `runtime.txt` - Version Python 3.11
+- ✅ `requirements.txt` - Dépendances Python
+- ✅ `bot_config.json` - Configuration canaux
+- ✅ `.env.example` - Template variables d'environnement
+
+### **Structure:**
+- ✅ `data/` - Dossier pour fichiers YAML (auto-créé)
+- ✅ `README.md` - Ce fichier de documentation
+
+---
+
+## 🚀 Déploiement sur Render.com
+
+### **Étape 1: Obtenir la Session Telegram**
+1. Lancez le bot localement une première fois
+2. Copiez la valeur TELEGRAM_SESSION affichée dans les logs
+3. Gardez cette valeur pour l'étape 3
+
+### **Étape 2: Créer un Repository GitHub**
+1. Allez sur [github.com](https://github.com)
+2. Créez un nouveau repository (public ou privé)
+3. Uploadez **TOUS** les fichiers du package "render_final.zip"
+
+### **Étape 3: Connecter à Render.com**
+1. Allez sur [render.com](https://render.com)
+2. Cliquez sur **"New +"** → **"Web Service"**
+3. Connectez votre repository GitHub
+4. Render détectera automatiquement `render.yaml`
+
+### **Étape 4: Configurer les Variables d'Environnement**
+Dans la section **Environment** de Render.com, ajoutez:
+
+| Variable | Valeur | Où l'obtenir |
+|----------|--------|--------------|
+| **PORT** | 10000 | Déjà configuré automatiquement |
+| **API_ID** | Votre ID | https://my.telegram.org |
+| **API_HASH** | Votre Hash | https://my.telegram.org |
+| **BOT_TOKEN** | Token du bot | @BotFather sur Telegram |
+| **ADMIN_ID** | Votre ID Telegram | @userinfobot sur Telegram |
+| **TELEGRAM_SESSION** | Session string | Copié depuis l'étape 1 |
+
+⚠️ **IMPORTANT:** Sans TELEGRAM_SESSION, le bot s'arrêtera après 10 minutes!
+
+### **Étape 5: Déployer**
+1. Cliquez sur **"Create Web Service"**
+2. Attendez le déploiement (2-3 minutes)
+3. ✅ Le bot sera en ligne 24/7 sur le port 10000!
+
+---
+
+## 📊 Commandes Disponibles
+
+### **Projet 1 (Stockage de Résultats):**
+- `/start` - Démarrer le bot et voir les infos
+- `/status` - Voir les statistiques
+- `/fichier` - Exporter résultats en Excel
+- `/reset` - Reset manuel de la base
+- `/set_channel <ID>` - Configurer canal source
+- `/stop_transfer` - Désactiver transfert messages
+- `/start_transfer` - Réactiver transfert messages
+
+### **Projet 2 (Prédictions Excel):**
+- `/set_display <ID>` - Configurer canal affichage
+- `/stats_excel` - Statistiques prédictions Excel
+- `/clear_excel` - Effacer toutes les prédictions
+- **Envoyer fichier Excel (.xlsx)** - Import automatique
+
+### **Autres Commandes:**
+- `/deploy` - Créer package Render.com (Projet 1)
+- `/deploy_duo2` - Créer package "Render Final" (Projet 1 + 2)
+- `/help` - Aide complète
+
+---
+
+## ⚙️ Configuration Technique
+
+| Paramètre | Valeur |
+|-----------|--------|
+| **Plateforme** | Render.com |
+| **Port** | 10000 (auto-configuré) |
+| **Python** | 3.11.0 |
+| **Timezone** | Africa/Porto-Novo (UTC+1) |
+| **Export auto** | 00h59 chaque jour |
+| **Reset auto** | 01h00 chaque jour |
+| **Import auto Projet 2** | Après export Projet 1 |
+
+---
+
+## 📥 Format Excel Requis (Projet 2)
+
+Votre fichier Excel doit avoir cette structure:
+
+| Date & Heure | Numéro | Victoire (Joueur/Banquier) |
+|--------------|--------|----------------------------|
+| 03/01/2025 - 14:20 | 881 | Banquier |
+| 03/01/2025 - 14:26 | 886 | Joueur |
+| 03/01/2025 - 14:40 | 891 | Joueur |
+
+**⚠️ Important:** Les numéros consécutifs (ex: 56→57) sont automatiquement filtrés à l'import.
+
+---
+
+## 🎯 Critères d'Enregistrement (Projet 1)
+
+### ✅ **Parties enregistrées:**
+- Premier groupe: **exactement 3 cartes de couleurs différentes**
+- Deuxième groupe: **PAS 3 cartes**
+- Gagnant identifiable: **Joueur** ou **Banquier**
+- Message finalisé avec symbole **✅**
+
+### ❌ **Parties ignorées:**
+- Match nul
+- Les deux groupes ont 3 cartes
+- Numéros consécutifs (N puis N+1)
+- Messages en cours (symbole ⏰)
+- Messages avec symbole 🔰
+
+---
+
+## 🔄 Workflow Quotidien Automatique
+
+**À 00h59 (Heure Bénin UTC+1):**
+1. 📊 Export Excel Projet 1
+2. 📤 Envoi fichier à l'admin
+3. 📥 **Import automatique dans Projet 2** (remplacement)
+4. 💬 Message de confirmation import
+
+**À 01h00:**
+5. 🔄 Reset base de données Projet 1
+6. ✅ Système prêt pour nouvelle journée
+
+---
+
+## 🛠️ Dépannage
+
+### **Problème: Bot ne démarre pas**
+- ✅ Vérifiez que toutes les variables d'environnement sont définies
+- ✅ Vérifiez les logs dans Render.com
+- ✅ Assurez-vous que le port 10000 est bien configuré
+
+### **Problème: Prédictions Excel non lancées**
+- ✅ Vérifiez que le canal source est configuré avec `/set_channel`
+- ✅ Vérifiez que le canal d'affichage est configuré avec `/set_display`
+- ✅ Vérifiez le format du fichier Excel
+
+### **Problème: Export quotidien ne fonctionne pas**
+- ✅ Vérifiez que la timezone est bien Africa/Porto-Novo (UTC+1)
+- ✅ Vérifiez les logs à 00h59 et 01h00
+- ✅ Assurez-vous que des parties ont été enregistrées
+
+---
+
+## 📞 Support
+
+**Développé par:** Sossou Kouamé Appolinaire  
+**Package créé le:** {version}  
+**Version:** Render Final  
+**Optimisé pour:** Render.com - Port 10000 avec StringSession
+
+---
+
+## ✅ Checklist de Déploiement
+
+Avant de déployer, vérifiez:
+
+- [ ] Repository GitHub créé
+- [ ] Tous les fichiers du package uploadés
+- [ ] Variables d'environnement configurées sur Render.com
+- [ ] Port 10000 confirmé dans render.yaml
+- [ ] Service web créé sur Render.com
+- [ ] Déploiement réussi (vérifier les logs)
+- [ ] Bot répond à `/start` sur Telegram
+- [ ] Canal source configuré avec `/set_channel`
+- [ ] Canal affichage configuré avec `/set_display`
+
+**🎉 Le bot est prêt à fonctionner 24/7 sur Render.com!**"""
+
+DUO_CAPTION = """✅ **Package "Render Final V2" créé!**
+
+📅 {created_short} (Bénin)
+📁 render_final_v2.zip ({size_kb:.1f} KB)
+🚀 Optimisé Render.com - Port 10000"""
+
+DUO_DETAILS = """**🆕 Nouveautés V2:**
+✅ Format: 🔵{numero} 👗 𝐕𝟏/𝐕𝟐👗 statut: ⏳
+✅ Notifications admin désactivées
+✅ Affichage optimisé
+
+**📦 Contenu:**
+• Projet 1: Stockage résultats
+• Projet 2: Prédictions Excel
+• Configuration complète Render.com
+
+**📂 Fichiers inclus:**
+• main.py, game_results_manager.py
+• yaml_manager.py, predictor.py, excel_importer.py
+• modules complémentaires (*.py)
+• render.yaml, Procfile, runtime.txt
+• requirements.txt, bot_config.json
+• .env.example, README.md
+
+**🚀 Déploiement:**
+1. Lancer localement → copier TELEGRAM_SESSION
+2. Upload GitHub
+3. Connecter Render.com
+4. Variables: API_ID, API_HASH, BOT_TOKEN, ADMIN_ID, TELEGRAM_SESSION
+5. Déployer!
+
+**🔄 Quotidien (00h59):**
+• Export Excel → Import auto Projet 2 → Reset
+
+Le bot tourne 24/7 sur port 10000! 🎉"""
@@ -0,0 +1,105 @@
+"""
+Diffusion des événements en direct (Server-Sent Events)
+Chaque événement est sérialisé une seule fois puis placé dans la file de chaque client.
+Les files sont bornées: un client trop lent (file pleine) est déconnecté au lieu de
+ralentir le bot. Les derniers événements sont conservés pour la reprise après reconnexion
+(en-tête Last-Event-ID envoyé automatiquement par EventSource). Les identifiants sont
+préfixés par un jeton de démarrage ("<jeton>-<numéro>"): après un redémarrage du bot,
+l'identifiant d'une exécution précédente n'entraîne aucune reprise.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+
+class Subscriber:
+    """Client connecté: file d'événements déjà encodés (None = fin de flux)"""
+
+    def __init__(self, buffer_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.connected_at = time.time()
+        self.dropped = False
+
+    def close(self):
+        """Vide la file et signale la fin du flux au gestionnaire HTTP"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class EventHub:
+    """Diffuse les événements à tous les clients abonnés"""
+
+    def __init__(self, buffer_size: int = 256, history_size: int = 100):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscriber] = set()
+        self._history: Deque[Tuple[int, bytes]] = deque(maxlen=history_size)
+        self._next_id = 1
+        # Jeton de démarrage: la numérotation repart de 1 à chaque exécution
+        self._boot = format(int(time.time()), "x")
+        self.published = 0
+        self.dropped = 0
+
+    @staticmethod
+    def encode(event_type: str, data: Any, event_id: Optional[str] = None) -> bytes:
+        payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+        head = f"id: {event_id}\n" if event_id is not None else ""
+        return f"{head}event: {event_type}\ndata: {payload}\n\n".encode("utf-8")
+
+    def format_id(self, event_id: int) -> str:
+        return f"{self._boot}-{event_id}"
+
+    def publish(self, event_type: str, data: Any) -> str:
+        """Publie un événement (appelé depuis la boucle asyncio), retourne son identifiant"""
+        event_id = self._next_id
+        self._next_id += 1
+        message = self.encode(event_type, data, self.format_id(event_id))
+        self._history.append((event_id, message))
+        self.published += 1
+
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+        return self.format_id(event_id)
+
+    def _drop(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+        subscriber.dropped = True
+        subscriber.close()
+        self.dropped += 1
+
+    def subscribe(self, last_event_id: Optional[str] = None) -> Subscriber:
+        """Nouveau client; avec last_event_id, les événements manqués encore en mémoire sont renvoyés"""
+        subscriber = Subscriber(self.buffer_size)
+        boot, _, number = (last_event_id or "").rpartition("-")
+        try:
+            last_id = int(number) if boot == self._boot else None
+        except ValueError:
+            last_id = None
+        # Identifiant d'une autre exécution du bot ou inconnu: pas de reprise
+        if last_id is not None and last_id < self._next_id:
+            missed = [message for event_id, message in self._history if event_id > last_id]
+            for message in missed[-self.buffer_size:]:
+                subscriber.queue.put_nowait(message)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    def close_all(self):
+        for subscriber in list(self._subscribers):
+            self._subscribers.discard(subscriber)
+            subscriber.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+            "last_event_id": self.format_id(self._next_id - 1) if self._next_id > 1 else None
+        }
@@ -1,32 +1,60 @@
 
+import logging
 import os
 import yaml
 import re
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-from openpyxl import load_workbook
+from typing import Dict, Any, Iterable, Optional, List, Sequence
+from excel_prediction_store import ExcelPredictionStore, MAX_NUMERO, STATUS_PENDING
+from snapshot_manager import SnapshotManager
+
+logger = logging.getLogger(__name__)
 
 class ExcelPredictionManager:
-    def __init__(self):
-        self.predictions_file = "excel_predictions.yaml"
-        self.predictions = {}  # {key: {numero, date_heure, victoire, launched, message_id, channel_id}}
+    def __init__(self, autoload: bool = True, predictions_file: str = "excel_predictions.yaml",
+                 snapshots_dir: str = "data/snapshots/excel_predictions"):
+        self.predictions_file = predictions_file
+        self.store = ExcelPredictionStore()  # Tableaux indexés par numéro de jeu
         self.last_launched_numero = None  # Dernier numéro lancé pour éviter les consécutifs
-        self.load_predictions()
+        self.snapshots = SnapshotManager(snapshots_dir)
+        if autoload:
+            self.load_predictions()
+
+    @property
+    def predictions(self) -> Dict[str, Dict[str, Any]]:
+        """Vue dictionnaire {str(numero): prédiction} reconstruite depuis le stockage (copie)"""
+        return self.store.to_dict()
 
     def backup_predictions(self) -> bool:
-        """Create a backup of current predictions before replacing"""
+        """Programme un instantané compressé des prédictions actuelles avant remplacement"""
         try:
-            if os.path.exists(self.predictions_file):
-                backup_name = f"excel_predictions_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yaml"
-                import shutil
-                shutil.copy2(self.predictions_file, backup_name)
-                print(f"✅ Backup créé: {backup_name}")
-                return True
-            return False
+            if len(self.store) == 0:
+                return False
+            # Le stockage actuel est remplacé (jamais modifié) après l'appel:
+            # il peut être sérialisé en arrière-plan sans copie
+            current_store = self.store
+            self.snapshots.submit(current_store.to_dict)
+            logger.info("✅ Backup programmé (%s prédictions)", len(current_store))
+            return True
         except Exception as e:
-            print(f"❌ Erreur création backup: {e}")
+            logger.error("❌ Erreur création backup: %s", e)
             return False
 
+    def list_backups(self) -> List[Dict[str, Any]]:
+        """Liste les instantanés disponibles, du plus récent au plus ancien"""
+        return self.snapshots.list_snapshots()
+
+    def restore_backup(self, ref: str = "latest") -> Dict[str, Any]:
+        """Restaure les prédictions depuis un instantané ('latest' ou empreinte)"""
+        try:
+            self.snapshots.flush()
+            self.store = ExcelPredictionStore.from_dict(self.snapshots.load(ref))
+            self.last_launched_numero = None
+            self.save_predictions()
+            return {"success": True, **self.store.stats()}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
     def import_excel(self, file_path: str, replace_mode: bool = True) -> Dict[str, Any]:
         """
         Importer un fichier Excel avec option de remplacement automatique
@@ -36,17 +64,36 @@ class ExcelPredictionManager:
             replace_mode: Si True, remplace toutes les prédictions (avec backup automatique)
                          Si False, fusionne avec les prédictions existantes
         """
+        from openpyxl import load_workbook  # Chargé au premier import (démarrage plus rapide)
+
         try:
             workbook = load_workbook(file_path, data_only=True)
             sheet = workbook.active
+            return self.import_records(sheet.iter_rows(min_row=2, values_only=True), replace_mode)
 
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def import_records(self, rows: Iterable[Sequence[Any]], replace_mode: bool = True) -> Dict[str, Any]:
+        """
+        Importe des lignes (Date & Heure, Numéro, Victoire) déjà en mémoire
+        Mêmes règles que l'import Excel (filtre des consécutifs, backup en mode remplacement):
+        utilisé pour transmettre directement les résultats du Projet 1 au Projet 2.
+        Les numéros hors de 0..MAX_NUMERO sont ignorés (comptés dans "out_of_range").
+        """
+        try:
             imported_count = 0
             skipped_count = 0
             consecutive_skipped = 0
-            predictions = {}
+            out_of_range = 0
+            predictions = ExcelPredictionStore()
             last_numero = None
+            imported_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-            for row in sheet.iter_rows(min_row=2, values_only=True):
+            for row in rows:
                 if not row[0] or not row[1] or not row[2]:
                     continue
 
@@ -62,10 +109,12 @@ class ExcelPredictionManager:
                 numero_int = int(numero)
                 victoire_type = str(victoire).strip()
 
-                prediction_key = f"{numero_int}"
+                if not 0 <= numero_int <= MAX_NUMERO:
+                    out_of_range += 1
+                    continue
 
                 # Vérifier si déjà lancé (seulement en mode fusion)
-                if not replace_mode and prediction_key in self.predictions and self.predictions[prediction_key].get("launched"):
+                if not replace_mode and self.store.is_launched(numero_int):
                     skipped_count += 1
                     continue
 
@@ -73,44 +122,41 @@ class ExcelPredictionManager:
                 # Ex: Si on a 56, on ignore 57, mais on garde 59
                 if last_numero is not None and numero_int == last_numero + 1:
                     consecutive_skipped += 1
-                    print(f"⚠️ Numéro {numero_int} IGNORÉ À L'IMPORT (consécutif à {last_numero})")
+                    logger.debug("⚠️ Numéro %s IGNORÉ À L'IMPORT (consécutif à %s)", numero_int, last_numero)
                     # NE PAS mémoriser ce numéro comme last_numero
                     # On continue avec l'ancien last_numero pour détecter le prochain consécutif
                     continue
 
-                predictions[prediction_key] = {
-                    "numero": numero_int,
-                    "date_heure": date_str,
-                    "victoire": victoire_type,
-                    "launched": False,
-                    "message_id": None,
-                    "channel_id": None,
-                    "imported_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                }
+                predictions.put(numero_int, date_str, victoire_type, imported_at)
                 imported_count += 1
                 last_numero = numero_int  # Mémoriser UNIQUEMENT les numéros NON consécutifs
 
             # MODE REMPLACEMENT : Créer backup puis remplacer
             old_count = 0
             if replace_mode:
-                old_count = len(self.predictions)
+                old_count = len(self.store)
                 if old_count > 0:
                     self.backup_predictions()
-                    print(f"🔄 REMPLACEMENT: {old_count} anciennes prédictions → {imported_count} nouvelles prédictions")
-                self.predictions = predictions  # REMPLACER complètement
+                    logger.info("🔄 REMPLACEMENT: %s anciennes prédictions → %s nouvelles prédictions", old_count, imported_count)
+                self.store = predictions  # REMPLACER complètement
             else:
                 # MODE FUSION : Ajouter aux prédictions existantes
-                self.predictions.update(predictions)
-                print(f"➕ FUSION: {imported_count} prédictions ajoutées")
+                for numero in predictions.iter_pending():
+                    pred = predictions.get(numero)
+                    self.store.put(numero, pred["date_heure"], pred["victoire"], pred["imported_at"])
+                logger.info("➕ FUSION: %s prédictions ajoutées", imported_count)
 
             self.save_predictions()
+            if out_of_range:
+                logger.warning("⚠️ %s numéros hors limites ignorés à l'import (maximum %s)", out_of_range, MAX_NUMERO)
 
             return {
                 "success": True,
                 "imported": imported_count,
                 "skipped": skipped_count,
                 "consecutive_skipped": consecutive_skipped,
-                "total": len(self.predictions),
+                "out_of_range": out_of_range,
+                "total": len(self.store),
                 "mode": "remplacement" if replace_mode else "fusion",
                 "old_count": old_count if replace_mode else None
             }
@@ -124,10 +170,19 @@ class ExcelPredictionManager:
     def save_predictions(self):
         try:
             with open(self.predictions_file, "w", encoding="utf-8") as f:
-                yaml.dump(self.predictions, f, allow_unicode=True, default_flow_style=False)
-            print(f"✅ Prédictions Excel sauvegardées: {len(self.predictions)} entrées")
+                yaml.dump(self.store.to_dict(compact=True), f, allow_unicode=True, default_flow_style=False)
+            logger.debug("✅ Prédictions Excel sauvegardées: %s entrées", len(self.store))
         except Exception as e:
-            print(f"❌ Erreur sauvegarde prédictions: {e}")
+            logger.error("❌ Erreur sauvegarde prédictions: %s", e)
+
+    def export_state(self) -> Dict[str, Any]:
+        """État en mémoire pour l'instantané de redémarrage"""
+        return {"store": self.store, "last_launched_numero": self.last_launched_numero}
+
+    def import_state(self, state: Dict[str, Any]):
+        """Restaure l'état en mémoire depuis un instantané (sans relire le YAML)"""
+        self.store = state["store"]
+        self.last_launched_numero = state.get("last_launched_numero")
 
     def _save_predictions(self):
         """Alias pour compatibilité avec main.py"""
@@ -137,14 +192,14 @@ class ExcelPredictionManager:
         try:
             if os.path.exists(self.predictions_file):
                 with open(self.predictions_file, "r", encoding="utf-8") as f:
-                    self.predictions = yaml.safe_load(f) or {}
-                print(f"✅ Prédictions chargées: {len(self.predictions)} entrées")
+                    self.store = ExcelPredictionStore.from_dict(yaml.safe_load(f) or {})
+                logger.info("✅ Prédictions chargées: %s entrées", len(self.store))
             else:
-                self.predictions = {}
-                print("ℹ️ Aucun fichier de prédictions Excel existant")
+                self.store = ExcelPredictionStore()
+                logger.info("ℹ️ Aucun fichier de prédictions Excel existant")
         except Exception as e:
-            print(f"❌ Erreur chargement prédictions: {e}")
-            self.predictions = {}
+            logger.error("❌ Erreur chargement prédictions: %s", e)
+            self.store = ExcelPredictionStore()
 
     def find_close_prediction(self, current_number: int, tolerance: int = 4):
         """
@@ -155,49 +210,119 @@ class ExcelPredictionManager:
         """
         try:
             closest_pred = None
-            min_diff = float('inf')
 
-            for key, pred in self.predictions.items():
-                if pred["launched"]:
+            # Accès direct aux numéros de la fenêtre [current, current + tolérance]
+            # (le plus petit écart est rencontré en premier)
+            for pred_numero in range(max(current_number, 0), current_number + tolerance + 1):
+                if self.store.status(pred_numero) != STATUS_PENDING:
                     continue
 
-                pred_numero = pred["numero"]
-                # Calculer la différence: pred_numero - current_number
-                # Si canal=879 et pred=881, diff=+2 (canal est 2 parties AVANT)
                 diff = pred_numero - current_number
 
-                # Vérifier si le canal source est entre 0 et 4 parties AVANT le numéro cible
-                if 0 <= diff <= tolerance:
-                    # FILTRE PRINCIPAL: Vérifier si ce n'est pas un numéro consécutif du dernier prédit
-                    if self.last_launched_numero and pred_numero == self.last_launched_numero + 1:
-                        print(f"⚠️ Numéro {pred_numero} IGNORÉ AU LANCEMENT (consécutif à {self.last_launched_numero})")
-                        # Marquer comme lancé pour éviter de le relancer plus tard
-                        pred["launched"] = True
-                        pred["skipped_consecutive"] = True
-                        self.save_predictions()
-                        continue
-
-                    # Garder la prédiction la plus proche (priorité au plus petit écart)
-                    if diff < min_diff:
-                        min_diff = diff
-                        closest_pred = {"key": key, "prediction": pred}
-                        print(f"✅ Prédiction trouvée: #{pred_numero} (canal #{current_number}, écart +{diff})")
+                # FILTRE PRINCIPAL: Vérifier si ce n'est pas un numéro consécutif du dernier prédit
+                if self.last_launched_numero and pred_numero == self.last_launched_numero + 1:
+                    logger.info("⚠️ Numéro %s IGNORÉ AU LANCEMENT (consécutif à %s)", pred_numero, self.last_launched_numero)
+                    # Marquer comme lancé pour éviter de le relancer plus tard
+                    self.store.mark_skipped(pred_numero)
+                    self.save_predictions()
+                    continue
+
+                if closest_pred is None:
+                    closest_pred = {"key": str(pred_numero), "prediction": self.store.get(pred_numero)}
+                    logger.debug("✅ Prédiction trouvée: #%s (canal #%s, écart +%s)", pred_numero, current_number, diff)
 
             return closest_pred
         except Exception as e:
-            print(f"Erreur find_close_prediction: {e}")
+            logger.error("Erreur find_close_prediction: %s", e)
             return None
 
     def mark_as_launched(self, key: str, message_id: int, channel_id: int):
         """Marque une prédiction comme lancée"""
-        if key in self.predictions:
-            self.predictions[key]["launched"] = True
-            self.predictions[key]["message_id"] = message_id
-            self.predictions[key]["channel_id"] = channel_id
-            self.predictions[key]["current_offset"] = 0  # Commence avec offset 0
-            self.last_launched_numero = self.predictions[key]["numero"]
+        numero = int(key)
+        if numero in self.store:
+            self.store.mark_launched(numero, message_id, channel_id)  # Commence avec offset 0
+            self.last_launched_numero = numero
             self.save_predictions()
 
+    def get_active_predictions(self) -> List[Dict[str, Any]]:
+        """Prédictions lancées dont la vérification est en cours"""
+        return [self.store.get(numero) for numero in self.store.iter_active()]
+
+    def mark_completed(self, numero: int, final_status: str):
+        """Termine une prédiction lancée avec son statut final"""
+        self.store.mark_completed(numero, final_status)
+        self.save_predictions()
+
+    def set_current_offset(self, numero: int, offset: int):
+        """Met à jour l'offset de vérification d'une prédiction lancée"""
+        self.store.set_offset(numero, offset)
+        self.save_predictions()
+
+    @staticmethod
+    def format_prediction(numero: int, victoire: str, status: str = "⏳") -> str:
+        """Format: 🔵1417 👗 𝐕𝟏👗 statut: ⏳"""
+        victoire_text = "𝐕𝟏" if str(victoire).lower() == "joueur" else "𝐕𝟐"
+        return f"🔵{numero} 👗 {victoire_text}👗 statut: {status}"
+
+    def plan_actions(self, game_number: int, message_text: str, display_channel: int) -> List[Dict[str, Any]]:
+        """
+        Vérifie les prédictions lancées et cherche la prédiction à lancer pour ce numéro de jeu.
+        Retourne les envois Telegram à effectuer, sans les effectuer:
+        - {"action": "edit", "chat", "message_id", "text", "numero", "status"}: mise à jour d'une prédiction
+        - {"action": "send", "chat", "text", "key", "numero", "victoire"}: lancement d'une prédiction
+        Les passages d'offset et les échecs définitifs sont appliqués immédiatement; les envois
+        réussis sont appliqués ensuite avec apply_action (une prédiction non envoyée est retentée).
+        """
+        actions = []
+        for pred in self.get_active_predictions():
+            predicted_numero = pred["numero"]
+            expected_winner = pred["victoire"]
+            current_offset = pred.get("current_offset", 0)
+
+            status, should_continue = self.verify_excel_prediction(
+                game_number, message_text, predicted_numero, expected_winner, current_offset
+            )
+
+            if status:
+                message_id = pred.get("message_id")
+                channel_id = pred.get("channel_id")
+                if message_id and channel_id:
+                    actions.append({
+                        "action": "edit",
+                        "chat": channel_id,
+                        "message_id": message_id,
+                        "text": self.format_prediction(predicted_numero, expected_winner, status),
+                        "numero": predicted_numero,
+                        "status": status
+                    })
+            elif not should_continue:
+                if current_offset < 2:
+                    self.set_current_offset(predicted_numero, current_offset + 1)
+                    logger.info("⏭️ Prédiction #%s: passage à l'offset %s", predicted_numero, current_offset + 1)
+                else:
+                    self.mark_completed(predicted_numero, "⭕✍🏻")
+                    logger.info("🏁 Prédiction #%s marquée comme échec définitif après offset 2", predicted_numero)
+
+        close_pred = self.find_close_prediction(game_number, tolerance=4)
+        if close_pred:
+            prediction = close_pred["prediction"]
+            actions.append({
+                "action": "send",
+                "chat": display_channel,
+                "text": self.format_prediction(prediction["numero"], prediction["victoire"]),
+                "key": close_pred["key"],
+                "numero": prediction["numero"],
+                "victoire": prediction["victoire"]
+            })
+        return actions
+
+    def apply_action(self, action: Dict[str, Any], message_id: Optional[int] = None):
+        """Enregistre un envoi réussi (message_id: message publié pour un lancement)"""
+        if action["action"] == "edit":
+            self.mark_completed(action["numero"], action["status"])
+        elif action["action"] == "send":
+            self.mark_as_launched(action["key"], message_id, action["chat"])
+
     def extract_points_and_winner(self, message_text: str):
         """
         Extrait les points et détermine le gagnant à partir du message
@@ -236,7 +361,7 @@ class ExcelPredictionManager:
 
             return None, None
         except Exception as e:
-            print(f"Erreur extraction points: {e}")
+            logger.error("Erreur extraction points: %s", e)
             return None, None
 
     def verify_excel_prediction(self, game_number: int, message_text: str, predicted_numero: int, expected_winner: str, current_offset: int):
@@ -261,17 +386,17 @@ class ExcelPredictionManager:
 
             # Si le jeu est avant la prédiction, continuer à attendre (ne pas arrêter)
             if real_offset_from_game < 0:
-                print(f"⏭️ Jeu #{game_number} est AVANT la prédiction #{predicted_numero} - on continue d'attendre")
+                logger.debug("⏭️ Jeu #%s est AVANT la prédiction #%s - on continue d'attendre", game_number, predicted_numero)
                 return None, True
 
             # Si l'offset est trop grand, c'est un échec définitif
             if real_offset_from_game > 2:
-                print(f"❌ Prédiction Excel #{predicted_numero}: offset {real_offset_from_game} > 2, échec définitif")
+                logger.info("❌ Prédiction Excel #%s: offset %s > 2, échec définitif", predicted_numero, real_offset_from_game)
                 return '⭕✍🏻', False
 
             # Vérifier que l'offset passé correspond à l'offset réel
             if current_offset != real_offset_from_game:
-                print(f"⚠️ Incohérence offset: current_offset={current_offset}, real={real_offset_from_game}")
+                logger.debug("⚠️ Incohérence offset: current_offset=%s, real=%s", current_offset, real_offset_from_game)
                 # Utiliser l'offset réel calculé
                 current_offset = real_offset_from_game
 
@@ -283,11 +408,11 @@ class ExcelPredictionManager:
                 return None, True
 
             # C'est notre numéro cible, vérifier le résultat
-            print(f"🔍 Vérification Excel #{predicted_numero} sur offset interne {current_offset} (numéro {game_number})")
+            logger.debug("🔍 Vérification Excel #%s sur offset interne %s (numéro %s)", predicted_numero, current_offset, game_number)
 
             # Vérifier si le message contient un résultat valide
             if not any(tag in message_text for tag in ["✅", "🔰"]):
-                print(f"⚠️ Message sans tag de résultat, on continue")
+                logger.debug("⚠️ Message sans tag de résultat, on continue")
                 return None, True
 
             # Extraire les points
@@ -296,11 +421,11 @@ class ExcelPredictionManager:
             if joueur_point is None or banquier_point is None:
                 # Si c'est une incohérence critique (✅ mal placé), marquer comme échec
                 if '✅' in message_text and not '🔰' in message_text:
-                    print(f"❌ CRITIQUE: Message avec ✅ incohérent - échec de la prédiction #{predicted_numero}")
+                    logger.warning("❌ CRITIQUE: Message avec ✅ incohérent - échec de la prédiction #%s", predicted_numero)
                     return '⭕✍🏻', False
                 else:
                     # Sinon, continuer à attendre (peut-être un message incomplet)
-                    print(f"⚠️ Impossible d'extraire les points, on continue")
+                    logger.debug("⚠️ Impossible d'extraire les points, on continue")
                     return None, True
 
             # Déterminer le gagnant réel selon les points
@@ -310,25 +435,24 @@ class ExcelPredictionManager:
                 actual_winner = "banquier"
             else:
                 # Match nul - traiter comme échec pour les prédictions
-                print(f"⚠️ Match nul détecté (J:{joueur_point} = B:{banquier_point}), passage à offset suivant")
+                logger.debug("⚠️ Match nul détecté (J:%s = B:%s), passage à offset suivant", joueur_point, banquier_point)
                 return None, True
 
             # Comparer avec le gagnant attendu
             expected = "banquier" if "banquier" in expected_winner.lower() else "joueur"
 
-            print(f"📊 Points: Joueur={joueur_point}, Banquier={banquier_point} → Gagnant réel: {actual_winner}, Attendu: {expected}")
+            logger.debug("📊 Points: Joueur=%s, Banquier=%s → Gagnant réel: %s, Attendu: %s", joueur_point, banquier_point, actual_winner, expected)
 
             if actual_winner != expected:
-                print(f"❌ Offset {current_offset}: gagnant incorrect - passage à offset suivant")
+                logger.debug("❌ Offset %s: gagnant incorrect - passage à offset suivant", current_offset)
                 return None, True
 
             # ✅ SUCCÈS ! L'offset est simplement la différence entre le jeu actuel et le jeu prédit
             real_offset = game_number - predicted_numero
 
-            print(f"✅ Prédiction Excel #{predicted_numero} réussie sur jeu #{game_number}")
-            print(f"   Points: Joueur={joueur_point}, Banquier={banquier_point}")
-            print(f"   Gagnant réel: {actual_winner}, Attendu: {expected}")
-            print(f"   Offset: {real_offset}")
+            logger.info("✅ Prédiction Excel #%s réussie sur jeu #%s (Joueur=%s, Banquier=%s, gagnant réel: %s, "
+                        "attendu: %s, offset %s)", predicted_numero, game_number, joueur_point, banquier_point,
+                        actual_winner, expected, real_offset)
 
             if real_offset == 0:
                 return '✅0️⃣', False
@@ -341,7 +465,7 @@ class ExcelPredictionManager:
                 return '✅2️⃣', False
 
         except Exception as e:
-            print(f"Erreur verify_excel_prediction: {e}")
+            logger.error("Erreur verify_excel_prediction: %s", e)
             return None, True
 
     def get_prediction_format(self, victoire: str) -> str:
@@ -356,28 +480,19 @@ class ExcelPredictionManager:
 
     def get_pending_predictions(self) -> List[Dict[str, Any]]:
         pending = []
-        for key, pred in self.predictions.items():
-            if not pred["launched"]:
-                pending.append({
-                    "key": key,
-                    "numero": pred["numero"],
-                    "victoire": pred["victoire"],
-                    "date_heure": pred["date_heure"]
-                })
-        return sorted(pending, key=lambda x: x["numero"])
+        for numero in self.store.iter_pending():
+            pending.append({
+                "key": str(numero),
+                "numero": numero,
+                "victoire": self.store.victoire(numero),
+                "date_heure": self.store.get(numero)["date_heure"]
+            })
+        return pending
 
     def get_stats(self) -> Dict[str, int]:
-        total = len(self.predictions)
-        launched = sum(1 for p in self.predictions.values() if p["launched"])
-        pending = total - launched
-
-        return {
-            "total": total,
-            "launched": launched,
-            "pending": pending
-        }
+        return self.store.stats()
 
     def clear_predictions(self):
-        self.predictions = {}
+        self.store.clear()
         self.save_predictions()
-        print("🗑️ Toutes les prédictions Excel ont été effacées")
+        logger.info("🗑️ Toutes les prédictions Excel ont été effacées")
@@ -0,0 +1,247 @@
+"""
+Stockage compact des prédictions Excel (Projet 2)
+Les prédictions sont indexées directement par numéro de jeu dans des tableaux:
+statut (octets), gagnant (bits), message_id / channel_id (entiers 64 bits)
+"""
+from array import array
+from typing import Dict, Any, Optional, Iterator, List
+
+
+# Statuts stockés dans le tableau d'octets
+STATUS_EMPTY = 0       # Aucune prédiction pour ce numéro
+STATUS_PENDING = 1     # Importée, pas encore lancée
+STATUS_LAUNCHED = 2    # Lancée, vérification en cours
+STATUS_SKIPPED = 3     # Ignorée au lancement (numéro consécutif)
+STATUS_COMPLETED = 4   # Vérification terminée (statut final connu)
+
+# Statuts finaux encodés sur un octet (index 0 = aucun)
+FINAL_STATUSES = ['', '✅0️⃣', '✅1️⃣', '✅2️⃣', '✅3️⃣', '⭕✍🏻']
+
+# Capacité initiale: une journée compte environ 1440 parties
+DEFAULT_CAPACITY = 1500
+
+# Plus grand numéro de jeu accepté: les tableaux sont dimensionnés jusqu'au plus grand
+# numéro présent (environ 40 octets par numéro), un numéro aberrant d'un fichier Excel
+# ne doit pas allouer des centaines de mégaoctets
+MAX_NUMERO = 100_000
+
+
+class ExcelPredictionStore:
+    """Tableaux denses indexés par numéro de jeu avec compteurs maintenus"""
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self._capacity = 0
+        self._status = bytearray()
+        self._offset = bytearray()
+        self._final = bytearray()
+        self._winner = bytearray()  # 1 bit par numéro: 1 = Banquier
+        self._message_ids = array('q')
+        self._channel_ids = array('q')
+        self._date_heure: List[Optional[str]] = []
+        self._imported_at: List[Optional[str]] = []
+        self._grow(capacity)
+
+        # Compteurs maintenus à chaque transition de statut
+        self._total = 0
+        self._launched = 0
+        self._low = capacity   # Plus petit numéro présent
+        self._high = -1        # Plus grand numéro présent
+        self._pending_cursor = capacity  # Aucun numéro en attente en dessous
+        self._active = set()   # Numéros lancés non terminés
+
+    def _grow(self, capacity: int):
+        """Agrandit les tableaux pour contenir les numéros < capacity"""
+        extra = capacity - self._capacity
+        if extra <= 0:
+            return
+        self._status.extend(bytes(extra))
+        self._offset.extend(bytes(extra))
+        self._final.extend(bytes(extra))
+        self._winner.extend(bytes((capacity + 7) // 8 - len(self._winner)))
+        self._message_ids.extend([0] * extra)
+        self._channel_ids.extend([0] * extra)
+        self._date_heure.extend([None] * extra)
+        self._imported_at.extend([None] * extra)
+        self._capacity = capacity
+
+    def __len__(self) -> int:
+        return self._total
+
+    def __contains__(self, numero: int) -> bool:
+        return 0 <= numero < self._capacity and self._status[numero] != STATUS_EMPTY
+
+    def status(self, numero: int) -> int:
+        """Retourne le statut brut d'un numéro (STATUS_EMPTY si absent)"""
+        if 0 <= numero < self._capacity:
+            return self._status[numero]
+        return STATUS_EMPTY
+
+    def is_launched(self, numero: int) -> bool:
+        return self.status(numero) >= STATUS_LAUNCHED
+
+    def is_banquier(self, numero: int) -> bool:
+        return bool(self._winner[numero >> 3] & (1 << (numero & 7)))
+
+    def victoire(self, numero: int) -> str:
+        return "Banquier" if self.is_banquier(numero) else "Joueur"
+
+    def put(self, numero: int, date_heure: str, victoire: str, imported_at: str):
+        """Ajoute (ou remplace) une prédiction en attente"""
+        if numero < 0 or numero > MAX_NUMERO:
+            raise ValueError(f"Numéro de jeu invalide: {numero} (0 à {MAX_NUMERO})")
+        if numero >= self._capacity:
+            self._grow(max(numero + 1, self._capacity * 2))
+
+        if self._status[numero] != STATUS_EMPTY:
+            self.remove(numero)
+
+        self._status[numero] = STATUS_PENDING
+        self._offset[numero] = 0
+        self._final[numero] = 0
+        self._message_ids[numero] = 0
+        self._channel_ids[numero] = 0
+        self._date_heure[numero] = date_heure
+        self._imported_at[numero] = imported_at
+
+        victoire_lower = str(victoire).lower()
+        bit = 1 << (numero & 7)
+        if "banquier" in victoire_lower or "banker" in victoire_lower:
+            self._winner[numero >> 3] |= bit
+        else:
+            self._winner[numero >> 3] &= ~bit & 0xFF
+
+        self._total += 1
+        self._low = min(self._low, numero)
+        self._high = max(self._high, numero)
+        self._pending_cursor = min(self._pending_cursor, numero)
+
+    def remove(self, numero: int):
+        """Supprime une prédiction en maintenant les compteurs"""
+        current = self.status(numero)
+        if current == STATUS_EMPTY:
+            return
+        if current >= STATUS_LAUNCHED:
+            self._launched -= 1
+        self._active.discard(numero)
+        self._status[numero] = STATUS_EMPTY
+        self._date_heure[numero] = None
+        self._imported_at[numero] = None
+        self._total -= 1
+
+    def _set_launched_status(self, numero: int, status: int):
+        if self._status[numero] == STATUS_PENDING:
+            self._launched += 1
+        self._status[numero] = status
+
+    def mark_launched(self, numero: int, message_id: Optional[int], channel_id: Optional[int]):
+        """Passe une prédiction à l'état lancé (offset de vérification 0)"""
+        if self.status(numero) == STATUS_EMPTY:
+            return
+        self._set_launched_status(numero, STATUS_LAUNCHED)
+        self._message_ids[numero] = message_id or 0
+        self._channel_ids[numero] = channel_id or 0
+        self._offset[numero] = 0
+        self._active.add(numero)
+
+    def mark_skipped(self, numero: int):
+        """Marque une prédiction comme ignorée (numéro consécutif)"""
+        if self.status(numero) != STATUS_PENDING:
+            return
+        self._set_launched_status(numero, STATUS_SKIPPED)
+
+    def mark_completed(self, numero: int, final_status: str):
+        """Termine la vérification d'une prédiction lancée"""
+        if self.status(numero) == STATUS_EMPTY:
+            return
+        self._set_launched_status(numero, STATUS_COMPLETED)
+        self._final[numero] = FINAL_STATUSES.index(final_status) if final_status in FINAL_STATUSES else 0
+        self._active.discard(numero)
+
+    def set_offset(self, numero: int, offset: int):
+        if self.status(numero) != STATUS_EMPTY:
+            self._offset[numero] = offset
+
+    def iter_pending(self) -> Iterator[int]:
+        """Parcourt les numéros en attente dans l'ordre croissant (sans tri)"""
+        status = self._status
+        numero = self._pending_cursor
+        # Avancer le curseur au-delà des numéros déjà lancés
+        while numero <= self._high and status[numero] != STATUS_PENDING:
+            numero += 1
+        self._pending_cursor = numero
+        while numero <= self._high:
+            if status[numero] == STATUS_PENDING:
+                yield numero
+            numero += 1
+
+    def iter_active(self) -> List[int]:
+        """Numéros lancés dont la vérification n'est pas terminée"""
+        return sorted(self._active)
+
+    def get(self, numero: int) -> Optional[Dict[str, Any]]:
+        """Reconstruit la vue dictionnaire d'une prédiction"""
+        status = self.status(numero)
+        if status == STATUS_EMPTY:
+            return None
+
+        pred = {
+            "numero": numero,
+            "date_heure": self._date_heure[numero],
+            "victoire": self.victoire(numero),
+            "launched": status >= STATUS_LAUNCHED,
+            "message_id": self._message_ids[numero] or None,
+            "channel_id": self._channel_ids[numero] or None,
+            "imported_at": self._imported_at[numero]
+        }
+        if status in (STATUS_LAUNCHED, STATUS_COMPLETED):
+            pred["current_offset"] = self._offset[numero]
+        if status == STATUS_SKIPPED:
+            pred["skipped_consecutive"] = True
+        if status == STATUS_COMPLETED:
+            pred["completed"] = True
+            pred["final_status"] = FINAL_STATUSES[self._final[numero]]
+        return pred
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "total": self._total,
+            "launched": self._launched,
+            "pending": self._total - self._launched
+        }
+
+    def clear(self):
+        self.__init__(self._capacity)
+
+    def to_dict(self, compact: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Format de persistance YAML (clé = str(numéro))
+        compact: omet les champs vides et les valeurs par défaut (forme minimale sur disque)
+        """
+        result = {}
+        for numero in range(max(self._low, 0), self._high + 1):
+            if self._status[numero] != STATUS_EMPTY:
+                pred = self.get(numero)
+                if compact:
+                    pred = {key: value for key, value in pred.items()
+                            if value is not None and value is not False
+                            and not (key == "current_offset" and value == 0)}
+                result[str(numero)] = pred
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, Any]]) -> 'ExcelPredictionStore':
+        """Reconstruit le stockage depuis le format YAML (ancien ou nouveau)"""
+        store = cls()
+        for pred in (data or {}).values():
+            numero = int(pred["numero"])
+            if not 0 <= numero <= MAX_NUMERO:
+                continue  # Fichier écrit avant la limite: numéro aberrant ignoré
+            store.put(numero, pred.get("date_heure"), pred.get("victoire", ""), pred.get("imported_at"))
+            if pred.get("skipped_consecutive"):
+                store.mark_skipped(numero)
+            elif pred.get("launched"):
+                store.mark_launched(numero, pred.get("message_id"), pred.get("channel_id"))
+                store.set_offset(numero, pred.get("current_offset", 0))
+                if pred.get("completed"):
+                    store.mark_completed(numero, pred.get("final_status", ""))
+        return store
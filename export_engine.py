@@ -0,0 +1,221 @@
+"""
+Moteur d'export des résultats en flux
+Les lignes sont consommées depuis un générateur et écrites au fur et à mesure:
+- xlsx: mode write-only d'openpyxl avec styles nommés partagés
+- csv: séparateur ';' avec BOM UTF-8 (ouverture directe dans Excel)
+- ndjson: un objet JSON par ligne
+La mémoire reste constante quel que soit le nombre de lignes.
+"""
+import csv
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXPORT_HEADERS = ["Date & Heure", "Numéro", "Victoire (Joueur/Banquier)"]
+NDJSON_KEYS = ["date_heure", "numero", "victoire"]
+COLUMN_WIDTHS = {"A": 25, "B": 15, "C": 30}
+EMPTY_MESSAGE = "Aucun résultat enregistré."
+
+EXPORT_FORMATS = ("xlsx", "csv", "ndjson")
+
+Row = Tuple[str, str, str]
+
+
+def _peek(rows: Iterable[Row]) -> Tuple[Optional[Row], Iterator[Row]]:
+    """Retourne la première ligne et un itérateur sur toutes les lignes"""
+    iterator = iter(rows)
+    first = next(iterator, None)
+    if first is None:
+        return None, iterator
+    return first, chain([first], iterator)
+
+
+class ResultsExporter:
+    """Écrit des lignes (Date & Heure, Numéro, Victoire) dans le format demandé"""
+
+    def export(self, rows: Iterable[Row], file_path: str, fmt: str = "xlsx") -> str:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format d'export inconnu: {fmt} (formats: {', '.join(EXPORT_FORMATS)})")
+        writer = getattr(self, f"_write_{fmt}")
+        writer(rows, file_path)
+        return file_path
+
+    def append(self, rows: Iterable[Row], file_path: str, fmt: str) -> str:
+        """Ajoute des lignes en fin de fichier (csv / ndjson uniquement)"""
+        if fmt == "csv":
+            with open(file_path, "a", encoding="utf-8", newline="") as f:
+                csv.writer(f, delimiter=";").writerows(rows)
+        elif fmt == "ndjson":
+            with open(file_path, "a", encoding="utf-8") as f:
+                self._write_ndjson_lines(rows, f)
+        else:
+            raise ValueError(f"Ajout incrémental impossible pour le format {fmt}")
+        return file_path
+
+    @staticmethod
+    def _named_styles():
+        from openpyxl.styles import NamedStyle, Font, Alignment, PatternFill, Border, Side
+
+        side = Side(style="thin")
+        border = Border(left=side, right=side, top=side, bottom=side)
+
+        header = NamedStyle(name="resultats_entete")
+        header.font = Font(bold=True, size=12)
+        header.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
+        header.alignment = Alignment(horizontal="center", vertical="center")
+        header.border = border
+
+        left = NamedStyle(name="resultats_gauche")
+        left.alignment = Alignment(horizontal="left")
+        left.border = border
+
+        center = NamedStyle(name="resultats_centre")
+        center.alignment = Alignment(horizontal="center")
+        center.border = border
+
+        empty = NamedStyle(name="resultats_vide")
+        empty.alignment = Alignment(horizontal="center")
+
+        return header, left, center, empty
+
+    def _write_xlsx(self, rows: Iterable[Row], file_path: str):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Résultats")
+
+        header_style, left_style, center_style, empty_style = self._named_styles()
+        for style in (header_style, left_style, center_style, empty_style):
+            wb.add_named_style(style)
+
+        # Largeur des colonnes (doit être définie avant la première ligne en mode write-only)
+        for column, width in COLUMN_WIDTHS.items():
+            ws.column_dimensions[column].width = width
+
+        # Styles nommés enregistrés une seule fois dans le classeur: chaque cellule n'y fait référence
+        # que par son nom (API publique d'openpyxl)
+        def styled(value, style_name):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style_name
+            return cell
+
+        ws.append([styled(header, header_style.name) for header in EXPORT_HEADERS])
+
+        first, rows = _peek(rows)
+        if first is None:
+            ws.append([styled(EMPTY_MESSAGE, empty_style.name)])
+        else:
+            column_styles = (left_style.name, center_style.name, center_style.name)
+            for row in rows:
+                ws.append([styled(value, style) for value, style in zip(row, column_styles)])
+
+        wb.save(file_path)
+
+    def _write_csv(self, rows: Iterable[Row], file_path: str):
+        with open(file_path, "w", encoding="utf-8-sig", newline="") as f:
+            writer = csv.writer(f, delimiter=";")
+            writer.writerow(EXPORT_HEADERS)
+            writer.writerows(rows)
+
+    @staticmethod
+    def _write_ndjson_lines(rows: Iterable[Row], f):
+        dumps = json.dumps
+        for row in rows:
+            f.write(dumps(dict(zip(NDJSON_KEYS, row)), ensure_ascii=False))
+            f.write("\n")
+
+    def _write_ndjson(self, rows: Iterable[Row], file_path: str):
+        with open(file_path, "w", encoding="utf-8") as f:
+            self._write_ndjson_lines(rows, f)
+
+
+class ExportCache:
+    """
+    Fichiers d'export réutilisés tant que le stockage n'a pas changé
+    Chaque (génération, version) du stockage a son propre fichier, jamais modifié une fois
+    renvoyé (un envoi en cours n'est pas affecté par un export suivant):
+    - même version: le fichier existant est renvoyé tel quel
+    - même génération (uniquement des ajouts): csv / ndjson sont copiés puis complétés
+      des seules nouvelles lignes
+    - sinon: le fichier est régénéré
+    Les fichiers des versions précédentes sont supprimés par prune() (compaction).
+    """
+
+    APPENDABLE_FORMATS = ("csv", "ndjson")
+    PATTERN = "resultats_export_*"
+
+    def __init__(self, directory, exporter: Optional[ResultsExporter] = None):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.exporter = exporter or ResultsExporter()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, fmt: str, generation: int, version: int) -> str:
+        return str(self.directory / f"resultats_export_g{generation}_v{version}.{fmt}")
+
+    def get(self, fmt: str, version: int, generation: int, results: List[Dict[str, Any]],
+            row_factory: Callable[[List[Dict[str, Any]]], Iterable[Row]]) -> str:
+        with self._lock:
+            entry = self._entries.get(fmt)
+            path = self.path_for(fmt, generation, version)
+            tmp_path = f"{path}.tmp"
+
+            if entry and os.path.exists(entry["path"]):
+                if entry["version"] == version and entry["generation"] == generation:
+                    logger.debug("♻️ Export %s inchangé, fichier réutilisé: %s", fmt, path)
+                    return path
+
+                if (fmt in self.APPENDABLE_FORMATS and entry["generation"] == generation
+                        and len(results) >= entry["rows"]):
+                    new_rows = results[entry["rows"]:]
+                    shutil.copyfile(entry["path"], tmp_path)
+                    self.exporter.append(row_factory(new_rows), tmp_path, fmt)
+                    os.replace(tmp_path, path)
+                    self._entries[fmt] = {"version": version, "generation": generation,
+                                          "rows": len(results), "path": path}
+                    logger.info("➕ Export %s: %s nouvelle(s) ligne(s) ajoutée(s)", fmt, len(new_rows))
+                    return path
+
+            # Écriture dans un fichier temporaire: aucun fichier incomplet n'est jamais renvoyé
+            self.exporter.export(row_factory(results), tmp_path, fmt)
+            os.replace(tmp_path, path)
+            self._entries[fmt] = {"version": version, "generation": generation, "rows": len(results), "path": path}
+            logger.info("✅ Export %s régénéré: %s (%s lignes)", fmt, path, len(results))
+            return path
+
+    def prune(self, min_age_seconds: float = 3600) -> int:
+        """Supprime les fichiers des versions précédentes (voir prune_exports)"""
+        with self._lock:
+            current = [entry["path"] for entry in self._entries.values()]
+        return prune_exports(self.directory, current, min_age_seconds)
+
+
+def prune_exports(directory, keep: Iterable[str] = (), min_age_seconds: float = 3600) -> int:
+    """
+    Supprime les fichiers d'export du répertoire, sauf ceux de keep et ceux de moins de
+    min_age_seconds (peut-être en cours d'envoi). Retourne le nombre d'octets libérés.
+    """
+    keep = {str(path) for path in keep}
+    cutoff = time.time() - min_age_seconds
+    reclaimed = 0
+    for path in Path(directory).glob(ExportCache.PATTERN):
+        if str(path) in keep:
+            continue
+        try:
+            stat = path.stat()
+            if stat.st_mtime < cutoff:
+                path.unlink()
+                reclaimed += stat.st_size
+        except OSError as e:
+            logger.warning("⚠️ Suppression de %s impossible: %s", path, e)
+    return reclaimed
@@ -0,0 +1,35 @@
+"""
+Empreintes SHA-256 de fichiers (cache des téléversements, packages de déploiement)
+Le fichier est lu par blocs; l'empreinte est mémorisée par (chemin, mtime_ns, taille):
+un fichier inchangé n'est pas relu.
+"""
+import hashlib
+import os
+from typing import Dict, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileDigests:
+    """Empreintes mémorisées tant que le fichier ne change pas"""
+
+    def __init__(self):
+        # (chemin, mtime_ns, taille) -> empreinte
+        self._digests: Dict[Tuple[str, int, int], str] = {}
+
+    def digest(self, path: str) -> str:
+        """Empreinte SHA-256 du fichier (hexadécimale)"""
+        stat = os.stat(path)
+        stamp = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(stamp)
+        if digest is None:
+            sha = hashlib.sha256()
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                    sha.update(chunk)
+            digest = sha.hexdigest()
+            # Une seule empreinte conservée par chemin
+            for old in [key for key in self._digests if key[0] == stamp[0]]:
+                del self._digests[old]
+            self._digests[stamp] = digest
+        return digest
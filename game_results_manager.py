@@ -2,33 +2,60 @@
 Gestionnaire de résultats de jeux pour le bot Telegram
 Stocke les parties où le premier groupe a exactement 3 cartes différentes
 """
+import logging
 import re
 import yaml
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from export_engine import ResultsExporter, ExportCache
+from stats_aggregator import ResultsStatsAggregator
+
+logger = logging.getLogger(__name__)
 
 
 class GameResultsManager:
     """Gestionnaire pour stocker les résultats des jeux de cartes"""
     
-    def __init__(self):
-        # Répertoire pour stocker les données
-        self.data_dir = Path("data")
-        self.data_dir.mkdir(exist_ok=True)
+    def __init__(self, data_dir: str = "data"):
+        # Répertoire pour stocker les données (un par canal source surveillé)
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
         
         # Fichier de données des résultats
         self.results_file = self.data_dir / "game_results.yaml"
         
+        # Résultats en mémoire (chargés au premier accès ou restaurés depuis un instantané)
+        self._results: Optional[List[Dict[str, Any]]] = None
+        
+        # Compteurs de version du stockage (cache des exports):
+        # version change à chaque modification, generation seulement si les données
+        # ne sont pas un simple ajout en fin de liste (remise à zéro, restauration)
+        self.version = 0
+        self.generation = 0
+        self.export_cache = ExportCache(self.data_dir / "exports")
+        
+        # Statistiques tenues à jour à chaque enregistrement (lecture en O(1))
+        self.stats = ResultsStatsAggregator()
+        
         # Initialiser le fichier s'il n'existe pas
         if not self.results_file.exists():
             self._save_yaml([])
         
-        print("✅ Gestionnaire de résultats initialisé")
+        logger.info("✅ Gestionnaire de résultats initialisé")
     
     def _load_yaml(self) -> List[Dict[str, Any]]:
+        """Retourne les résultats en mémoire (lecture du fichier YAML au premier accès)"""
+        if self._results is None:
+            self._results = self._read_results_file()
+            self.stats.rebuild(self._results)
+        return self._results
+    
+    def reload(self):
+        """Relit les résultats depuis le fichier YAML (ignore l'état en mémoire)"""
+        self.import_state(self._read_results_file())
+    
+    def _read_results_file(self) -> List[Dict[str, Any]]:
         """Charge les résultats depuis le fichier YAML"""
         try:
             if self.results_file.exists():
@@ -37,16 +64,42 @@ class GameResultsManager:
                     return data if isinstance(data, list) else []
             return []
         except Exception as e:
-            print(f"❌ Erreur chargement résultats: {e}")
+            logger.error("❌ Erreur chargement résultats: %s", e)
             return []
     
     def _save_yaml(self, data: List[Dict[str, Any]]):
-        """Sauvegarde les résultats dans le fichier YAML"""
+        """Remplace et sauvegarde les résultats dans le fichier YAML"""
+        self._results = data
+        self.stats.rebuild(data)
+        self.version += 1
+        self.generation += 1
+        self._write_results_file(data)
+    
+    def _append_result(self, entry: Dict[str, Any]):
+        """Ajoute un résultat en fin de liste et sauvegarde"""
+        results = self._load_yaml()
+        results.append(entry)
+        self.stats.add(entry)
+        self.version += 1
+        self._write_results_file(results)
+    
+    def _write_results_file(self, data: List[Dict[str, Any]]):
         try:
             with open(self.results_file, 'w', encoding='utf-8') as f:
                 yaml.dump(data, f, allow_unicode=True, default_flow_style=False, indent=2)
         except Exception as e:
-            print(f"❌ Erreur sauvegarde résultats: {e}")
+            logger.error("❌ Erreur sauvegarde résultats: %s", e)
+    
+    def export_state(self) -> List[Dict[str, Any]]:
+        """État en mémoire pour l'instantané de redémarrage"""
+        return self._load_yaml()
+    
+    def import_state(self, state: List[Dict[str, Any]]):
+        """Restaure l'état en mémoire depuis un instantané (sans relire le YAML)"""
+        self._results = state if isinstance(state, list) else []
+        self.stats.rebuild(self._results)
+        self.version += 1
+        self.generation += 1
     
     def extract_game_number(self, message: str) -> Optional[int]:
         """Extrait le numéro de jeu du message"""
@@ -63,7 +116,7 @@ class GameResultsManager:
             
             return None
         except Exception as e:
-            print(f"❌ Erreur extraction numéro: {e}")
+            logger.error("❌ Erreur extraction numéro: %s", e)
             return None
     
     def extract_parentheses_groups(self, message: str) -> List[str]:
@@ -235,29 +288,29 @@ class GameResultsManager:
         """
         try:
             # Log du message complet pour debug
-            print(f"📩 Message reçu: {message[:150]}...")
+            logger.debug("📩 Message reçu: %s...", message[:150])
             
             # VÉRIFICATION 1: Le message NE doit PAS être en cours
             if '⏰' in message:
-                print(f"⏰ Message en cours d'édition, attente de finalisation...")
+                logger.debug("⏰ Message en cours d'édition, attente de finalisation...")
                 return False, "Message en cours d'édition (symbole ⏰)"
             
             # VÉRIFICATION 2: Le message NE doit PAS contenir 🔰
             if '🔰' in message:
-                print(f"🔰 Message avec symbole 🔰, on ignore")
+                logger.debug("🔰 Message avec symbole 🔰, on ignore")
                 return False, "Message avec symbole 🔰 (ignoré)"
             
             # VÉRIFICATION 3: Le message doit contenir ✅
             if '✅' not in message:
-                print(f"⚠️ Message non finalisé (pas de ✅)")
+                logger.debug("⚠️ Message non finalisé (pas de ✅)")
                 return False, "Message non finalisé (pas de symbole ✅)"
             
-            print(f"✅ Message finalisé détecté, traitement en cours...")
+            logger.debug("✅ Message finalisé détecté, traitement en cours...")
             
             # Extraire le numéro de jeu
             game_number = self.extract_game_number(message)
             if game_number is None:
-                print(f"❌ Pas de numéro de jeu trouvé dans: {message[:100]}")
+                logger.debug("❌ Pas de numéro de jeu trouvé dans: %s", message[:100])
                 return False, "Pas de numéro de jeu trouvé"
             
             # Charger les résultats existants
@@ -265,7 +318,7 @@ class GameResultsManager:
             
             # Vérifier si ce jeu n'est pas déjà stocké
             if any(r.get('numero') == game_number for r in results):
-                print(f"ℹ️ Jeu #{game_number} déjà enregistré")
+                logger.debug("ℹ️ Jeu #%s déjà enregistré", game_number)
                 return False, f"Jeu #{game_number} déjà enregistré"
             
             # Vérifier les numéros consécutifs contre TOUS les numéros enregistrés
@@ -273,13 +326,13 @@ class GameResultsManager:
                 for result in results:
                     stored_number = result.get('numero', 0)
                     if game_number == stored_number + 1:
-                        print(f"⚠️ Numéro consécutif détecté (numéro {stored_number} déjà enregistré, actuel: {game_number}), message ignoré")
+                        logger.debug("⚠️ Numéro consécutif détecté (numéro %s déjà enregistré, actuel: %s), message ignoré", stored_number, game_number)
                         return False, f"Numéro consécutif ignoré ({stored_number} → {game_number})"
             
             # Extraire les groupes de parenthèses
             groups = self.extract_parentheses_groups(message)
             if len(groups) < 2:
-                print(f"❌ Pas assez de groupes de parenthèses: {groups}")
+                logger.debug("❌ Pas assez de groupes de parenthèses: %s", groups)
                 return False, "Pas assez de groupes de parenthèses"
             
             first_group = groups[0]
@@ -289,7 +342,7 @@ class GameResultsManager:
             first_count = self.count_cards(first_group)
             second_count = self.count_cards(second_group)
             
-            print(f"📊 Jeu #{game_number}: Groupe 1 = {first_count} cartes ({first_group}), Groupe 2 = {second_count} cartes ({second_group})")
+            logger.debug("📊 Jeu #%s: Groupe 1 = %s cartes (%s), Groupe 2 = %s cartes (%s)", game_number, first_count, first_group, second_count, second_group)
             
             # Vérifier si chaque groupe a 3 cartes de couleurs différentes
             first_has_different_suits = (first_count == 3) and self.has_different_suits(first_group)
@@ -300,19 +353,19 @@ class GameResultsManager:
             
             if first_has_different_suits and second_has_different_suits:
                 # Les deux ont 3 cartes différentes → on ignore
-                print(f"⚠️ Les deux groupes ont 3 cartes de couleurs différentes, message ignoré")
+                logger.debug("⚠️ Les deux groupes ont 3 cartes de couleurs différentes, message ignoré")
                 return False, "Les deux groupes ont 3 couleurs différentes - pas d'enregistrement"
             elif first_has_different_suits and not second_has_different_suits:
                 # Premier groupe a 3 cartes différentes → Victoire JOUEUR
                 winner = 'Joueur'
-                print(f"🎯 Premier groupe a 3 cartes différentes → Victoire JOUEUR")
+                logger.debug("🎯 Premier groupe a 3 cartes différentes → Victoire JOUEUR")
             elif not first_has_different_suits and second_has_different_suits:
                 # Deuxième groupe a 3 cartes différentes → Victoire BANQUIER
                 winner = 'Banquier'
-                print(f"🎯 Deuxième groupe a 3 cartes différentes → Victoire BANQUIER")
+                logger.debug("🎯 Deuxième groupe a 3 cartes différentes → Victoire BANQUIER")
             else:
                 # Aucun groupe n'a 3 cartes différentes → on ignore
-                print(f"⚠️ Aucun groupe n'a 3 cartes de couleurs différentes, message ignoré")
+                logger.debug("⚠️ Aucun groupe n'a 3 cartes de couleurs différentes, message ignoré")
                 return False, "Aucun groupe avec 3 couleurs différentes"
             
             # Si on arrive ici, on a un gagnant valide
@@ -331,153 +384,118 @@ class GameResultsManager:
             }
             
             # Ajouter et sauvegarder
-            results.append(result_entry)
-            self._save_yaml(results)
+            self._append_result(result_entry)
             
-            print(f"✅ Résultat enregistré: Jeu #{game_number} - Gagnant: {winner} - {date_str} {time_str}")
+            logger.info("✅ Résultat enregistré: Jeu #%s - Gagnant: %s - %s %s", game_number, winner, date_str, time_str)
             return True, f"Jeu #{game_number} enregistré - Gagnant: {winner}"
             
         except Exception as e:
-            print(f"❌ Erreur traitement message: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Erreur traitement message: %s", e)
             return False, f"Erreur: {e}"
     
     def get_all_results(self) -> List[Dict[str, Any]]:
         """Récupère tous les résultats stockés"""
-        return self._load_yaml()
+        return list(self._load_yaml())
+    
+    def reset_results(self):
+        """Vide les résultats (changement de journée ou remise à zéro manuelle)"""
+        self._save_yaml([])
     
     def get_stats(self) -> Dict[str, Any]:
-        """Calcule les statistiques des résultats"""
-        results = self._load_yaml()
+        """Statistiques des résultats (compteurs maintenus à chaque enregistrement, ne pas modifier)"""
+        self._load_yaml()
+        return self.stats.summary()
+    
+    def format_export_row(self, result: Dict[str, Any]) -> Tuple[str, str, str]:
+        """Formate un résultat en ligne d'export: (Date & Heure, Numéro, Victoire)"""
+        # Date et Heure
+        date_str = result.get('date', '')
+        heure_str = result.get('heure', '')
         
-        if not results:
-            return {
-                'total': 0,
-                'joueur_victoires': 0,
-                'banquier_victoires': 0,
-                'taux_joueur': 0.0,
-                'taux_banquier': 0.0
-            }
+        if date_str and heure_str:
+            try:
+                date_parts = date_str.split('-')
+                if len(date_parts) == 3:
+                    formatted_date = f"{date_parts[2]}/{date_parts[1]}/{date_parts[0]}"
+                else:
+                    formatted_date = date_str
+            except:
+                formatted_date = date_str
+            
+            try:
+                heure_parts = heure_str.split(':')
+                if len(heure_parts) >= 2:
+                    formatted_heure = f"{heure_parts[0]}:{heure_parts[1]}"
+                else:
+                    formatted_heure = heure_str
+            except:
+                formatted_heure = heure_str
+            
+            date_heure = f"{formatted_date} - {formatted_heure}"
+        else:
+            date_heure = "N/A"
+        
+        # Numéro
+        numero = result.get('numero', 0)
+        numero_formatted = f"{numero:03d}"
         
-        joueur_wins = sum(1 for r in results if r.get('gagnant') == 'Joueur')
-        banquier_wins = sum(1 for r in results if r.get('gagnant') == 'Banquier')
-        total = len(results)
+        # Gagnant
+        gagnant = result.get('gagnant', 'N/A')
         
-        return {
-            'total': total,
-            'joueur_victoires': joueur_wins,
-            'banquier_victoires': banquier_wins,
-            'taux_joueur': (joueur_wins / total * 100) if total > 0 else 0.0,
-            'taux_banquier': (banquier_wins / total * 100) if total > 0 else 0.0
-        }
+        return date_heure, numero_formatted, gagnant
+    
+    def iter_export_rows(self, results: Optional[List[Dict[str, Any]]] = None) -> Iterator[Tuple[str, str, str]]:
+        """
+        Lignes d'export (mêmes valeurs que les colonnes du fichier Excel)
+        Permet de transmettre la journée au Projet 2 en mémoire, sans écrire ni relire de fichier
+        """
+        if results is None:
+            results = self._load_yaml()
+        for result in results:
+            yield self.format_export_row(result)
+    
+    def storage_snapshot(self) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """(version, generation, copie des résultats) figés pour un export hors de la boucle"""
+        return self.version, self.generation, list(self._load_yaml())
+    
+    def storage_view(self) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """
+        (version, generation, résultats) sans copie: la liste est celle du stockage,
+        en lecture seule et uniquement depuis la boucle d'événements (index de ResultsQueryEngine)
+        """
+        results = self._load_yaml()
+        return self.version, self.generation, results
     
-    def export_to_txt(self, file_path: str = None) -> Optional[str]:
-        """Exporte tous les résultats en fichier Excel"""
+    def export_cached(self, fmt: str = 'xlsx',
+                      snapshot: Optional[Tuple[int, int, List[Dict[str, Any]]]] = None) -> Optional[str]:
+        """
+        Export réutilisant le fichier précédent si rien n'a changé depuis
+        (csv / ndjson: seules les nouvelles lignes sont ajoutées)
+        """
+        try:
+            version, generation, results = snapshot or self.storage_snapshot()
+            return self.export_cache.get(fmt, version, generation, results, self.iter_export_rows)
+        except Exception as e:
+            logger.error("❌ Erreur export %s: %s", fmt, e)
+            return None
+    
+    def export_to_txt(self, file_path: str = None, results: Optional[List[Dict[str, Any]]] = None,
+                      fmt: str = 'xlsx') -> Optional[str]:
+        """
+        Exporte les résultats en fichier Excel (ou CSV / NDJSON selon fmt)
+        results: liste figée à exporter (par défaut, les résultats actuellement stockés)
+        Les lignes sont produites par un générateur et écrites en flux.
+        """
         try:
             # Générer un nom de fichier avec date et heure si non fourni
             if file_path is None:
                 timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-                file_path = f"resultats_{timestamp}.xlsx"
-            
-            results = self._load_yaml()
-            
-            # Créer un nouveau classeur Excel
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Résultats"
-            
-            # Style pour l'en-tête
-            header_font = Font(bold=True, size=12)
-            header_fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-            header_alignment = Alignment(horizontal="center", vertical="center")
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            
-            # En-têtes de colonnes
-            headers = ["Date & Heure", "Numéro", "Victoire (Joueur/Banquier)"]
-            for col_num, header in enumerate(headers, 1):
-                cell = ws.cell(row=1, column=col_num)
-                cell.value = header
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = header_alignment
-                cell.border = border
-            
-            # Largeur des colonnes
-            ws.column_dimensions['A'].width = 25
-            ws.column_dimensions['B'].width = 15
-            ws.column_dimensions['C'].width = 30
-            
-            if not results:
-                # Si pas de résultats
-                cell = ws.cell(row=2, column=1)
-                cell.value = "Aucun résultat enregistré."
-                cell.alignment = Alignment(horizontal="center")
-            else:
-                # Ajouter les données
-                for row_num, result in enumerate(results, 2):
-                    # Date et Heure
-                    date_str = result.get('date', '')
-                    heure_str = result.get('heure', '')
-                    
-                    if date_str and heure_str:
-                        try:
-                            date_parts = date_str.split('-')
-                            if len(date_parts) == 3:
-                                formatted_date = f"{date_parts[2]}/{date_parts[1]}/{date_parts[0]}"
-                            else:
-                                formatted_date = date_str
-                        except:
-                            formatted_date = date_str
-                        
-                        try:
-                            heure_parts = heure_str.split(':')
-                            if len(heure_parts) >= 2:
-                                formatted_heure = f"{heure_parts[0]}:{heure_parts[1]}"
-                            else:
-                                formatted_heure = heure_str
-                        except:
-                            formatted_heure = heure_str
-                        
-                        date_heure = f"{formatted_date} - {formatted_heure}"
-                    else:
-                        date_heure = "N/A"
-                    
-                    # Numéro
-                    numero = result.get('numero', 0)
-                    numero_formatted = f"{numero:03d}"
-                    
-                    # Gagnant
-                    gagnant = result.get('gagnant', 'N/A')
-                    
-                    # Écrire les données
-                    cell_a = ws.cell(row=row_num, column=1)
-                    cell_a.value = date_heure
-                    cell_a.border = border
-                    cell_a.alignment = Alignment(horizontal="left")
-                    
-                    cell_b = ws.cell(row=row_num, column=2)
-                    cell_b.value = numero_formatted
-                    cell_b.border = border
-                    cell_b.alignment = Alignment(horizontal="center")
-                    
-                    cell_c = ws.cell(row=row_num, column=3)
-                    cell_c.value = gagnant
-                    cell_c.border = border
-                    cell_c.alignment = Alignment(horizontal="center")
+                file_path = f"resultats_{timestamp}.{fmt}"
             
-            # Sauvegarder le fichier
-            wb.save(file_path)
-            print(f"✅ Export Excel créé: {file_path}")
+            ResultsExporter().export(self.iter_export_rows(results), file_path, fmt)
+            logger.info("✅ Export %s créé: %s", fmt, file_path)
             return file_path
             
         except Exception as e:
-            print(f"❌ Erreur export Excel: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Erreur export %s: %s", fmt, e)
             return None
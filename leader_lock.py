@@ -0,0 +1,135 @@
+"""
+Élection d'une instance leader (bail SQLite renouvelé par battement de cœur)
+Pendant un déploiement, deux instances partagent brièvement le même répertoire data/:
+seule l'instance qui détient le bail se connecte à Telegram, traite les messages et
+exécute les tâches planifiées. L'autre reste en attente avec son état chargé et
+prend le relais dès que le bail est libéré (arrêt propre) ou expire (arrêt brutal).
+
+Test local: lancer deux fois le bot dans le même répertoire (PORT différent):
+la seconde instance reste en attente jusqu'à l'arrêt de la première.
+"""
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from contextlib import closing
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLease:
+    """Bail nommé dans une base SQLite: un seul détenteur valide à la fois"""
+
+    def __init__(self, path: str = "data/leader.db", name: str = "bot", lease_seconds: float = 15.0,
+                 heartbeat_seconds: Optional[float] = None):
+        self.path = path
+        self.name = name
+        self.lease_seconds = lease_seconds
+        # Renouvellement trois fois par durée de bail: deux battements manqués sont tolérés
+        self.heartbeat_seconds = heartbeat_seconds or lease_seconds / 3
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self.elected_at: Optional[float] = None
+        self.renewed_at: Optional[float] = None
+        self.elections = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self._connect()) as db:
+            db.execute("CREATE TABLE IF NOT EXISTS lease ("
+                       "name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL, acquired_at REAL NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+
+    def try_acquire(self) -> bool:
+        """
+        Prend ou renouvelle le bail s'il est libre, expiré ou déjà détenu (synchrone)
+        Retourne False si une autre instance le détient; lève sqlite3.Error si la base est inaccessible.
+        """
+        now = time.time()
+        db = self._connect()
+        try:
+            db.execute("BEGIN IMMEDIATE")  # Verrou d'écriture: lecture + mise à jour atomiques
+            row = db.execute("SELECT holder, expires_at, acquired_at FROM lease WHERE name = ?",
+                             (self.name,)).fetchone()
+            if row and row[0] != self.holder and row[1] > now:
+                db.execute("ROLLBACK")
+                return False
+            acquired_at = row[2] if row and row[0] == self.holder else now
+            db.execute("INSERT OR REPLACE INTO lease (name, holder, expires_at, acquired_at) VALUES (?, ?, ?, ?)",
+                       (self.name, self.holder, now + self.lease_seconds, acquired_at))
+            db.execute("COMMIT")
+            self.renewed_at = now
+            return True
+        except sqlite3.Error:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def release(self):
+        """Libère le bail (arrêt propre): l'instance en attente le prend au battement suivant"""
+        try:
+            with closing(self._connect()) as db:
+                db.execute("DELETE FROM lease WHERE name = ? AND holder = ?", (self.name, self.holder))
+        except sqlite3.Error as e:
+            logger.error("❌ Erreur libération bail leader: %s", e)
+        self.is_leader = False
+
+    def current_holder(self) -> Optional[Dict[str, Any]]:
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT holder, expires_at, acquired_at FROM lease WHERE name = ?",
+                             (self.name,)).fetchone()
+        if not row or row[1] <= time.time():
+            return None
+        return {"holder": row[0], "expires_at": row[1], "acquired_at": row[2]}
+
+    async def wait_for_leadership(self):
+        """Attend l'obtention du bail (l'instance reste en attente jusque-là)"""
+        while True:
+            try:
+                if await asyncio.to_thread(self.try_acquire):
+                    break
+            except sqlite3.Error as e:
+                logger.error("❌ Erreur bail leader: %s", e)
+            await asyncio.sleep(self.heartbeat_seconds)
+        self.is_leader = True
+        self.elected_at = time.time()
+        self.elections += 1
+
+    async def keep_alive(self, on_lost: Callable[[], Awaitable[None]]):
+        """
+        Renouvelle le bail tant que l'instance est leader.
+        Un bail pris par une autre instance, ou expiré faute de renouvellement (base inaccessible,
+        processus suspendu), appelle on_lost: l'instance doit cesser de traiter et d'envoyer.
+        """
+        while self.is_leader:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                if await asyncio.to_thread(self.try_acquire):
+                    continue
+            except sqlite3.Error as e:
+                logger.error("❌ Erreur renouvellement bail leader: %s", e)
+                if time.time() - (self.renewed_at or 0) < self.lease_seconds:
+                    continue  # Le bail est encore valide: nouvel essai au battement suivant
+            self.is_leader = False
+            await on_lost()
+
+    def info(self) -> Dict[str, Any]:
+        try:
+            current = self.current_holder()
+        except sqlite3.Error:
+            current = None
+        return {
+            "role": "leader" if self.is_leader else "standby",
+            "holder": self.holder,
+            "current_leader": current["holder"] if current else None,
+            "lease_seconds": self.lease_seconds,
+            "elected_at": self.elected_at,
+            "renewed_at": self.renewed_at,
+            "elections": self.elections
+        }
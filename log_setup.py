@@ -0,0 +1,111 @@
+"""
+Journalisation asynchrone du bot
+Les modules écrivent dans leur propre logger (logging.getLogger(__name__)) avec un
+formatage paresseux ("... %s", valeur): le message n'est construit que s'il est émis.
+Le logger racine ne fait que déposer l'enregistrement dans une file (QueueHandler);
+un thread dédié (QueueListener) l'écrit sur la console et dans le fichier journal,
+avec rotation par taille. La boucle asyncio n'attend donc jamais une écriture disque.
+
+Variables d'environnement:
+- LOG_LEVEL: niveau minimal (INFO par défaut, DEBUG pour le détail du traitement des messages)
+- LOG_SAMPLE_EVERY: en DEBUG, un message fréquent sur N est conservé (1 = tous)
+"""
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import Dict, Optional, Tuple
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Échantillonne les messages DEBUG: pour chaque modèle de message (logger + format),
+    seul un enregistrement sur `every` est conservé. Les niveaux INFO et supérieurs passent tous.
+    """
+
+    def __init__(self, every: int = 100):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.DEBUG or self.every == 1:
+            return True
+        key = (record.name, str(record.msg))
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            if count % self.every == 0:
+                return True
+            self.dropped += 1
+            return False
+
+
+def setup_logging(log_file: str = 'bot.log', level: Optional[str] = None, max_bytes: int = 5 * 1024 * 1024,
+                  backup_count: int = 3, sample_every: Optional[int] = None) -> logging.handlers.QueueListener:
+    """Configure le logger racine (à appeler une seule fois au démarrage) et démarre le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    level = (level or os.getenv('LOG_LEVEL') or 'INFO').upper()
+    if sample_every is None:
+        sample_every = int(os.getenv('LOG_SAMPLE_EVERY') or 100)
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(formatter)
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                        encoding='utf-8')
+    file_handler.setFormatter(formatter)
+
+    # File non bornée: un appel de log ne bloque jamais l'appelant
+    records: queue.Queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(records)
+    # Filtre côté appelant: les messages écartés ne sont ni formatés ni mis en file
+    queue_handler.addFilter(SamplingFilter(sample_every))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
+    # Bibliothèques bavardes: leurs détails DEBUG ne sont pas utiles au suivi du bot
+    for name in ('telethon', 'aiohttp.access'):
+        logging.getLogger(name).setLevel(max(root.level, logging.INFO))
+
+    _listener = logging.handlers.QueueListener(records, console, file_handler, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def setup_worker_logging():
+    """
+    Processus de travail (fork): le thread d'écriture du parent n'existe pas dans l'enfant,
+    les messages iraient dans une file jamais vidée. L'enfant écrit directement sur la
+    console, sans toucher au fichier journal dont le parent gère la rotation.
+    """
+    global _listener
+    _listener = None
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(logging.Formatter(LOG_FORMAT))
+    root.addHandler(console)
+
+
+def shutdown_logging():
+    """Vide la file et arrête le thread d'écriture (arrêt du bot)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
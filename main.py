@@ -1,12 +1,13 @@
 # ==================== PROJET 1: Bot de Stockage de Résultats ====================
+import time
+STARTUP_STARTED = time.perf_counter()  # Rapport de démarrage: durée des imports, de la configuration...
 import os
 import asyncio
 import json
 import logging
-import sys
-import zipfile
-import shutil
-from datetime import datetime, timedelta, timezone
+import re
+import signal
+from datetime import datetime, timedelta
 from telethon import TelegramClient, events
 from telethon.sessions import StringSession
 from telethon.events import ChatAction
@@ -19,21 +20,40 @@ from pathlib import Path
 # ==================== PROJET 2: Système de Prédiction ====================
 from predictor import CardPredictor
 from excel_importer import ExcelPredictionManager
-
-# Configuration du logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('bot.log', encoding='utf-8')
-    ]
-)
-logger = logging.getLogger(__name__)
+from state_snapshot import StateSnapshot
+from export_engine import EXPORT_FORMATS, prune_exports
+from upload_cache import UploadCache
+from scheduler import Scheduler, BENIN_TZ
+from update_capture import UpdateRecorder, capture_enabled
+from results_query import ResultsQueryEngine, parse_filters
+from retention import DataCompactor, prune_files, reclaimed_by, format_bytes
+from channel_registry import ChannelContext, ChannelRegistry
+from worker_pool import ChannelWorkerPool
+from leader_lock import LeaderLease
+from event_hub import EventHub
+from log_setup import setup_logging, shutdown_logging
+from package_builder import PackageBuilder
+import deploy_templates
+IMPORTS_DONE = time.perf_counter()
 
 # Charger les variables d'environnement
 load_dotenv()
 
+# Mode superviseur: les canaux supplémentaires sont traités par des processus de travail.
+# Leur processus intermédiaire est créé ici, avant le premier thread (écriture du journal):
+# les processus de travail ne démarrent qu'après l'élection (voir worker_pool.py)
+WORKER_PROCESSES = int(os.getenv('WORKER_PROCESSES') or '0')
+worker_pool = ChannelWorkerPool(WORKER_PROCESSES) if WORKER_PROCESSES > 0 and ChannelWorkerPool.supported() else None
+if worker_pool:
+    worker_pool.prefork()
+
+# Configuration du logging (écriture console + fichier dans un thread dédié, rotation par taille)
+LOG_FILE = 'bot.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+setup_logging(LOG_FILE, max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT)
+logger = logging.getLogger(__name__)
+
 # --- CONFIGURATION ---
 try:
     API_ID = int(os.getenv('API_ID') or '0')
@@ -41,6 +61,10 @@ try:
     BOT_TOKEN = os.getenv('BOT_TOKEN') or ''
     ADMIN_ID = int(os.getenv('ADMIN_ID') or '0')
     PORT = int(os.getenv('PORT') or '5000')
+    # Discussions destinataires du rapport journalier (séparées par des virgules, admin par défaut)
+    REPORT_CHATS = [int(chat) for chat in (os.getenv('REPORT_CHATS') or '').split(',') if chat.strip()] or [ADMIN_ID]
+    # Durée du bail leader entre instances partageant data/ (0 = pas d'élection)
+    LEADER_LEASE_SECONDS = float(os.getenv('LEADER_LEASE_SECONDS') or '15')
 
     # Validation des variables requises
     if not API_ID or API_ID == 0:
@@ -67,13 +91,34 @@ transfer_enabled = True
 # ==================== GESTIONNAIRES PROJET 1 ====================
 yaml_manager = YAMLDataManager()
 results_manager = GameResultsManager()
+results_query = ResultsQueryEngine(results_manager)  # Index triés pour /results et /historique
 
 # ==================== GESTIONNAIRES PROJET 2 ====================
 predictor = CardPredictor()
-excel_manager = ExcelPredictionManager()
+excel_manager = ExcelPredictionManager(autoload=False)  # Chargé par restore_state()
 detected_display_channel = None
 prediction_interval = 1
 
+# ==================== INSTANTANÉ D'ÉTAT (REDÉMARRAGE À CHAUD) ====================
+state_snapshot = StateSnapshot()
+
+# ==================== ENREGISTREMENT DES MISES À JOUR (REJEU HORS LIGNE) ====================
+update_recorder = UpdateRecorder() if capture_enabled() else None
+
+# ==================== TÂCHES PLANIFIÉES (HEURE DU BÉNIN UTC+1) ====================
+scheduler = Scheduler()
+
+# ==================== COMPACTION ET RÉTENTION DES FICHIERS ====================
+COMPACTION_BUDGET = 2.0          # Secondes de compaction par passage planifié
+compactor = DataCompactor()
+
+# ==================== INSTANCE LEADER (DÉPLOIEMENTS AVEC DEUX INSTANCES) ====================
+leader_lease = LeaderLease(lease_seconds=LEADER_LEASE_SECONDS) if LEADER_LEASE_SECONDS > 0 else None
+
+# ==================== FLUX D'ÉVÉNEMENTS EN DIRECT (SSE /events) ====================
+SSE_KEEPALIVE = 15.0  # Commentaire envoyé en l'absence d'événement (proxys, détection des déconnexions)
+event_hub = EventHub()
+
 # Client Telegram avec StringSession pour persistance sur Render.com
 TELEGRAM_SESSION = os.getenv('TELEGRAM_SESSION', '')
 if TELEGRAM_SESSION:
@@ -83,6 +128,25 @@ else:
     client = TelegramClient(StringSession(), API_ID, API_HASH)
     logger.info("⚠️ Création d'une nouvelle StringSession (à copier pour Render.com)")
 
+# Fichiers déjà téléversés: un export inchangé est renvoyé sans nouveau téléversement
+upload_cache = UploadCache(client)
+
+# Packages de déploiement (/deploy, /deploy_duo2) reconstruits seulement si les sources changent
+package_builder = PackageBuilder()
+
+# ==================== DÉMARRAGE RAPIDE ====================
+# La configuration et l'état sont chargés dans un thread pendant la connexion Telegram:
+# les mises à jour reçues entre-temps attendent state_ready avant d'atteindre les gestionnaires
+state_ready = asyncio.Event()
+startup_timings = {"import": round(IMPORTS_DONE - STARTUP_STARTED, 3)}
+
+
+@client.on(events.Raw())
+async def wait_for_state(update):
+    """Premier gestionnaire enregistré: Telethon appelle les suivants une fois l'état chargé"""
+    if not state_ready.is_set():
+        await state_ready.wait()
+
 
 def load_config():
     """Charge la configuration depuis le fichier JSON"""
@@ -121,10 +185,9 @@ def save_config():
 
 
 async def start_bot():
-    """Démarre le bot"""
+    """Démarre le bot (la configuration est chargée en parallèle par load_state)"""
     try:
         logger.info("🚀 DÉMARRAGE DU BOT...")
-        load_config()
         await client.start(bot_token=BOT_TOKEN)
         logger.info("✅ Bot Telegram connecté")
         
@@ -142,11 +205,6 @@ async def start_bot():
         username = getattr(me, 'username', 'Unknown') or f"ID:{me.id if hasattr(me, 'id') else 'Unknown'}"
         logger.info(f"✅ Bot opérationnel: @{username}")
 
-        if detected_stat_channel:
-            logger.info(f"📊 Surveillance du canal: {detected_stat_channel}")
-        else:
-            logger.info("⚠️ Aucun canal configuré. Ajoutez le bot à un canal pour commencer.")
-
     except Exception as e:
         logger.error(f"❌ Erreur démarrage: {e}")
         return False
@@ -225,6 +283,7 @@ async def set_channel(event):
         detected_stat_channel = channel_id
         confirmation_pending[channel_id] = 'configured'
         save_config()
+        publish_status('set_channel')
 
         try:
             chat = await client.get_entity(channel_id)
@@ -251,108 +310,208 @@ Utilisez /fichier pour exporter les résultats.""")
 
 transferred_messages = {}
 
+# ==================== CANAUX SOURCES (UN CONTEXTE PAR CANAL) ====================
+# Canal principal: gestionnaires et fichiers historiques; canaux supplémentaires: data/channels/<id>/
+primary_channel = ChannelContext(None, None, results_manager, excel_manager, transferred_messages, data_dir='data')
+# Mode superviseur (worker_pool, créé avant la configuration du journal): pas de gestionnaires ici
+channel_registry = ChannelRegistry(owns_state=worker_pool is None)
+
 
-async def handle_excel_predictions(message_text: str):
-    """Gère le lancement automatique et la vérification des prédictions Excel (Projet 2)"""
+def channel_context(chat_id):
+    """Contexte du canal source chat_id (None si le canal n'est pas surveillé)"""
+    if detected_stat_channel and chat_id == detected_stat_channel:
+        primary_channel.channel_id = detected_stat_channel
+        primary_channel.display_channel = detected_display_channel
+        return primary_channel
+    return channel_registry.get(chat_id)
+
+
+def _import_transferred_messages(state):
+    transferred_messages.clear()
+    transferred_messages.update(state)
+
+
+# Les rechargements depuis les fichiers ignorent les données déjà en mémoire: une instance en
+# attente qui devient leader relit les fichiers écrits entre-temps par l'ancienne instance
+state_snapshot.register('results', results_manager.export_state, results_manager.import_state,
+                        sources=[results_manager.results_file], fallback=results_manager.reload)
+state_snapshot.register('excel_predictions', excel_manager.export_state, excel_manager.import_state,
+                        sources=[excel_manager.predictions_file], fallback=excel_manager.load_predictions)
+state_snapshot.register('predictions', yaml_manager.export_predictions_state, yaml_manager.import_predictions_state,
+                        sources=[yaml_manager.predictions_file], fallback=yaml_manager.reload_predictions)
+state_snapshot.register('message_log', yaml_manager.export_state, yaml_manager.import_state,
+                        sources=[yaml_manager.message_log_file], fallback=yaml_manager.reload_message_log)
+state_snapshot.register('transferred_messages', lambda: transferred_messages, _import_transferred_messages)
+state_snapshot.register('predictor', predictor.export_state, predictor.import_state)
+
+
+def _export_channel_transfers():
+    return {ctx.channel_id: ctx.transferred_messages for ctx in channel_registry}
+
+
+def _import_channel_transfers(state):
+    """Messages transférés des canaux supplémentaires (appelé après channel_registry.load())"""
+    for channel_id, transfers in state.items():
+        ctx = channel_registry.get(channel_id)
+        if ctx is not None:
+            ctx.transferred_messages.clear()
+            ctx.transferred_messages.update(transfers)
+
+
+state_snapshot.register('channel_transfers', _export_channel_transfers, _import_channel_transfers)
+
+
+def restore_state():
+    """Restaure l'état en mémoire depuis l'instantané (ou depuis les fichiers s'il est périmé)"""
+    # Canaux d'abord: l'instantané contient aussi l'état propre à chaque canal
+    if channel_registry.load():
+        logger.info(f"📡 Canaux supplémentaires: {', '.join(str(ctx.channel_id) for ctx in channel_registry)}")
+    report = state_snapshot.restore()
+    logger.info(f"♻️ Restauration de l'état: {report}")
+
+
+def _load_state_sync():
+    started = time.perf_counter()
+    load_config()
+    restore_state()
+    startup_timings["state"] = round(time.perf_counter() - started, 3)
+
+
+async def load_state():
+    """
+    Charge la configuration et l'état dans un thread: la boucle reste libre pour la
+    connexion Telegram et le serveur web. Les mises à jour Telegram et les routes web
+    (hors /health) attendent la fin du chargement.
+    """
+    state_ready.clear()
     try:
-        if not detected_display_channel:
+        await asyncio.to_thread(_load_state_sync)
+    finally:
+        state_ready.set()
+
+
+async def run_excel_actions(actions, acknowledge):
+    """Effectue les envois planifiés (lancements / mises à jour) puis les confirme avec acknowledge"""
+    for action in actions:
+        if action['action'] == 'edit':
+            try:
+                await client.edit_message(action['chat'], action['message_id'], action['text'])
+                logger.info("✅ Prédiction Excel #%s mise à jour: %s", action['numero'], action['status'])
+                acknowledge(action, None)
+                logger.info("🏁 Prédiction #%s marquée comme terminée avec statut: %s", action['numero'], action['status'])
+                event_hub.publish('prediction', {"action": "completed", "numero": action['numero'],
+                                                 "status": action['status'], "display_channel": action['chat']})
+            except Exception as e:
+                logger.error("❌ Erreur mise à jour prédiction: %s", e)
+        else:
+            try:
+                sent = await client.send_message(action['chat'], action['text'])
+                acknowledge(action, sent.id)
+                logger.info("🚀 Prédiction Excel lancée: #%s → %s", action['numero'], action['victoire'])
+                event_hub.publish('prediction', {"action": "launched", "numero": action['numero'],
+                                                 "victoire": action['victoire'], "display_channel": action['chat']})
+            except Exception as e:
+                logger.error("❌ Erreur publication prédiction: %s", e)
+
+
+async def handle_excel_predictions(message_text: str, ctx: ChannelContext = None):
+    """Gère le lancement automatique et la vérification des prédictions Excel (Projet 2) d'un canal"""
+    try:
+        ctx = ctx or channel_context(detected_stat_channel)
+        if not ctx or not ctx.display_channel:
             return
 
         game_number = predictor.extract_game_number(message_text)
         if not game_number:
             return
 
-        logger.info(f"📊 Projet 2: Numéro de jeu détecté #{game_number}")
+        logger.debug("📊 Projet 2: Numéro de jeu détecté #%s (canal %s)", game_number, ctx.channel_id)
 
-        for key, pred in list(excel_manager.predictions.items()):
-            if not pred.get("launched"):
-                continue
+        actions = ctx.excel_manager.plan_actions(game_number, message_text, ctx.display_channel)
+        await run_excel_actions(actions, ctx.excel_manager.apply_action)
 
-            if pred.get("completed"):
-                continue
+    except Exception as e:
+        logger.error("❌ Erreur handle_excel_predictions: %s", e)
+        import traceback
+        logger.error(traceback.format_exc())
 
-            predicted_numero = pred["numero"]
-            expected_winner = pred["victoire"]
-            current_offset = pred.get("current_offset", 0)
 
-            status, should_continue = excel_manager.verify_excel_prediction(
-                game_number, message_text, predicted_numero, expected_winner, current_offset
-            )
+def status_summary():
+    """État courant du bot (statut HTTP et événements 'status' du flux en direct)"""
+    return {
+        "status": "running",
+        "channel_configured": detected_stat_channel is not None,
+        "channel_id": detected_stat_channel,
+        "display_channel": detected_display_channel,
+        "transfer_enabled": transfer_enabled,
+        "extra_channels": len(channel_registry),
+        "role": "leader" if not leader_lease or leader_lease.is_leader else "standby",
+        "stats": results_manager.get_stats(),
+        "startup": startup_timings,
+        "timestamp": datetime.now().isoformat()
+    }
 
-            if status:
-                try:
-                    message_id = pred.get("message_id")
-                    channel_id = pred.get("channel_id")
-                    
-                    if message_id and channel_id:
-                        # Format: 🔵1417 👗 𝐕𝟏👗 statut: ✅2️⃣
-                        if expected_winner.lower() == "joueur":
-                            victoire_text = "𝐕𝟏"
-                        else:
-                            victoire_text = "𝐕𝟐"
-                        
-                        update_msg = f"🔵{predicted_numero} 👗 {victoire_text}👗 statut: {status}"
-                        
-                        await client.edit_message(channel_id, message_id, update_msg)
-                        logger.info(f"✅ Prédiction Excel #{predicted_numero} mise à jour: {status}")
-                        
-                        pred["completed"] = True
-                        pred["final_status"] = status
-                        excel_manager.save_predictions()
-                        logger.info(f"🏁 Prédiction #{predicted_numero} marquée comme terminée avec statut: {status}")
-                except Exception as e:
-                    logger.error(f"❌ Erreur mise à jour prédiction: {e}")
 
-            elif not should_continue:
-                if current_offset < 2:
-                    pred["current_offset"] = current_offset + 1
-                    excel_manager.save_predictions()
-                    logger.info(f"⏭️ Prédiction #{predicted_numero}: passage à l'offset {pred['current_offset']}")
-                else:
-                    pred["completed"] = True
-                    pred["final_status"] = "⭕✍🏻"
-                    excel_manager.save_predictions()
-                    logger.info(f"🏁 Prédiction #{predicted_numero} marquée comme échec définitif après offset 2")
+def publish_status(reason: str):
+    """Diffuse un changement d'état aux clients du flux en direct"""
+    event_hub.publish('status', {**status_summary(), "reason": reason})
 
-        close_pred = excel_manager.find_close_prediction(game_number, tolerance=4)
-        
-        if close_pred:
-            key = close_pred["key"]
-            prediction = close_pred["prediction"]
-            pred_numero = prediction["numero"]
-            victoire = prediction["victoire"]
 
-            try:
-                # Format: 🔵1417 👗 𝐕𝟏👗 statut: ⏳
-                if victoire.lower() == "joueur":
-                    victoire_text = "𝐕𝟏"
-                else:
-                    victoire_text = "𝐕𝟐"
-                
-                prediction_msg = f"🔵{pred_numero} 👗 {victoire_text}👗 statut: ⏳"
+def _channel_label(ctx: ChannelContext) -> str:
+    """Mention du canal dans les messages à l'admin (rien pour le canal principal)"""
+    return "" if ctx is primary_channel else f" {ctx.channel_id}"
 
-                sent = await client.send_message(detected_display_channel, prediction_msg)
-                
-                excel_manager.mark_as_launched(key, sent.id, detected_display_channel)
-                
-                logger.info(f"🚀 Prédiction Excel lancée: #{pred_numero} → {victoire}")
-                
-                # Notification admin désactivée
-                # try:
-                #     await client.send_message(
-                #         ADMIN_ID,
-                #         f"🚀 **Prédiction Excel lancée**\n\n📍 Numéro: #{pred_numero}\n🎯 Prédiction: {victoire}\n📊 Jeu actuel: #{game_number}"
-                #     )
-                # except:
-                #     pass
-                    
-            except Exception as e:
-                logger.error(f"❌ Erreur publication prédiction: {e}")
 
-    except Exception as e:
-        logger.error(f"❌ Erreur handle_excel_predictions: {e}")
-        import traceback
-        logger.error(traceback.format_exc())
+async def process_channel_message(ctx: ChannelContext, message_text: str, edited: bool = False):
+    """
+    Enregistre la partie et traite les prédictions Excel d'un canal.
+    Le verrou du canal sérialise ses messages (pas de double lancement entre un message
+    et son édition) sans bloquer les autres canaux.
+    """
+    if leader_lease and not leader_lease.is_leader:
+        return  # Bail perdu: l'autre instance traite désormais les messages
+    if worker_pool and ctx is not primary_channel:
+        # Le verrou couvre aussi les confirmations: le message suivant du canal voit les lancements
+        async with ctx.lock:
+            reply = await worker_pool.process(ctx.channel_id, ctx.display_channel, message_text)
+            ctx.processed += 1
+            await run_excel_actions(reply['actions'], lambda action, message_id:
+                                    worker_pool.acknowledge(ctx.channel_id, action, message_id))
+        success, info, stats = reply['success'], reply['info'], reply['stats']
+    else:
+        async with ctx.lock:
+            success, info = ctx.results_manager.process_message(message_text)
+            ctx.processed += 1
+            stats = ctx.results_manager.get_stats() if success else None
+            await handle_excel_predictions(message_text, ctx)
+
+    if success:
+        logger.info("✅ %s", info)
+        event_hub.publish('game', {
+            "channel": ctx.channel_id,
+            "info": info,
+            "numero": stats.get('dernier_numero'),
+            "total": stats['total'],
+            "joueur_victoires": stats['joueur_victoires'],
+            "banquier_victoires": stats['banquier_victoires']
+        })
+        try:
+            title = "Partie enregistrée (message finalisé)!" if edited else "Partie enregistrée!"
+            notification = f"""✅ **{title}**{_channel_label(ctx)}
+
+{info}
+
+📊 **Statistiques actuelles:**
+• Total: {stats['total']} parties
+• Joueur: {stats['joueur_victoires']} ({stats['taux_joueur']:.1f}%)
+• Banquier: {stats['banquier_victoires']} ({stats['taux_banquier']:.1f}%)"""
+            await client.send_message(ADMIN_ID, notification)
+        except Exception as e:
+            logger.error("Erreur notification: %s", e)
+    elif not edited:
+        logger.debug("⚠️ Message ignoré: %s", info)
+    elif info and "en cours d'édition" not in info:
+        logger.debug("⚠️ Message édité ignoré: %s", info)
 
 
 @client.on(events.NewMessage())
@@ -372,18 +531,19 @@ async def handle_message(event):
                     if message_text == 'OUI':
                         await event.respond("🔄 **Remise à zéro en cours...**")
 
-                        results_manager._save_yaml([])
+                        results_manager.reset_results()
                         logger.info("✅ Base de données remise à zéro manuellement")
+                        publish_status('reset')
 
                         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-                        new_file_path = f"resultats_{timestamp}.xlsx"
-                        empty_file = results_manager.export_to_txt(file_path=new_file_path)
+                        empty_file = await asyncio.to_thread(results_manager.export_cached, 'xlsx')
 
                         if empty_file and os.path.exists(empty_file):
-                            await client.send_file(
+                            await upload_cache.send(
                                 event.sender_id,
                                 empty_file,
-                                caption="📄 **Nouveau fichier Excel créé**\n\nLe fichier est vide et prêt pour de nouvelles données."
+                                caption="📄 **Nouveau fichier Excel créé**\n\nLe fichier est vide et prêt pour de nouvelles données.",
+                                file_name=f"resultats_{timestamp}.xlsx"
                             )
 
                         await event.respond("✅ **Remise à zéro effectuée**\n\nLa base de données a été réinitialisée avec succès!")
@@ -394,42 +554,26 @@ async def handle_message(event):
                         del confirmation_pending[event.sender_id]
                         return
 
-        if detected_stat_channel and event.chat_id == detected_stat_channel:
+        ctx = channel_context(event.chat_id)
+        if ctx:
             message_text = event.message.message
-            logger.info(f"📨 Message du canal: {message_text[:100]}...")
+            logger.debug("📨 Message du canal %s: %s...", ctx.channel_id, message_text[:100])
+
+            if update_recorder:
+                update_recorder.record_event(event)
 
             if transfer_enabled:
                 try:
-                    transfer_msg = f"📨 **Message du canal:**\n\n{message_text}"
+                    transfer_msg = f"📨 **Message du canal{_channel_label(ctx)}:**\n\n{message_text}"
                     sent_msg = await client.send_message(ADMIN_ID, transfer_msg)
-                    transferred_messages[event.message.id] = sent_msg.id
-                except Exception as e:
-                    logger.error(f"❌ Erreur transfert message: {e}")
-
-            success, info = results_manager.process_message(message_text)
-
-            if success:
-                logger.info(f"✅ {info}")
-                try:
-                    stats = results_manager.get_stats()
-                    notification = f"""✅ **Partie enregistrée!**
-
-{info}
-
-📊 **Statistiques actuelles:**
-• Total: {stats['total']} parties
-• Joueur: {stats['joueur_victoires']} ({stats['taux_joueur']:.1f}%)
-• Banquier: {stats['banquier_victoires']} ({stats['taux_banquier']:.1f}%)"""
-                    await client.send_message(ADMIN_ID, notification)
+                    ctx.transferred_messages[event.message.id] = sent_msg.id
                 except Exception as e:
-                    logger.error(f"Erreur notification: {e}")
-            else:
-                logger.info(f"⚠️ Message ignoré: {info}")
+                    logger.error("❌ Erreur transfert message: %s", e)
 
-            await handle_excel_predictions(message_text)
+            await process_channel_message(ctx, message_text)
 
     except Exception as e:
-        logger.error(f"❌ Erreur traitement message: {e}")
+        logger.error("❌ Erreur traitement message: %s", e)
         import traceback
         logger.error(traceback.format_exc())
 
@@ -438,52 +582,35 @@ async def handle_message(event):
 async def handle_edited_message(event):
     """Traite les messages édités"""
     try:
-        if detected_stat_channel and event.chat_id == detected_stat_channel:
+        ctx = channel_context(event.chat_id)
+        if ctx:
             message_text = event.message.message
-            logger.info(f"✏️ Message édité dans le canal: {message_text[:100]}...")
+            logger.debug("✏️ Message édité dans le canal %s: %s...", ctx.channel_id, message_text[:100])
+
+            if update_recorder:
+                update_recorder.record_event(event, edited=True)
 
             if transfer_enabled:
-                if event.message.id in transferred_messages:
-                    admin_msg_id = transferred_messages[event.message.id]
+                if event.message.id in ctx.transferred_messages:
+                    admin_msg_id = ctx.transferred_messages[event.message.id]
                     try:
-                        transfer_msg = f"📨 **Message du canal (✏️ ÉDITÉ):**\n\n{message_text}"
+                        transfer_msg = f"📨 **Message du canal{_channel_label(ctx)} (✏️ ÉDITÉ):**\n\n{message_text}"
                         await client.edit_message(ADMIN_ID, admin_msg_id, transfer_msg)
-                        logger.info(f"✅ Message transféré édité")
+                        logger.info("✅ Message transféré édité")
                     except Exception as e:
-                        logger.error(f"❌ Erreur édition message transféré: {e}")
+                        logger.error("❌ Erreur édition message transféré: %s", e)
                 else:
                     try:
-                        transfer_msg = f"📨 **Message du canal (✏️ ÉDITÉ - nouveau):**\n\n{message_text}"
+                        transfer_msg = f"📨 **Message du canal{_channel_label(ctx)} (✏️ ÉDITÉ - nouveau):**\n\n{message_text}"
                         sent_msg = await client.send_message(ADMIN_ID, transfer_msg)
-                        transferred_messages[event.message.id] = sent_msg.id
+                        ctx.transferred_messages[event.message.id] = sent_msg.id
                     except Exception as e:
-                        logger.error(f"❌ Erreur transfert message édité: {e}")
-
-            success, info = results_manager.process_message(message_text)
-
-            if success:
-                logger.info(f"✅ {info}")
-                try:
-                    stats = results_manager.get_stats()
-                    notification = f"""✅ **Partie enregistrée (message finalisé)!**
-
-{info}
-
-📊 **Statistiques actuelles:**
-• Total: {stats['total']} parties
-• Joueur: {stats['joueur_victoires']} ({stats['taux_joueur']:.1f}%)
-• Banquier: {stats['banquier_victoires']} ({stats['taux_banquier']:.1f}%)"""
-                    await client.send_message(ADMIN_ID, notification)
-                except Exception as e:
-                    logger.error(f"Erreur notification: {e}")
-            else:
-                if info and "en cours d'édition" not in info:
-                    logger.info(f"⚠️ Message édité ignoré: {info}")
+                        logger.error("❌ Erreur transfert message édité: %s", e)
 
-            await handle_excel_predictions(message_text)
+            await process_channel_message(ctx, message_text, edited=True)
 
     except Exception as e:
-        logger.error(f"❌ Erreur traitement message édité: {e}")
+        logger.error("❌ Erreur traitement message édité: %s", e)
         import traceback
         logger.error(traceback.format_exc())
 
@@ -528,12 +655,16 @@ async def cmd_status(event):
 
 **Configuration:**
 • Canal surveillé: {f'✅ Configuré (ID: {detected_stat_channel})' if detected_stat_channel else '❌ Non configuré'}
+• Canaux supplémentaires: {len(channel_registry)} (voir /channels)
 • Transfert des messages: {'🔔 Activé' if transfer_enabled else '🔕 Désactivé'}
 
 **Statistiques:**
 • Total de parties: {stats['total']}
 • Victoires Joueur: {stats['joueur_victoires']} ({stats['taux_joueur']:.1f}%)
 • Victoires Banquier: {stats['banquier_victoires']} ({stats['taux_banquier']:.1f}%)
+• Série actuelle: {stats['serie_actuelle']['longueur']} × {stats['serie_actuelle']['gagnant'] or '-'}
+• Plus longues séries: Joueur {stats['plus_longues_series']['Joueur']} • Banquier {stats['plus_longues_series']['Banquier']}
+• Combinaison la plus fréquente: {next(iter(stats['combinaisons']), '-')}
 
 **Critères de stockage:**
 ✅ Exactement 3 cartes dans le premier groupe
@@ -561,27 +692,80 @@ async def cmd_fichier(event):
         return
 
     try:
-        await event.respond("📊 Génération du fichier Excel en cours...")
-        file_path = results_manager.export_to_txt()
+        # Format optionnel: /fichier [xlsx|csv|ndjson]
+        parts = event.message.message.split()
+        fmt = parts[1].lower() if len(parts) > 1 else 'xlsx'
+        if fmt not in EXPORT_FORMATS:
+            await event.respond(f"❌ Format inconnu. Formats disponibles: {', '.join(EXPORT_FORMATS)}")
+            return
+
+        await event.respond("📊 Génération du fichier en cours...")
+        # Fichier réutilisé si aucune partie n'a été enregistrée depuis le dernier export
+        snapshot = results_manager.storage_snapshot()
+        file_path = await asyncio.to_thread(results_manager.export_cached, fmt, snapshot)
 
         if file_path and os.path.exists(file_path):
-            await client.send_file(
+            await upload_cache.send(
                 event.chat_id,
                 file_path,
-                caption="📊 **Export des résultats**\n\nFichier Excel généré avec succès!"
+                caption="📊 **Export des résultats**\n\nFichier généré avec succès!"
             )
-            logger.info("✅ Fichier Excel exporté et envoyé")
+            logger.info(f"✅ Fichier {fmt} exporté et envoyé")
         else:
-            await event.respond("❌ Erreur lors de la génération du fichier Excel")
+            await event.respond("❌ Erreur lors de la génération du fichier")
 
     except Exception as e:
         logger.error(f"❌ Erreur export fichier: {e}")
         await event.respond(f"❌ Erreur: {e}")
 
 
-@client.on(events.NewMessage(pattern='/deploy'))
+def deploy_sources():
+    """Modules du bot inclus dans les packages de déploiement"""
+    return sorted(str(path) for path in Path('.').glob('*.py'))
+
+
+def render_deploy_package(now):
+    """Fichiers générés du package /deploy (Projet 1)"""
+    return {
+        'render.yaml': deploy_templates.RENDER_YAML.format(service='bot-telegram-bcarte'),
+        'requirements.txt': deploy_templates.REQUIREMENTS,
+        '.env.example': deploy_templates.ENV_EXAMPLE,
+        'README_DEPLOIEMENT.md': deploy_templates.README.format(
+            created=now.strftime('%d/%m/%Y à %H:%M:%S'),
+            created_short=now.strftime('%d/%m/%Y %H:%M:%S'),
+            version=now.strftime('%Y-%m-%d_%H-%M-%S'))
+    }
+
+
+def render_duo_package(config):
+    """Fichiers générés du package /deploy_duo2 (Projet 1 + Projet 2) pour la configuration donnée"""
+    config_json = json.dumps(config, indent=2)
+
+    def render(now):
+        return {
+            'bot_config.json': config_json,
+            'requirements.txt': deploy_templates.REQUIREMENTS,
+            '.env.example': deploy_templates.DUO_ENV_EXAMPLE,
+            'render.yaml': deploy_templates.RENDER_YAML.format(service='bot-telegram-duo-final'),
+            'Procfile': deploy_templates.PROCFILE,
+            'runtime.txt': deploy_templates.RUNTIME,
+            'data/.gitkeep': deploy_templates.DATA_GITKEEP,
+            'README.md': deploy_templates.DUO_README.format(
+                created=now.strftime('%d/%m/%Y à %H:%M:%S'),
+                version=now.strftime('%Y-%m-%d_%H-%M-%S'))
+        }
+    return render
+
+
+def _package_caption(caption, package):
+    if package['reused']:
+        caption += "\n♻️ Package inchangé (réutilisé)"
+    return caption
+
+
+@client.on(events.NewMessage(pattern=r'/deploy\b'))
 async def cmd_deploy(event):
-    """Crée un package de déploiement pour Render.com"""
+    """Envoie le package de déploiement pour Render.com (reconstruit seulement si les sources ont changé)"""
     if event.is_group or event.is_channel:
         return
 
@@ -590,172 +774,12 @@ async def cmd_deploy(event):
         return
 
     try:
-        await event.respond("📦 Préparation du package de déploiement pour Render.com...")
-
-        benin_tz = timezone(timedelta(hours=1))
-        now_benin = datetime.now(benin_tz)
-        timestamp = now_benin.strftime('%Y-%m-%d_%H-%M-%S')
-        
-        deploy_dir = Path(f"deploy_render_{timestamp}")
-        deploy_dir.mkdir(exist_ok=True)
-
-        files_to_copy = [
-            'main.py',
-            'game_results_manager.py',
-            'yaml_manager.py'
-        ]
-
-        for file in files_to_copy:
-            if os.path.exists(file):
-                shutil.copy(file, deploy_dir / file)
-
-        render_yaml = """services:
-  - type: web
-    name: bot-telegram-bcarte
-    env: python
-    region: frankfurt
-    plan: starter
-    buildCommand: pip install -r requirements.txt
-    startCommand: python main.py
-    envVars:
-      - key: PORT
-        value: 10000
-      - key: API_ID
-        sync: false
-      - key: API_HASH
-        sync: false
-      - key: BOT_TOKEN
-        sync: false
-      - key: ADMIN_ID
-        sync: false
-      - key: TELEGRAM_SESSION
-        sync: false
-"""
-
-        with open(deploy_dir / 'render.yaml', 'w', encoding='utf-8') as f:
-            f.write(render_yaml)
-
-        requirements = """telethon==1.35.0
-aiohttp==3.9.5
-python-dotenv==1.0.1
-pyyaml==6.0.1
-openpyxl==3.1.2
-"""
-
-        with open(deploy_dir / 'requirements.txt', 'w', encoding='utf-8') as f:
-            f.write(requirements)
-        
-        env_example = """# Variables d'environnement pour le bot Telegram
-# Ne jamais committer ces valeurs réelles !
-
-API_ID=votre_api_id
-API_HASH=votre_api_hash
-BOT_TOKEN=votre_bot_token
-ADMIN_ID=votre_admin_id
-PORT=10000
-"""
-
-        with open(deploy_dir / '.env.example', 'w', encoding='utf-8') as f:
-            f.write(env_example)
-
-        readme = f"""# Bot Telegram - Package de Déploiement Render.com
-
-📅 **Créé le:** {now_benin.strftime('%d/%m/%Y à %H:%M:%S')} (Heure Bénin UTC+1)
-📦 **Version:** {timestamp}
-
-## 🚀 Instructions de déploiement sur Render.com
-
-### Étape 1: Créer un repository GitHub
-1. Créez un nouveau repository sur GitHub
-2. Uploadez tous les fichiers de ce package
-
-### Étape 2: Déployer sur Render.com
-1. Connectez-vous à [render.com](https://render.com)
-2. Cliquez sur **"New +"** → **"Web Service"**
-3. Connectez votre repository GitHub
-4. Render détectera automatiquement `render.yaml`
-
-### Étape 3: Configurer les Variables d'Environnement
-Dans la section **Environment** de Render.com, ajoutez:
-- **PORT**: 10000 (déjà configuré)
-- **API_ID**: Obtenez-le sur https://my.telegram.org
-- **API_HASH**: Obtenez-le sur https://my.telegram.org
-- **BOT_TOKEN**: Créez un bot avec @BotFather sur Telegram
-- **ADMIN_ID**: Obtenez votre ID avec @userinfobot sur Telegram
-
-### Étape 4: Déployer
-1. Cliquez sur **"Create Web Service"**
-2. Attendez le déploiement (2-3 minutes)
-3. Le bot sera en ligne 24/7 !
-
-## ✅ Fonctionnalités principales
-
-- ✅ **Détection automatique**: Reconnaît les parties avec 3 cartes différentes
-- ✅ **Export quotidien**: Génère un fichier Excel à 00h59 (UTC+1)
-- ✅ **Réinitialisation auto**: Reset automatique à 01h00
-- ✅ **Statistiques en temps réel**: Taux de victoire Joueur/Banquier
-
-## 📊 Commandes disponibles
-
-- `/start` - Démarrer le bot et voir les informations
-- `/status` - Voir les statistiques actuelles
-- `/fichier` - Exporter les résultats en Excel
-- `/reset` - Réinitialiser la base de données manuellement
-- `/deploy` - Créer un nouveau package de déploiement
-- `/help` - Afficher l'aide complète
-
-## 🎯 Critères d'enregistrement
-
-### ✅ Parties enregistrées:
-- Premier groupe: **exactement 3 cartes de couleurs différentes**
-- Deuxième groupe: **PAS 3 cartes**
-- Gagnant identifiable: **Joueur** ou **Banquier**
-
-### ❌ Parties ignorées:
-- Match nul
-- Les deux groupes ont 3 cartes
-- Pas de numéro de jeu identifiable
-
-## ⚙️ Configuration technique
-
-- **Langage**: Python 3.11
-- **Timezone**: Africa/Porto-Novo (UTC+1)
-- **Port**: 10000 (Render.com)
-- **Export automatique**: 00h59 chaque jour
-- **Reset automatique**: 01h00 chaque jour
-
----
-*Package généré automatiquement*
-*Dernière mise à jour: {now_benin.strftime('%d/%m/%Y %H:%M:%S')}*
-"""
-
-        with open(deploy_dir / 'README_DEPLOIEMENT.md', 'w', encoding='utf-8') as f:
-            f.write(readme)
-
-        deploy_zip = "Kouamé.zip"
-        with zipfile.ZipFile(deploy_zip, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(deploy_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, deploy_dir)
-                    zipf.write(file_path, arcname)
-
-        short_caption = f"""📦 **Package Render.com - Kouamé**
-
-📅 {now_benin.strftime('%d/%m/%Y %H:%M:%S')} (Bénin)
-📁 Kouamé.zip
-✅ Port 10000 configuré
-✅ Export à 00h59
-✅ Reset à 01h00"""
-
-        await client.send_file(
-            ADMIN_ID,
-            deploy_zip,
-            caption=short_caption
-        )
-
-        shutil.rmtree(deploy_dir)
-        logger.info(f"✅ Package créé: {deploy_zip}")
+        package = await package_builder.get('Kouamé.zip', deploy_sources(), render_deploy_package,
+                                            datetime.now(BENIN_TZ))
+        built_at = datetime.fromisoformat(package['built_at'])
+        caption = deploy_templates.CAPTION.format(created_short=built_at.strftime('%d/%m/%Y %H:%M:%S'))
+        await upload_cache.send(ADMIN_ID, package['path'], caption=_package_caption(caption, package))
+        logger.info(f"✅ Package envoyé: {package['path']} ({'réutilisé' if package['reused'] else 'construit'})")
 
     except Exception as e:
         logger.error(f"❌ Erreur création package: {e}")
@@ -775,6 +799,7 @@ async def cmd_stop_transfer(event):
         return
 
     transfer_enabled = False
+    publish_status('transfer')
     await event.respond("🔕 **Transfert des messages désactivé**\n\nLes messages du canal ne seront plus transférés en privé.\n\nUtilisez /start_transfer pour réactiver.")
     logger.info("🔕 Transfert des messages désactivé")
 
@@ -792,6 +817,7 @@ async def cmd_start_transfer(event):
         return
 
     transfer_enabled = True
+    publish_status('transfer')
     await event.respond("🔔 **Transfert des messages activé**\n\nLes messages du canal seront à nouveau transférés en privé.")
     logger.info("🔔 Transfert des messages activé")
 
@@ -821,9 +847,9 @@ async def cmd_reset(event):
         await event.respond(f"❌ Erreur: {e}")
 
 
-@client.on(events.NewMessage(pattern='/deploy_duo2'))
-async def cmd_deploy_duo2(event):
-    """Crée un package 'duo00.zip' avec Projet 1 + Projet 2 optimisé pour Render.com (Port 10000)"""
+@client.on(events.NewMessage(pattern=r'/jobs'))
+async def cmd_jobs(event):
+    """Liste les tâches planifiées ou en déclenche une: /jobs [run <nom>]"""
     if event.is_group or event.is_channel:
         return
 
@@ -832,386 +858,229 @@ async def cmd_deploy_duo2(event):
         return
 
     try:
-        await event.respond("📦 Création du package 'Render Final V2' pour Render.com (Port 10000)...")
+        parts = event.message.message.split()
+        if len(parts) >= 3 and parts[1] == 'run':
+            name = parts[2]
+            if name not in scheduler.jobs:
+                await event.respond(f"❌ Tâche inconnue: {name}\n\nTâches: {', '.join(scheduler.jobs)}")
+            elif scheduler.run_now(name):
+                await event.respond(f"▶️ Tâche **{name}** déclenchée")
+            else:
+                await event.respond(f"⏳ Tâche **{name}** déjà en cours d'exécution")
+            return
 
-        benin_tz = timezone(timedelta(hours=1))
-        now_benin = datetime.now(benin_tz)
-        timestamp = now_benin.strftime('%Y-%m-%d_%H-%M-%S')
-        
-        package_name = "render_final_v2.zip"
-        
-        with zipfile.ZipFile(package_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            # ========== FICHIERS PROJET 1 + PROJET 2 ==========
-            all_files = [
-                'main.py',
-                'game_results_manager.py',
-                'yaml_manager.py',
-                'predictor.py',
-                'excel_importer.py'
-            ]
-            
-            # Copier tous les fichiers Python
-            for file in all_files:
-                if os.path.exists(file):
-                    zipf.write(file, file)
-                    logger.info(f"  ✅ Ajouté: {file}")
-                    
-            # ========== CONFIGURATION BOT ==========
-            config = {
-                "stat_channel": detected_stat_channel,
-                "display_channel": detected_display_channel,
-                "prediction_interval": prediction_interval
-            }
-            zipf.writestr('bot_config.json', json.dumps(config, indent=2))
-            logger.info("  ✅ Ajouté: bot_config.json")
-            
-            # ========== REQUIREMENTS.TXT ==========
-            requirements = """telethon==1.35.0
-aiohttp==3.9.5
-python-dotenv==1.0.1
-pyyaml==6.0.1
-openpyxl==3.1.2"""
-            zipf.writestr('requirements.txt', requirements)
-            logger.info("  ✅ Ajouté: requirements.txt")
-            
-            # ========== .ENV.EXAMPLE ==========
-            env_example = """# Variables d'environnement Render.com
-# NE JAMAIS committer les valeurs réelles!
-
-API_ID=votre_api_id
-API_HASH=votre_api_hash
-BOT_TOKEN=votre_bot_token
-ADMIN_ID=votre_admin_id
-PORT=10000
-TELEGRAM_SESSION=votre_session_string_ici"""
-            zipf.writestr('.env.example', env_example)
-            logger.info("  ✅ Ajouté: .env.example")
-            
-            # ========== RENDER.YAML ==========
-            render_yaml = """services:
-  - type: web
-    name: bot-telegram-duo-final
-    env: python
-    region: frankfurt
-    plan: starter
-    buildCommand: pip install -r requirements.txt
-    startCommand: python main.py
-    envVars:
-      - key: PORT
-        value: 10000
-      - key: API_ID
-        sync: false
-      - key: API_HASH
-        sync: false
-      - key: BOT_TOKEN
-        sync: false
-      - key: ADMIN_ID
-        sync: false
-      - key: TELEGRAM_SESSION
-        sync: false
-"""
-            zipf.writestr('render.yaml', render_yaml)
-            logger.info("  ✅ Ajouté: render.yaml")
-            
-            # ========== PROCFILE ==========
-            procfile = "web: python main.py"
-            zipf.writestr('Procfile', procfile)
-            logger.info("  ✅ Ajouté: Procfile")
-            
-            # ========== RUNTIME.TXT ==========
-            runtime = "python-3.11.0"
-            zipf.writestr('runtime.txt', runtime)
-            logger.info("  ✅ Ajouté: runtime.txt")
-            
-            # ========== STRUCTURE DATA/ ==========
-            zipf.writestr('data/.gitkeep', '# Dossier pour fichiers YAML\n# Créé automatiquement par le bot\n')
-            logger.info("  ✅ Ajouté: data/.gitkeep")
-            
-            # ========== README.MD COMPLET ==========
-            readme = f"""# 📦 Package "Render Final V2" - Bot Telegram Render.com
-
-📅 **Créé le:** {now_benin.strftime('%d/%m/%Y à %H:%M:%S')} (Heure Bénin UTC+1)
-📦 **Version:** {timestamp} - V2
-🚀 **Optimisé pour:** Render.com (Port 10000) avec StringSession
-
----
-
-## 🆕 Nouveautés Version 2
-
-### **Format d'affichage des prédictions:**
-- Format: 🔵{'{numéro}'} 👗 𝐕𝟏/𝐕𝟐👗 statut: ⏳
-- 𝐕𝟏 = Joueur
-- 𝐕𝟐 = Banquier
-- Statuts: ⏳ (attente), ✅0️⃣/✅1️⃣/✅2️⃣ (succès), ⭕✍🏻 (échec)
-
-### **Notifications désactivées:**
-- Plus de notification admin lors du lancement des prédictions
-- Messages uniquement dans le canal d'affichage
-
----
-
-## 🎯 Contenu du Package
-
-### ✅ **Projet 1: Stockage de Résultats**
-- 📊 Surveillance de canal source automatique
-- 💾 Stockage parties avec 3 cartes différentes
-- 📤 Export Excel quotidien à 00h59 (UTC+1)
-- 🔄 Reset automatique à 01h00
-- 🎯 Détection automatique du gagnant (Joueur/Banquier)
-- ❌ Filtrage des numéros consécutifs
-- 📥 **Import automatique dans Projet 2 après export**
-
-### ✅ **Projet 2: Système de Prédictions Excel**
-- 📥 Import de prédictions Excel (.xlsx)
-- 🚀 Lancement automatique basé sur proximité (tolérance 0-4)
-- 🔢 **Filtrage automatique des numéros consécutifs**
-- ✅ Vérification avec offsets (0, 1, 2)
-- 🎨 Format compact: 🔵{'{numéro}'} 👗 𝐕𝟏/𝐕𝟐👗
-- 📊 Statistiques en temps réel
-
----
-
-## 📋 Fichiers Inclus dans le Package
-
-### **Code Source (Projet 1 + Projet 2):**
-- ✅ `main.py` - Fichier principal (projets fusionnés)
-- ✅ `game_results_manager.py` - Gestionnaire résultats Projet 1
-- ✅ `yaml_manager.py` - Gestionnaire données YAML
-- ✅ `predictor.py` - Système de prédictions Projet 2
-- ✅ `excel_importer.py` - Import et gestion Excel Projet 2
-
-### **Configuration Render.com:**
-- ✅ `render.yaml` - Déploiement automatique
-- ✅ `Procfile` - Commande de démarrage
-- ✅ `runtime.txt` - Version Python 3.11
-- ✅ `requirements.txt` - Dépendances Python
-- ✅ `bot_config.json` - Configuration canaux
-- ✅ `.env.example` - Template variables d'environnement
-
-### **Structure:**
-- ✅ `data/` - Dossier pour fichiers YAML (auto-créé)
-- ✅ `README.md` - Ce fichier de documentation
-
----
-
-## 🚀 Déploiement sur Render.com
-
-### **Étape 1: Obtenir la Session Telegram**
-1. Lancez le bot localement une première fois
-2. Copiez la valeur TELEGRAM_SESSION affichée dans les logs
-3. Gardez cette valeur pour l'étape 3
-
-### **Étape 2: Créer un Repository GitHub**
-1. Allez sur [github.com](https://github.com)
-2. Créez un nouveau repository (public ou privé)
-3. Uploadez **TOUS** les fichiers du package "render_final.zip"
-
-### **Étape 3: Connecter à Render.com**
-1. Allez sur [render.com](https://render.com)
-2. Cliquez sur **"New +"** → **"Web Service"**
-3. Connectez votre repository GitHub
-4. Render détectera automatiquement `render.yaml`
-
-### **Étape 4: Configurer les Variables d'Environnement**
-Dans la section **Environment** de Render.com, ajoutez:
-
-| Variable | Valeur | Où l'obtenir |
-|----------|--------|--------------|
-| **PORT** | 10000 | Déjà configuré automatiquement |
-| **API_ID** | Votre ID | https://my.telegram.org |
-| **API_HASH** | Votre Hash | https://my.telegram.org |
-| **BOT_TOKEN** | Token du bot | @BotFather sur Telegram |
-| **ADMIN_ID** | Votre ID Telegram | @userinfobot sur Telegram |
-| **TELEGRAM_SESSION** | Session string | Copié depuis l'étape 1 |
-
-⚠️ **IMPORTANT:** Sans TELEGRAM_SESSION, le bot s'arrêtera après 10 minutes!
-
-### **Étape 5: Déployer**
-1. Cliquez sur **"Create Web Service"**
-2. Attendez le déploiement (2-3 minutes)
-3. ✅ Le bot sera en ligne 24/7 sur le port 10000!
-
----
-
-## 📊 Commandes Disponibles
-
-### **Projet 1 (Stockage de Résultats):**
-- `/start` - Démarrer le bot et voir les infos
-- `/status` - Voir les statistiques
-- `/fichier` - Exporter résultats en Excel
-- `/reset` - Reset manuel de la base
-- `/set_channel <ID>` - Configurer canal source
-- `/stop_transfer` - Désactiver transfert messages
-- `/start_transfer` - Réactiver transfert messages
+        lines = ["🗓️ **Tâches planifiées** (heure Bénin UTC+1)\n"]
+        for job in scheduler.jobs_info():
+            state = "⏳ en cours" if job['running'] else ("❌ " + job['last_error'] if job['last_error'] else "✅")
+            last_run = job['last_run'][:16].replace('T', ' ') if job['last_run'] else "jamais"
+            next_run = job['next_run'][:16].replace('T', ' ') if job['next_run'] else "-"
+            duration = f" ({job['last_duration']:.2f}s)" if job['last_duration'] is not None else ""
+            lines.append(f"• **{job['name']}** `{job['schedule']}` {state}\n"
+                         f"  Dernière: {last_run}{duration} • Prochaine: {next_run}")
+        lines.append("\nDéclencher: `/jobs run <nom>`")
+        await event.respond("\n".join(lines))
+
+    except Exception as e:
+        logger.error(f"❌ Erreur commande jobs: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+
+@client.on(events.NewMessage(pattern='/compact'))
+async def cmd_compact(event):
+    """Lance un passage complet de compaction et affiche l'espace récupéré"""
+    if event.is_group or event.is_channel:
+        return
+
+    if event.sender_id != ADMIN_ID:
+        await event.respond("❌ Commande réservée à l'administrateur")
+        return
 
-### **Projet 2 (Prédictions Excel):**
-- `/set_display <ID>` - Configurer canal affichage
-- `/stats_excel` - Statistiques prédictions Excel
-- `/clear_excel` - Effacer toutes les prédictions
-- **Envoyer fichier Excel (.xlsx)** - Import automatique
+    try:
+        await event.respond("🗜️ Compaction des fichiers de données en cours...")
+        report = await compactor.run()
 
-### **Autres Commandes:**
-- `/deploy` - Créer package Render.com (Projet 1)
-- `/deploy_duo2` - Créer package "Render Final" (Projet 1 + 2)
-- `/help` - Aide complète
-
----
-
-## ⚙️ Configuration Technique
-
-| Paramètre | Valeur |
-|-----------|--------|
-| **Plateforme** | Render.com |
-| **Port** | 10000 (auto-configuré) |
-| **Python** | 3.11.0 |
-| **Timezone** | Africa/Porto-Novo (UTC+1) |
-| **Export auto** | 00h59 chaque jour |
-| **Reset auto** | 01h00 chaque jour |
-| **Import auto Projet 2** | Après export Projet 1 |
+        lines = [f"🗜️ **Compaction terminée** en {report['duration']:.2f}s\n"]
+        for name, reclaimed in report['steps'].items():
+            lines.append(f"• {name}: {format_bytes(reclaimed)}")
+        lines.append(f"\n✅ Récupéré: **{format_bytes(report['reclaimed'])}**"
+                     f" (total depuis le démarrage: {format_bytes(compactor.total_reclaimed)})")
+        await event.respond("\n".join(lines))
 
----
+    except Exception as e:
+        logger.error(f"❌ Erreur commande compact: {e}")
+        await event.respond(f"❌ Erreur: {e}")
 
-## 📥 Format Excel Requis (Projet 2)
 
-Votre fichier Excel doit avoir cette structure:
-
-| Date & Heure | Numéro | Victoire (Joueur/Banquier) |
-|--------------|--------|----------------------------|
-| 03/01/2025 - 14:20 | 881 | Banquier |
-| 03/01/2025 - 14:26 | 886 | Joueur |
-| 03/01/2025 - 14:40 | 891 | Joueur |
+@client.on(events.NewMessage(pattern='/historique'))
+async def cmd_historique(event):
+    """Consulte les résultats: /historique [from=AAAA-MM-JJ] [to=...] [min=N] [max=N] [gagnant=joueur|banquier] [limit=N]"""
+    if event.is_group or event.is_channel:
+        return
 
-**⚠️ Important:** Les numéros consécutifs (ex: 56→57) sont automatiquement filtrés à l'import.
+    if event.sender_id != ADMIN_ID:
+        await event.respond("❌ Commande réservée à l'administrateur")
+        return
 
----
+    try:
+        params = dict(part.split('=', 1) for part in event.message.message.split()[1:] if '=' in part)
+        params.setdefault('limit', '20')
+        params.setdefault('order', 'desc')
+        try:
+            filters = parse_filters(params)
+        except ValueError as e:
+            await event.respond(f"❌ {e}\n\nExemple: `/historique gagnant=banquier from=2025-01-01 limit=10`")
+            return
 
-## 🎯 Critères d'Enregistrement (Projet 1)
+        page = results_query.query(filters)
+        stats = results_query.stats(filters)
 
-### ✅ **Parties enregistrées:**
-- Premier groupe: **exactement 3 cartes de couleurs différentes**
-- Deuxième groupe: **PAS 3 cartes**
-- Gagnant identifiable: **Joueur** ou **Banquier**
-- Message finalisé avec symbole **✅**
+        lines = [f"📜 **Historique** — {page['total']} résultat(s)",
+                 f"👤 Joueur: {stats['joueur_victoires']} ({stats['taux_joueur']:.1f}%) • "
+                 f"🏦 Banquier: {stats['banquier_victoires']} ({stats['taux_banquier']:.1f}%)\n"]
+        for item in page['items']:
+            lines.append(f"#{item['numero']:03d} • {item['date']} {str(item['heure'])[:5]} • {item['gagnant']}")
+        if page['total'] > page['offset'] + len(page['items']):
+            lines.append(f"\n… suite avec `offset={page['offset'] + len(page['items'])}`")
+        await event.respond("\n".join(lines))
 
-### ❌ **Parties ignorées:**
-- Match nul
-- Les deux groupes ont 3 cartes
-- Numéros consécutifs (N puis N+1)
-- Messages en cours (symbole ⏰)
-- Messages avec symbole 🔰
+    except Exception as e:
+        logger.error(f"❌ Erreur commande historique: {e}")
+        await event.respond(f"❌ Erreur: {e}")
 
----
 
-## 🔄 Workflow Quotidien Automatique
+@client.on(events.NewMessage(pattern=r'/add_channel'))
+async def cmd_add_channel(event):
+    """Surveille un canal source supplémentaire: /add_channel <ID source> [ID affichage]"""
+    if event.is_group or event.is_channel:
+        return
 
-**À 00h59 (Heure Bénin UTC+1):**
-1. 📊 Export Excel Projet 1
-2. 📤 Envoi fichier à l'admin
-3. 📥 **Import automatique dans Projet 2** (remplacement)
-4. 💬 Message de confirmation import
+    if event.sender_id != ADMIN_ID:
+        await event.respond("❌ Commande réservée à l'administrateur")
+        return
 
-**À 01h00:**
-5. 🔄 Reset base de données Projet 1
-6. ✅ Système prêt pour nouvelle journée
+    try:
+        parts = event.message.message.split()
+        try:
+            channel_id = int(parts[1])
+            display_channel = int(parts[2]) if len(parts) > 2 else None
+        except (IndexError, ValueError):
+            await event.respond("❌ Usage: `/add_channel <ID source> [ID affichage]`")
+            return
 
----
+        if channel_id == detected_stat_channel:
+            await event.respond("❌ Ce canal est déjà le canal principal (voir /status)")
+            return
 
-## 🛠️ Dépannage
+        ctx = await asyncio.to_thread(channel_registry.add, channel_id, display_channel)
+        publish_status('channels')
+        await event.respond(f"""✅ **Canal ajouté**
 
-### **Problème: Bot ne démarre pas**
-- ✅ Vérifiez que toutes les variables d'environnement sont définies
-- ✅ Vérifiez les logs dans Render.com
-- ✅ Assurez-vous que le port 10000 est bien configuré
+📥 Source: `{channel_id}`
+📤 Affichage: {f'`{display_channel}`' if display_channel else 'aucun (prédictions Excel désactivées)'}
+📁 Données: `{ctx.data_dir}`
 
-### **Problème: Prédictions Excel non lancées**
-- ✅ Vérifiez que le canal source est configuré avec `/set_channel`
-- ✅ Vérifiez que le canal d'affichage est configuré avec `/set_display`
-- ✅ Vérifiez le format du fichier Excel
+Canaux supplémentaires: {len(channel_registry)} • Voir /channels""")
+        logger.info(f"✅ Canal supplémentaire ajouté: {channel_id} (affichage: {display_channel})")
 
-### **Problème: Export quotidien ne fonctionne pas**
-- ✅ Vérifiez que la timezone est bien Africa/Porto-Novo (UTC+1)
-- ✅ Vérifiez les logs à 00h59 et 01h00
-- ✅ Assurez-vous que des parties ont été enregistrées
+    except Exception as e:
+        logger.error(f"❌ Erreur commande add_channel: {e}")
+        await event.respond(f"❌ Erreur: {e}")
 
----
 
-## 📞 Support
+@client.on(events.NewMessage(pattern=r'/remove_channel'))
+async def cmd_remove_channel(event):
+    """Arrête de surveiller un canal supplémentaire: /remove_channel <ID> (les fichiers sont conservés)"""
+    if event.is_group or event.is_channel:
+        return
 
-**Développé par:** Sossou Kouamé Appolinaire  
-**Package créé le:** {timestamp}  
-**Version:** Render Final  
-**Optimisé pour:** Render.com - Port 10000 avec StringSession
+    if event.sender_id != ADMIN_ID:
+        await event.respond("❌ Commande réservée à l'administrateur")
+        return
 
----
+    try:
+        parts = event.message.message.split()
+        try:
+            channel_id = int(parts[1])
+        except (IndexError, ValueError):
+            await event.respond("❌ Usage: `/remove_channel <ID source>`")
+            return
 
-## ✅ Checklist de Déploiement
+        if channel_registry.remove(channel_id):
+            publish_status('channels')
+            await event.respond(f"✅ Canal `{channel_id}` retiré (données conservées)")
+            logger.info(f"🗑️ Canal supplémentaire retiré: {channel_id}")
+        else:
+            await event.respond(f"❌ Canal `{channel_id}` non enregistré (voir /channels)")
 
-Avant de déployer, vérifiez:
+    except Exception as e:
+        logger.error(f"❌ Erreur commande remove_channel: {e}")
+        await event.respond(f"❌ Erreur: {e}")
 
-- [ ] Repository GitHub créé
-- [ ] Tous les fichiers du package uploadés
-- [ ] Variables d'environnement configurées sur Render.com
-- [ ] Port 10000 confirmé dans render.yaml
-- [ ] Service web créé sur Render.com
-- [ ] Déploiement réussi (vérifier les logs)
-- [ ] Bot répond à `/start` sur Telegram
-- [ ] Canal source configuré avec `/set_channel`
-- [ ] Canal affichage configuré avec `/set_display`
 
-**🎉 Le bot est prêt à fonctionner 24/7 sur Render.com!**"""
-            
-            zipf.writestr('README.md', readme)
-            logger.info("  ✅ Ajouté: README.md")
+@client.on(events.NewMessage(pattern='/channels'))
+async def cmd_channels(event):
+    """Liste les canaux sources surveillés et leurs statistiques"""
+    if event.is_group or event.is_channel:
+        return
+
+    if event.sender_id != ADMIN_ID:
+        await event.respond("❌ Commande réservée à l'administrateur")
+        return
+
+    try:
+        contexts = ([channel_context(detected_stat_channel)] if detected_stat_channel else []) + list(channel_registry)
+        if not contexts:
+            await event.respond("📡 Aucun canal surveillé\n\nAjouter: `/add_channel <ID source> [ID affichage]`")
+            return
+
+        # En mode superviseur, les statistiques des canaux supplémentaires viennent des processus de travail
+        remote = {item['channel_id']: item for item in await worker_pool.channels_info()} if worker_pool else {}
+
+        lines = ["📡 **Canaux surveillés**\n"]
+        for ctx in contexts:
+            info = {**ctx.info(), **remote.get(ctx.channel_id, {})}
+            label = "principal" if ctx is primary_channel else "supplémentaire"
+            display = f"`{info['display_channel']}`" if info['display_channel'] else "aucun"
+            lines.append(f"• `{info['channel_id']}` ({label}) → affichage {display}\n"
+                         f"  {info.get('results', '?')} parties • {info['processed']} messages traités • "
+                         f"{info.get('excel_predictions', {}).get('pending', '?')} prédictions en attente")
+        lines.append("\nAjouter: `/add_channel <ID source> [ID affichage]` • Retirer: `/remove_channel <ID>`")
+        await event.respond("\n".join(lines))
+
+    except Exception as e:
+        logger.error(f"❌ Erreur commande channels: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+
+@client.on(events.NewMessage(pattern='/deploy_duo2'))
+async def cmd_deploy_duo2(event):
+    """Envoie le package 'Render Final V2' (Projet 1 + Projet 2) pour Render.com (Port 10000)"""
+    if event.is_group or event.is_channel:
+        return
+
+    if event.sender_id != ADMIN_ID:
+        await event.respond("❌ Commande réservée à l'administrateur")
+        return
+
+    try:
+        config = {
+            "stat_channel": detected_stat_channel,
+            "display_channel": detected_display_channel,
+            "prediction_interval": prediction_interval
+        }
+        package = await package_builder.get('render_final_v2.zip', deploy_sources(), render_duo_package(config),
+                                            datetime.now(BENIN_TZ))
+        built_at = datetime.fromisoformat(package['built_at'])
+        file_size = package['size'] / 1024
+        caption = deploy_templates.DUO_CAPTION.format(created_short=built_at.strftime('%d/%m/%Y %H:%M:%S'),
+                                                      size_kb=file_size)
+
+        await upload_cache.send(event.chat_id, package['path'], caption=_package_caption(caption, package))
+        await client.send_message(event.chat_id, deploy_templates.DUO_DETAILS)
+
+        logger.info(f"✅ Package 'render_final_v2.zip' envoyé ({file_size:.1f} KB, "
+                    f"{'réutilisé' if package['reused'] else 'construit'})")
 
-        file_size = os.path.getsize(package_name) / 1024
-        
-        # Caption court pour le fichier
-        short_caption = f"""✅ **Package "Render Final V2" créé!**
-
-📅 {now_benin.strftime('%d/%m/%Y %H:%M:%S')} (Bénin)
-📁 render_final_v2.zip ({file_size:.1f} KB)
-🚀 Optimisé Render.com - Port 10000"""
-
-        # Message détaillé séparé
-        detailed_msg = f"""**🆕 Nouveautés V2:**
-✅ Format: 🔵{'{numero}'} 👗 𝐕𝟏/𝐕𝟐👗 statut: ⏳
-✅ Notifications admin désactivées
-✅ Affichage optimisé
-
-**📦 Contenu:**
-• Projet 1: Stockage résultats
-• Projet 2: Prédictions Excel
-• Configuration complète Render.com
-
-**📂 Fichiers inclus:**
-• main.py, game_results_manager.py
-• yaml_manager.py, predictor.py, excel_importer.py
-• render.yaml, Procfile, runtime.txt
-• requirements.txt, bot_config.json
-• .env.example, README.md
-
-**🚀 Déploiement:**
-1. Lancer localement → copier TELEGRAM_SESSION
-2. Upload GitHub
-3. Connecter Render.com
-4. Variables: API_ID, API_HASH, BOT_TOKEN, ADMIN_ID, TELEGRAM_SESSION
-5. Déployer!
-
-**🔄 Quotidien (00h59):**
-• Export Excel → Import auto Projet 2 → Reset
-
-Le bot tourne 24/7 sur port 10000! 🎉"""
-
-        await client.send_file(
-            event.chat_id,
-            package_name,
-            caption=short_caption
-        )
-        
-        await client.send_message(event.chat_id, detailed_msg)
-        
-        logger.info(f"✅ Package 'render_final_v2.zip' créé pour Render.com: {file_size:.1f} KB")
-        
     except Exception as e:
         logger.error(f"❌ Erreur création render_final_v2: {e}")
         await event.respond(f"❌ Erreur: {e}")
@@ -1241,19 +1110,26 @@ Le bot surveille un canal et stocke automatiquement les parties qui remplissent
 **Commandes Projet 1 (Stockage):**
 • `/start` - Message de bienvenue
 • `/status` - Voir les statistiques
-• `/fichier` - Exporter en fichier Excel manuellement
+• `/fichier [xlsx|csv|ndjson]` - Exporter les résultats (Excel par défaut)
 • `/deploy` - Créer un package pour déployer sur Replit
 • `/reset` - Remettre à zéro la base de données manuellement
 • `/stop_transfer` - Désactiver le transfert des messages du canal
 • `/start_transfer` - Réactiver le transfert des messages du canal
 • `/set_channel <ID>` - Configurer le canal source
+• `/jobs [run <nom>]` - Voir / déclencher les tâches planifiées
+• `/compact` - Compacter les fichiers de données et supprimer les anciens
+• `/historique [gagnant=…] [from=…] [to=…] [min=…] [max=…]` - Consulter les résultats enregistrés
+• `/channels` - Canaux sources surveillés
+• `/add_channel <ID source> [ID affichage]` - Surveiller un canal supplémentaire
+• `/remove_channel <ID>` - Arrêter de surveiller un canal supplémentaire
 
 **Commandes Projet 2 (Prédictions):**
 • `/set_display <ID>` - Configurer le canal d'affichage
 • `/stats_excel` - Statistiques des prédictions Excel
 • `/clear_excel` - Effacer toutes les prédictions
+• `/restore_excel [id]` - Lister / restaurer une sauvegarde des prédictions
 • `/deploy_duo2` - Créer package Render Final (Projet 1 + 2)
-• Envoyer fichier Excel - Import automatique des prédictions
+• Envoyer fichier Excel - Import automatique des prédictions (ID d'un canal de /channels en légende pour un canal supplémentaire)
 
 • `/help` - Afficher cette aide
 
@@ -1292,6 +1168,8 @@ async def index(request):
         <ul>
             <li><a href="/health">Health Check</a></li>
             <li><a href="/status">Statut et Statistiques (JSON)</a></li>
+            <li><a href="/results">Résultats (JSON, filtres: from, to, min, max, gagnant, offset, limit)</a></li>
+            <li><a href="/results/stats">Statistiques filtrées (JSON)</a></li>
         </ul>
     </body>
     </html>
@@ -1306,23 +1184,88 @@ async def health_check(request):
 
 async def status_api(request):
     """Endpoint de statut"""
-    stats = results_manager.get_stats()
     status_data = {
-        "status": "running",
-        "channel_configured": detected_stat_channel is not None,
-        "channel_id": detected_stat_channel,
-        "stats": stats,
-        "timestamp": datetime.now().isoformat()
+        **status_summary(),
+        "channels": channel_registry.info(),
+        "workers": worker_pool.stats() if worker_pool else None,
+        "leader": leader_lease.info() if leader_lease else None,
+        "jobs": scheduler.jobs_info(),
+        "compaction": compactor.stats(),
+        "events": event_hub.stats()
     }
     return web.json_response(status_data)
 
 
+def _conditional_json(request, resource, compute):
+    """Réponse JSON avec ETag: 304 sans recalcul si le client a déjà la version courante"""
+    try:
+        filters = parse_filters(request.query)
+    except ValueError as e:
+        return web.json_response({"error": str(e)}, status=400)
+
+    etag = results_query.etag(filters, resource)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag in [tag.strip() for tag in request.headers.get("If-None-Match", "").split(",")]:
+        return web.Response(status=304, headers=headers)
+    return web.json_response(compute(filters), headers=headers)
+
+
+async def results_api(request):
+    """Endpoint des résultats: filtres from/to, min/max, gagnant, pagination offset/limit"""
+    return _conditional_json(request, "results", results_query.query)
+
+
+async def results_stats_api(request):
+    """Endpoint des statistiques sur les résultats filtrés"""
+    return _conditional_json(request, "results/stats", results_query.stats)
+
+
+async def events_stream(request):
+    """
+    Flux en direct (Server-Sent Events): parties enregistrées ('game'), prédictions lancées
+    ou terminées ('prediction') et changements d'état ('status', aussi envoyé à la connexion)
+    """
+    response = web.StreamResponse(headers={
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    await response.prepare(request)
+    subscriber = event_hub.subscribe(request.headers.get("Last-Event-ID"))
+    try:
+        await response.write(EventHub.encode('status', {**status_summary(), "reason": "connected"}))
+        while True:
+            try:
+                message = await asyncio.wait_for(subscriber.queue.get(), SSE_KEEPALIVE)
+            except asyncio.TimeoutError:
+                message = b": keepalive\n\n"
+            if message is None:
+                break  # Client trop lent (file pleine) ou arrêt du bot
+            await response.write(message)
+    except ConnectionResetError:
+        pass
+    finally:
+        event_hub.unsubscribe(subscriber)
+    return response
+
+
+@web.middleware
+async def state_ready_middleware(request, handler):
+    """Les routes qui lisent l'état attendent la fin du chargement (/ et /health répondent tout de suite)"""
+    if request.path not in ('/', '/health') and not state_ready.is_set():
+        await state_ready.wait()
+    return await handler(request)
+
+
 async def start_web_server():
     """Démarre le serveur web en arrière-plan"""
-    app = web.Application()
+    app = web.Application(middlewares=[state_ready_middleware])
     app.router.add_get('/', index)
     app.router.add_get('/health', health_check)
     app.router.add_get('/status', status_api)
+    app.router.add_get('/results', results_api)
+    app.router.add_get('/results/stats', results_stats_api)
+    app.router.add_get('/events', events_stream)
 
     runner = web.AppRunner(app)
     await runner.setup()
@@ -1332,36 +1275,21 @@ async def start_web_server():
 
 
 auto_export_task = None
+# Tâches lancées sans être attendues (rapports journaliers): la boucle ne garde qu'une
+# référence faible, la référence forte est gardée ici jusqu'à la fin de la tâche
+background_tasks = set()
 
 
-async def daily_reset():
-    """Remise à zéro quotidienne à 00h59 du matin (heure du Bénin UTC+1)"""
-    while True:
-        try:
-            benin_tz = timezone(timedelta(hours=1))
-            now_benin = datetime.now(benin_tz)
-            next_reset_benin = now_benin.replace(hour=0, minute=59, second=0, microsecond=0)
-
-            if now_benin.hour >= 1 or (now_benin.hour == 0 and now_benin.minute >= 59):
-                next_reset_benin += timedelta(days=1)
-
-            wait_seconds = (next_reset_benin - now_benin).total_seconds()
-            logger.info(f"⏰ Prochaine remise à zéro dans {wait_seconds/3600:.1f} heures (à 00h59 heure Bénin)")
-
-            await asyncio.sleep(wait_seconds)
-
-            logger.info("🔄 REMISE À ZÉRO QUOTIDIENNE À 00H59...")
-
-            stats = results_manager.get_stats()
-            excel_file = None
-
-            if stats['total'] > 0:
-                date_str = (now_benin - timedelta(days=1)).strftime('%d-%m-%Y')
-                file_path = f"resultats_journee_{date_str}.xlsx"
-                excel_file = results_manager.export_to_txt(file_path=file_path)
+async def send_daily_report(export, stats, date_str, label=""):
+    """
+    Envoie le fichier Excel de la journée aux destinataires du rapport.
+    export: attente du fichier (généré dans un thread, ou déjà écrit par un processus de travail)
+    """
+    try:
+        excel_file = await export
 
-                if excel_file and os.path.exists(excel_file):
-                    caption = f"""📊 **Rapport Journalier du {date_str}**
+        if excel_file and os.path.exists(excel_file):
+            caption = f"""📊 **Rapport Journalier du {date_str}**{label}
 
 📈 Résultats de la journée (01h00 à 00h59):
 • Total: {stats['total']} parties
@@ -1370,61 +1298,142 @@ async def daily_reset():
 
 🔄 La base de données va être remise à zéro pour une nouvelle journée."""
 
-                    await client.send_file(
-                        ADMIN_ID,
-                        excel_file,
-                        caption=caption
-                    )
-                    logger.info(f"✅ Rapport journalier envoyé avec {stats['total']} parties")
-            else:
-                await client.send_message(
-                    ADMIN_ID,
-                    "📊 **Rapport Journalier**\n\nAucune partie enregistrée aujourd'hui (01h00 à 00h59)."
-                )
-                logger.info("ℹ️ Aucune donnée à exporter pour aujourd'hui")
-
-            # ✅ NOUVEAU : Importer automatiquement dans le Projet 2
-            if excel_file and os.path.exists(excel_file):
-                logger.info("📥 Import automatique du fichier Excel dans le Projet 2...")
-                import_result = excel_manager.import_excel(excel_file, replace_mode=True)
-                
-                if import_result['success']:
-                    consecutive_info = f", {import_result.get('consecutive_skipped', 0)} consécutifs ignorés" if import_result.get('consecutive_skipped', 0) > 0 else ""
-                    logger.info(f"✅ Import automatique réussi: {import_result['imported']} prédictions importées{consecutive_info}")
-                    
-                    import_msg = f"""
-📥 **Import Automatique dans Projet 2**
+            suffix = f"_{label.strip()}" if label else ""
+            # Un seul téléversement pour toutes les discussions destinataires
+            await upload_cache.send(
+                REPORT_CHATS,
+                excel_file,
+                caption=caption,
+                file_name=f"resultats_journee_{date_str}{suffix}.xlsx"
+            )
+            logger.info(f"✅ Rapport journalier{label} envoyé avec {stats['total']} parties")
+    except Exception as e:
+        logger.error(f"❌ Erreur envoi rapport journalier{label}: {e}")
 
-✅ Fichier Excel importé avec succès!
+
+async def daily_reset_channel(ctx: ChannelContext, date_str: str):
+    """Rapport, import dans le Projet 2 et remise à zéro d'un canal source"""
+    label = _channel_label(ctx)
+    manager = ctx.results_manager
+
+    # Sous le verrou du canal: aucun message n'est enregistré entre l'instantané et la remise à zéro
+    async with ctx.lock:
+        if manager is None:
+            # Canal tenu par un processus de travail: rapport, import et remise à zéro dans ce processus
+            outcome = await worker_pool.daily_reset(ctx.channel_id, ctx.display_channel)
+            stats, import_result = outcome['stats'], outcome['import']
+            export = asyncio.sleep(0, result=outcome['report']) if stats['total'] > 0 else None
+        else:
+            stats = manager.get_stats()
+            snapshot = manager.storage_snapshot()
+            import_result = None
+            export = None
+            if stats['total'] > 0:
+                # ✅ Transmission directe au Projet 2 (en mémoire, mêmes règles que l'import Excel)
+                logger.info(f"📥 Import automatique des résultats de la journée{label} dans le Projet 2...")
+                import_result = ctx.excel_manager.import_records(manager.iter_export_rows(snapshot[2]), replace_mode=True)
+                export = asyncio.to_thread(manager.export_cached, 'xlsx', snapshot)
+            manager.reset_results()
+
+    if stats['total'] > 0:
+        # Rapport Excel pour l'admin: généré en parallèle, hors du chemin critique
+        task = asyncio.create_task(send_daily_report(export, stats, date_str, label))
+        background_tasks.add(task)
+        task.add_done_callback(background_tasks.discard)
+
+        if import_result['success']:
+            consecutive_info = f", {import_result.get('consecutive_skipped', 0)} consécutifs ignorés" if import_result.get('consecutive_skipped', 0) > 0 else ""
+            logger.info(f"✅ Import automatique réussi{label}: {import_result['imported']} prédictions importées{consecutive_info}")
+
+            import_msg = f"""
+📥 **Import Automatique dans Projet 2**{label}
+
+✅ Résultats de la journée importés avec succès!
 • Prédictions importées: {import_result['imported']}
 • Anciennes remplacées: {import_result.get('old_count', 0)}
 • Consécutifs ignorés: {import_result.get('consecutive_skipped', 0)}
 • Total en base: {import_result['total']}
 
 Le système est prêt pour la nouvelle journée! 🎉"""
-                    
-                    await client.send_message(ADMIN_ID, import_msg)
-                else:
-                    logger.error(f"❌ Erreur import automatique: {import_result.get('error', 'Inconnue')}")
-                    await client.send_message(
-                        ADMIN_ID,
-                        f"⚠️ **Erreur import automatique Projet 2**\n\n{import_result.get('error', 'Erreur inconnue')}"
-                    )
-
-            results_manager._save_yaml([])
-            logger.info("✅ Base de données remise à zéro")
 
+            await client.send_message(ADMIN_ID, import_msg)
+        else:
+            logger.error(f"❌ Erreur import automatique{label}: {import_result.get('error', 'Inconnue')}")
             await client.send_message(
                 ADMIN_ID,
-                "🔄 **Remise à zéro effectuée à 00h59**\n\nLa base de données est maintenant vide et prête pour une nouvelle journée d'enregistrement."
+                f"⚠️ **Erreur import automatique Projet 2**{label}\n\n{import_result.get('error', 'Erreur inconnue')}"
             )
+    else:
+        await client.send_message(
+            ADMIN_ID,
+            f"📊 **Rapport Journalier**{label}\n\nAucune partie enregistrée aujourd'hui (01h00 à 00h59)."
+        )
+        logger.info(f"ℹ️ Aucune donnée à exporter pour aujourd'hui{label}")
 
-        except asyncio.CancelledError:
-            logger.info("🛑 Tâche de remise à zéro arrêtée")
-            break
+    logger.info(f"✅ Base de données remise à zéro{label}")
+
+
+async def daily_reset():
+    """Remise à zéro quotidienne à 00h59 du matin (heure du Bénin UTC+1) de chaque canal, tâche planifiée"""
+    logger.info("🔄 REMISE À ZÉRO QUOTIDIENNE À 00H59...")
+    date_str = (scheduler.now() - timedelta(days=1)).strftime('%d-%m-%Y')
+
+    failures = []
+    for ctx in [primary_channel, *channel_registry]:
+        try:
+            await daily_reset_channel(ctx, date_str)
         except Exception as e:
-            logger.error(f"❌ Erreur remise à zéro: {e}")
-            await asyncio.sleep(3600)
+            logger.error(f"❌ Erreur remise à zéro{_channel_label(ctx)}: {e}")
+            failures.append(e)
+
+    publish_status('daily_reset')
+    await client.send_message(
+        ADMIN_ID,
+        "🔄 **Remise à zéro effectuée à 00h59**\n\nLa base de données est maintenant vide et prête pour une nouvelle journée d'enregistrement."
+    )
+    if failures:
+        raise failures[0]
+
+
+async def warm_export_cache():
+    """Prépare le fichier Excel en avance pour que /fichier et le rapport le réutilisent"""
+    snapshot = results_manager.storage_snapshot()
+    await asyncio.to_thread(results_manager.export_cached, 'xlsx', snapshot)
+
+
+scheduler.add_job('daily_reset', daily_reset, '59 0 * * *')
+scheduler.add_job('state_snapshot', state_snapshot.save_async, '*/5 * * * *', catch_up=False)
+scheduler.add_job('export_cache', warm_export_cache, '30 * * * *', jitter=120, catch_up=False)
+scheduler.add_job('compaction', lambda: compactor.run(COMPACTION_BUDGET), '*/15 * * * *', jitter=60, catch_up=False)
+
+# Étapes qui modifient un état en mémoire: dans la boucle d'événements
+compactor.add_step('message_log', yaml_manager.compact_message_log)
+compactor.add_step('predictions', lambda: reclaimed_by(yaml_manager.compact_predictions,
+                                                       [str(yaml_manager.predictions_file)]))
+compactor.add_step('predictions_archive', yaml_manager.rotate_predictions_archive)
+compactor.add_step('excel_predictions', lambda: reclaimed_by(excel_manager.save_predictions,
+                                                             [excel_manager.predictions_file]))
+# Étapes qui ne touchent que des fichiers: dans un thread
+compactor.add_step('archives', lambda: prune_files([str(yaml_manager.archives_dir / '*.yaml.gz')],
+                                                   max_age_days=90, max_count=30), in_thread=True)
+compactor.add_step('auto_predictions', yaml_manager.cleanup_old_data, in_thread=True)
+compactor.add_step('excel_snapshots', lambda: reclaimed_by(excel_manager.snapshots.prune,
+                                                           [str(excel_manager.snapshots.directory / '*.yaml.gz')]),
+                   in_thread=True)
+compactor.add_step('excel_backups', lambda: prune_files(['excel_predictions_backup_*'],
+                                                        max_age_days=7, max_count=5), in_thread=True)
+compactor.add_step('exports', lambda: prune_files(['resultats_*.xlsx'], max_age_days=7, max_count=10) + sum(
+    # Un fichier par version du stockage: seuls les fichiers courants (ou récents) sont gardés
+    ctx.results_manager.export_cache.prune() if ctx.results_manager
+    else prune_exports(Path(ctx.data_dir) / 'exports')
+    for ctx in [primary_channel, *channel_registry]), in_thread=True)
+if update_recorder:
+    compactor.add_step('captures', update_recorder.compress_old, in_thread=True)
+    compactor.add_step('captures_retention', lambda: prune_files(['data/captures/updates-*.ndjson.gz'],
+                                                                max_age_days=30), in_thread=True)
+compactor.add_step('channel_snapshots', lambda: sum(
+    reclaimed_by(ctx.excel_manager.snapshots.prune, [str(ctx.excel_manager.snapshots.directory / '*.yaml.gz')])
+    for ctx in channel_registry if ctx.excel_manager), in_thread=True)
 
 
 # ==================== COMMANDES PROJET 2 ====================
@@ -1450,6 +1459,7 @@ async def set_display_channel(event):
         channel_id = int(parts[1])
         detected_display_channel = channel_id
         save_config()
+        publish_status('set_display')
         
         await event.respond(f"✅ Canal d'affichage configuré: {channel_id}")
         logger.info(f"✅ Canal d'affichage configuré: {channel_id}")
@@ -1459,6 +1469,17 @@ async def set_display_channel(event):
         await event.respond(f"❌ Erreur: {e}")
 
 
+def excel_target_context(caption):
+    """Canal ciblé par un fichier Excel: ID en légende (canal supplémentaire), sinon le canal principal"""
+    match = re.search(r'-?\d{5,}', caption or '')
+    if not match:
+        return primary_channel
+    channel_id = int(match.group())
+    if detected_stat_channel and channel_id == detected_stat_channel:
+        return primary_channel
+    return channel_registry.get(channel_id)
+
+
 @client.on(events.NewMessage())
 async def handle_excel_file(event):
     """Gestion de l'import de fichier Excel (Projet 2)"""
@@ -1466,12 +1487,23 @@ async def handle_excel_file(event):
         if event.media and hasattr(event.media, 'document'):
             doc = event.media.document
             if doc.mime_type in ['application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'application/vnd.ms-excel']:
+                # Légende avec l'ID d'un canal supplémentaire: import dans les prédictions de ce canal
+                ctx = excel_target_context(event.message.message)
+                if ctx is None:
+                    await event.respond("❌ Canal inconnu: utilisez l'ID d'un canal de /channels en légende")
+                    return
+
                 file_path = await event.download_media()
                 
-                result = excel_manager.import_excel(file_path, replace_mode=True)
+                if ctx.excel_manager is None:
+                    # Canal tenu par un processus de travail: import dans ce processus
+                    async with ctx.lock:
+                        result = await worker_pool.import_excel(ctx.channel_id, ctx.display_channel, file_path)
+                else:
+                    result = ctx.excel_manager.import_excel(file_path, replace_mode=True)
                 
                 if result['success']:
-                    stats_msg = f"""✅ **Import Excel réussi (REMPLACEMENT)**
+                    stats_msg = f"""✅ **Import Excel réussi (REMPLACEMENT)**{_channel_label(ctx)}
 
 📊 **Résultat**:
 • Importées: {result['imported']}
@@ -1483,6 +1515,8 @@ Mode: {result['mode']}"""
                     
                     if result.get('old_count'):
                         stats_msg += f"\n• Anciennes prédictions: {result['old_count']}"
+                    if result.get('out_of_range'):
+                        stats_msg += f"\n• Numéros hors limites ignorés: {result['out_of_range']}"
                         
                     await event.respond(stats_msg)
                 else:
@@ -1536,27 +1570,138 @@ async def clear_excel_command(event):
         await event.respond(f"❌ Erreur: {e}")
 
 
+@client.on(events.NewMessage(pattern=r'/restore_excel'))
+async def restore_excel_command(event):
+    """Liste ou restaure les sauvegardes des prédictions Excel (Projet 2)"""
+    if event.is_group or event.is_channel:
+        return
+
+    if event.sender_id != ADMIN_ID:
+        await event.respond("❌ Seul l'administrateur peut restaurer les prédictions")
+        return
+
+    try:
+        parts = event.message.message.split()
+
+        if len(parts) < 2:
+            backups = excel_manager.list_backups()
+            if not backups:
+                await event.respond("ℹ️ Aucune sauvegarde disponible")
+                return
+
+            msg = "🗂️ **Sauvegardes des prédictions Excel**\n"
+            for backup in backups[:10]:
+                msg += f"\n• `{backup['id']}` - {backup['created_at']} ({backup['size'] / 1024:.1f} KB)"
+            msg += "\n\nUsage: `/restore_excel <id>` ou `/restore_excel latest`"
+            await event.respond(msg)
+            return
+
+        # Lecture, décompression et réécriture dans un thread; le verrou du canal principal
+        # empêche un message de modifier les prédictions pendant le remplacement
+        async with primary_channel.lock:
+            result = await asyncio.to_thread(excel_manager.restore_backup, parts[1])
+
+        if result['success']:
+            await event.respond(f"""✅ **Sauvegarde restaurée**
+
+• Total: {result['total']}
+• Lancées: {result['launched']}
+• En attente: {result['pending']}""")
+            logger.info(f"✅ Sauvegarde Excel restaurée: {parts[1]}")
+        else:
+            await event.respond(f"❌ Erreur restauration: {result['error']}")
+
+    except Exception as e:
+        logger.error(f"❌ Erreur restore_excel: {e}")
+        await event.respond(f"❌ Erreur: {e}")
+
+
+async def on_leadership_lost():
+    """Une autre instance détient le bail: arrêt du traitement (Render relance l'instance en attente)"""
+    logger.warning("⚠️ Bail leader perdu: arrêt du traitement des messages")
+    await client.disconnect()
+
+
 async def main():
     """Fonction principale"""
+    # Arrêt propre sur SIGTERM (déploiement Render): sauvegarde de l'état et libération du bail
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    startup_timings["config"] = round(time.perf_counter() - IMPORTS_DONE, 3)
+    keep_alive_task = None
     try:
         await start_web_server()
 
+        reload_state = True
+        if leader_lease:
+            waiting_since = datetime.now()
+            current = leader_lease.current_holder()
+            if current and current['holder'] != leader_lease.holder:
+                logger.info(f"⏳ Instance en attente: bail détenu par {current['holder']}")
+                await load_state()  # Instance en attente avec son état chargé
+            await leader_lease.wait_for_leadership()
+            # Recharger l'état laissé par l'ancienne instance
+            reload_state = (not state_ready.is_set()
+                            or (datetime.now() - waiting_since).total_seconds() > leader_lease.heartbeat_seconds)
+            logger.info(f"👑 Instance leader ({leader_lease.holder})")
+            keep_alive_task = asyncio.create_task(leader_lease.keep_alive(on_leadership_lost))
+
+        # Processus de travail créés par le processus intermédiaire, une fois leader
+        if worker_pool:
+            worker_pool.start()
+            logger.info(f"✅ Mode superviseur: {WORKER_PROCESSES} processus de travail pour les canaux supplémentaires")
+        elif WORKER_PROCESSES > 0:
+            logger.warning("⚠️ WORKER_PROCESSES ignoré: fork non disponible sur cette plateforme")
+
+        # Chargement de l'état (thread) et connexion Telegram en parallèle
+        state_task = asyncio.create_task(load_state()) if reload_state else None
+        connect_started = time.perf_counter()
         success = await start_bot()
+        startup_timings["connect"] = round(time.perf_counter() - connect_started, 3)
+        if state_task:
+            await state_task
+        if leader_lease:
+            publish_status('leader')
         if not success:
             logger.error("❌ Échec du démarrage du bot")
             return
 
+        if detected_stat_channel:
+            logger.info(f"📊 Surveillance du canal: {detected_stat_channel}")
+        else:
+            logger.info("⚠️ Aucun canal configuré. Ajoutez le bot à un canal pour commencer.")
+
+        startup_timings["ready"] = round(time.perf_counter() - STARTUP_STARTED, 3)
+        logger.info("⏱️ Démarrage en %.2fs: import %.2fs, configuration %.2fs, état %.2fs, connexion %.2fs "
+                    "(état et connexion en parallèle)", startup_timings["ready"], startup_timings["import"],
+                    startup_timings["config"], startup_timings.get("state", 0), startup_timings["connect"])
         logger.info("✅ Bot complètement opérationnel")
         logger.info("📊 En attente de messages...")
 
-        asyncio.create_task(daily_reset())
-        logger.info("✅ Tâche de remise à zéro démarrée")
+        scheduler.start()
+        logger.info(f"✅ Tâches planifiées démarrées: {', '.join(scheduler.jobs)}")
 
         await client.run_until_disconnected()
 
+    except asyncio.CancelledError:
+        logger.info("🛑 Arrêt demandé (SIGTERM)")
     except Exception as e:
         logger.error(f"❌ Erreur dans main: {e}")
     finally:
+        if keep_alive_task:
+            keep_alive_task.cancel()
+        event_hub.close_all()
+        await scheduler.stop()
+        if worker_pool:
+            await asyncio.to_thread(worker_pool.stop)
+        # Après une perte du bail, les fichiers appartiennent à la nouvelle instance leader
+        if not leader_lease or leader_lease.is_leader:
+            state_snapshot.save()
+        if leader_lease and leader_lease.is_leader:
+            leader_lease.release()
         await client.disconnect()
 
 
@@ -1567,3 +1712,5 @@ if __name__ == '__main__':
         logger.info("🛑 Bot arrêté par l'utilisateur")
     except Exception as e:
         logger.error(f"❌ Erreur fatale: {e}")
+    finally:
+        shutdown_logging()
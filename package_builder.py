@@ -0,0 +1,130 @@
+"""
+Construction incrémentale des packages de déploiement (/deploy, /deploy_duo2)
+Chaque package a une empreinte calculée sur le contenu des fichiers sources et des
+fichiers générés (modèles, configuration). L'archive construite est conservée dans
+data/packages/ avec son empreinte: tant que rien ne change, elle est réutilisée sans
+rien relire ni recompresser. La construction se fait dans un thread (la boucle asyncio
+continue de traiter les messages des canaux).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from file_digest import CHUNK_SIZE, FileDigests
+
+logger = logging.getLogger(__name__)
+
+# Date fixe des fichiers générés pour le calcul de l'empreinte (la date réelle de
+# construction apparaît dans le README, elle ne doit pas rendre chaque package unique)
+FINGERPRINT_DATE = datetime(2000, 1, 1)
+
+# render(date de construction) -> {nom dans l'archive: contenu}
+Renderer = Callable[[datetime], Dict[str, str]]
+
+
+class PackageBuilder:
+    """Archives de déploiement mises en cache, indexées par empreinte du contenu"""
+
+    def __init__(self, cache_dir: str = "data/packages"):
+        self.cache_dir = Path(cache_dir)
+        self._digests = FileDigests()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.builds = 0
+        self.reuses = 0
+
+    def file_digest(self, path: str) -> str:
+        """Empreinte SHA-256 du fichier (mémorisée tant que le fichier ne change pas)"""
+        return self._digests.digest(path)
+
+    def fingerprint(self, sources: Sequence[str], render: Renderer) -> str:
+        """Empreinte du package: contenu des sources présentes + fichiers générés"""
+        sha = hashlib.sha256()
+        for path in sources:
+            digest = self.file_digest(path) if os.path.exists(path) else "absent"
+            sha.update(f"{path}\0{digest}\n".encode("utf-8"))
+        for arcname, content in sorted(render(FINGERPRINT_DATE).items()):
+            sha.update(f"{arcname}\0".encode("utf-8"))
+            sha.update(content.encode("utf-8"))
+            sha.update(b"\n")
+        return sha.hexdigest()
+
+    def _paths(self, name: str) -> Tuple[Path, Path]:
+        return self.cache_dir / name, self.cache_dir / f"{name}.json"
+
+    def _load_manifest(self, manifest_path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def build(self, name: str, sources: Sequence[str], render: Renderer,
+              now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Retourne l'archive du package (synchrone, à appeler dans un thread):
+        {"path", "fingerprint", "built_at", "size", "files", "reused", "duration"}
+        L'archive existante est réutilisée si son empreinte correspond au contenu actuel.
+        """
+        import zipfile  # Chargé à la première construction (démarrage plus rapide)
+
+        started = time.perf_counter()
+        archive_path, manifest_path = self._paths(name)
+        fingerprint = self.fingerprint(sources, render)
+
+        manifest = self._load_manifest(manifest_path)
+        if manifest and manifest.get("fingerprint") == fingerprint and archive_path.exists():
+            self.reuses += 1
+            return {**manifest, "path": str(archive_path), "reused": True,
+                    "duration": time.perf_counter() - started}
+
+        now = now or datetime.now()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        date_time = now.timetuple()[:6]
+        files = []
+        temp_path = archive_path.with_name(archive_path.name + ".tmp")
+        with zipfile.ZipFile(temp_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+            for path in sources:
+                if os.path.exists(path):
+                    info = zipfile.ZipInfo(path, date_time)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    with open(path, "rb") as src, zipf.open(info, "w") as dst:
+                        for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                            dst.write(chunk)
+                    files.append(path)
+            for arcname, content in render(now).items():
+                info = zipfile.ZipInfo(arcname, date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zipf.writestr(info, content)
+                files.append(arcname)
+        # Remplacement atomique: un envoi en cours de l'ancienne archive n'est pas affecté
+        temp_path.replace(archive_path)
+
+        manifest = {
+            "fingerprint": fingerprint,
+            "built_at": now.isoformat(),
+            "size": archive_path.stat().st_size,
+            "files": files
+        }
+        with open(manifest_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        self.builds += 1
+        duration = time.perf_counter() - started
+        logger.info("📦 Package %s construit: %s fichiers, %s octets (%.0f ms)",
+                    name, len(files), manifest["size"], duration * 1000)
+        return {**manifest, "path": str(archive_path), "reused": False, "duration": duration}
+
+    async def get(self, name: str, sources: Sequence[str], render: Renderer,
+                  now: Optional[datetime] = None) -> Dict[str, Any]:
+        """Version asynchrone de build(): un seul calcul à la fois par package"""
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            return await asyncio.to_thread(self.build, name, sources, render, now)
+
+    def stats(self) -> Dict[str, int]:
+        return {"builds": self.builds, "reuses": self.reuses}
@@ -1,17 +1,129 @@
-
+import logging
 import re
 import random
+import heapq
+import time
+from collections import OrderedDict, deque
 from typing import Tuple, Optional, List
 
+logger = logging.getLogger(__name__)
+
+# Capacités des historiques (mémoire constante quelle que soit la durée de fonctionnement)
+HISTORY_CAPACITY = 1000        # last_predictions, status_log
+PROCESSED_CAPACITY = 5000      # processed_messages
+MESSAGES_CAPACITY = 1000       # prediction_messages, prediction_status
+
+
+class BoundedDict(OrderedDict):
+    """Dictionnaire à capacité fixe: l'entrée la plus ancienne est évincée quand il est plein"""
+
+    def __init__(self, capacity: int, on_evict=None):
+        super().__init__()
+        self.capacity = capacity
+        self.on_evict = on_evict
+
+    def __setitem__(self, key, value):
+        if key not in self and len(self) >= self.capacity:
+            old_key, old_value = self.popitem(last=False)
+            if self.on_evict:
+                self.on_evict(old_key, old_value)
+        super().__setitem__(key, value)
+
+
+class BoundedSet:
+    """Ensemble à capacité fixe (éviction dans l'ordre d'insertion)"""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._items = set()
+        self._order = deque()
+
+    def add(self, item):
+        if item in self._items:
+            return
+        if len(self._order) >= self.capacity:
+            self._items.discard(self._order.popleft())
+        self._items.add(item)
+        self._order.append(item)
+
+    def __contains__(self, item) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def clear(self):
+        self._items.clear()
+        self._order.clear()
+
+
+class RollingCounter:
+    """Victoires / défaites sur une fenêtre glissante (en secondes)"""
+
+    def __init__(self, window: int, capacity: int = 5000):
+        self.window = window
+        self._events = deque(maxlen=capacity)  # (horodatage, victoire)
+        self.wins = 0
+        self.losses = 0
+
+    def add(self, is_win: bool, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        self._evict(now)
+        if len(self._events) == self._events.maxlen:
+            self._forget(self._events[0][1])
+        self._events.append((now, is_win))
+        if is_win:
+            self.wins += 1
+        else:
+            self.losses += 1
+
+    def _forget(self, is_win: bool):
+        if is_win:
+            self.wins -= 1
+        else:
+            self.losses -= 1
+
+    def _evict(self, now: float):
+        cutoff = now - self.window
+        while self._events and self._events[0][0] < cutoff:
+            self._forget(self._events.popleft()[1])
+
+    def snapshot(self, now: Optional[float] = None) -> dict:
+        self._evict(time.time() if now is None else now)
+        total = self.wins + self.losses
+        return {
+            'total': total,
+            'wins': self.wins,
+            'losses': self.losses,
+            'win_rate': (self.wins / total * 100) if total > 0 else 0.0
+        }
+
+    def clear(self):
+        self._events.clear()
+        self.wins = 0
+        self.losses = 0
+
+
 class CardPredictor:
     """Card game prediction engine with pattern matching and result verification"""
     
     def __init__(self):
-        self.last_predictions = []  # Liste [(numéro, combinaison)]
-        self.prediction_status = {}  # Statut des prédictions par numéro
-        self.processed_messages = set()  # Pour éviter les doublons
-        self.status_log = []  # Historique des statuts
-        self.prediction_messages = {}  # Stockage des IDs de messages de prédiction
+        self.last_predictions = deque(maxlen=HISTORY_CAPACITY)  # Liste [(numéro, combinaison)]
+        self.prediction_status = BoundedDict(MESSAGES_CAPACITY, self._on_status_evicted)  # Statut des prédictions par numéro
+        self.processed_messages = BoundedSet(PROCESSED_CAPACITY)  # Pour éviter les doublons
+        self.status_log = deque(maxlen=HISTORY_CAPACITY)  # Historique des statuts
+        self.prediction_messages = BoundedDict(MESSAGES_CAPACITY)  # Stockage des IDs de messages de prédiction
+        # Tas d'échéances des prédictions ⌛: (échéance, numéro)
+        self._expiry_heap = []   # échéance = numéro + 2 (check_expired_predictions)
+        self._failure_heap = []  # échéance = numéro + 3 (échec dans verify_prediction)
+        # Compteurs maintenus à chaque changement de statut (statistiques en O(1))
+        self._counters = {'total': 0, 'wins': 0, 'losses': 0, 'pending': 0}
+        self._offset_wins = [0, 0, 0, 0]  # Victoires par offset 0-3
+        self._last_hour = RollingCounter(3600)
+        self._last_24h = RollingCounter(86400)
         
     def reset(self):
         """Reset all prediction data"""
@@ -20,8 +132,103 @@ class CardPredictor:
         self.processed_messages.clear()
         self.status_log.clear()
         self.prediction_messages.clear()
+        self._expiry_heap.clear()
+        self._failure_heap.clear()
+        self._counters = {'total': 0, 'wins': 0, 'losses': 0, 'pending': 0}
+        self._offset_wins = [0, 0, 0, 0]
+        self._last_hour.clear()
+        self._last_24h.clear()
+
+        logger.info("Données de prédiction réinitialisées")
+
+    def export_state(self) -> dict:
+        """État en mémoire pour l'instantané de redémarrage"""
+        return {
+            'last_predictions': list(self.last_predictions),
+            'prediction_status': dict(self.prediction_status),
+            'processed_messages': list(self.processed_messages),
+            'status_log': list(self.status_log),
+            'prediction_messages': dict(self.prediction_messages),
+            'counters': dict(self._counters),
+            'offset_wins': list(self._offset_wins),
+            'recent_outcomes': list(self._last_24h._events)
+        }
+
+    def import_state(self, state: dict):
+        """Restaure l'état en mémoire depuis un instantané"""
+        self.reset()
+        self.last_predictions.extend(state.get('last_predictions', []))
+        for num, status in state.get('prediction_status', {}).items():
+            self.prediction_status[num] = status
+        for item in state.get('processed_messages', []):
+            self.processed_messages.add(item)
+        self.status_log.extend(state.get('status_log', []))
+        for num, details in state.get('prediction_messages', {}).items():
+            self.prediction_messages[num] = details
+        self._counters.update(state.get('counters', {}))
+        self._counters['pending'] = sum(1 for status in self.prediction_status.values() if status == '⌛')
+        self._offset_wins = list(state.get('offset_wins', [0, 0, 0, 0]))
+        for timestamp, is_win in state.get('recent_outcomes', []):
+            self._last_hour.add(is_win, timestamp)
+            self._last_24h.add(is_win, timestamp)
+        self._rebuild_deadline_heaps()
+
+    def _on_status_evicted(self, pred_num: int, status: str):
+        """Une prédiction évincée de l'historique ne compte plus parmi les attentes"""
+        if status == '⌛':
+            self._counters['pending'] -= 1
+
+    def _log_status(self, pred_num: int, status: str, offset: Optional[int] = None):
+        """Résout une prédiction ⌛: statut, historique et compteurs"""
+        if self.prediction_status.get(pred_num) == '⌛':
+            self._counters['pending'] -= 1
+        self.prediction_status[pred_num] = status
+        self.status_log.append((pred_num, status))
+
+        self._counters['total'] += 1
+        is_win = '✅' in status
+        if is_win:
+            self._counters['wins'] += 1
+            if offset is not None:
+                self._offset_wins[offset] += 1
+        elif '❌' in status or '⭕' in status:
+            self._counters['losses'] += 1
+        else:
+            return
+        now = time.time()
+        self._last_hour.add(is_win, now)
+        self._last_24h.add(is_win, now)
+
+    def add_prediction(self, game_number: int, suits: str = ''):
+        """Enregistre une prédiction en attente (⌛) et ses échéances"""
+        self.last_predictions.append((game_number, suits))
+        if self.prediction_status.get(game_number) != '⌛':
+            self._counters['pending'] += 1
+        self.prediction_status[game_number] = '⌛'
+        self._track_pending(game_number)
+
+    def _track_pending(self, game_number: int):
+        heapq.heappush(self._expiry_heap, (game_number + 2, game_number))
+        heapq.heappush(self._failure_heap, (game_number + 3, game_number))
+
+    def _rebuild_deadline_heaps(self):
+        """Reconstruit les tas depuis prediction_status (restauration d'état)"""
+        pending = [num for num, status in self.prediction_status.items() if status == '⌛']
+        self._expiry_heap = [(num + 2, num) for num in pending]
+        self._failure_heap = [(num + 3, num) for num in pending]
+        heapq.heapify(self._expiry_heap)
+        heapq.heapify(self._failure_heap)
 
-        print("Données de prédiction réinitialisées")
+    def _pop_expired(self, heap: list, current_game_number: int) -> Optional[int]:
+        """
+        Retire du tas la prochaine prédiction ⌛ dont l'échéance est dépassée.
+        Les entrées déjà résolues (statut différent de ⌛) sont éliminées au passage.
+        """
+        while heap and heap[0][0] < current_game_number:
+            _, pred_num = heapq.heappop(heap)
+            if self.prediction_status.get(pred_num) == '⌛':
+                return pred_num
+        return None
 
     def extract_game_number(self, message: str) -> Optional[int]:
         """Extract game number from message using pattern #N followed by digits"""
@@ -30,20 +237,20 @@ class CardPredictor:
             match = re.search(r"#N\s*(\d+)\.?", message, re.IGNORECASE)
             if match:
                 number = int(match.group(1))
-                print(f"Numéro de jeu extrait: {number}")
+                logger.debug("Numéro de jeu extrait: %s", number)
                 return number
             
             # Alternative pattern matching
             match = re.search(r"jeu\s*#?\s*(\d+)", message, re.IGNORECASE)
             if match:
                 number = int(match.group(1))
-                print(f"Numéro de jeu alternatif extrait: {number}")
+                logger.debug("Numéro de jeu alternatif extrait: %s", number)
                 return number
                 
-            print(f"Aucun numéro de jeu trouvé dans: {message}")
+            logger.debug("Aucun numéro de jeu trouvé dans: %s", message)
             return None
         except (ValueError, AttributeError) as e:
-            print(f"Erreur extraction numéro: {e}")
+            logger.error("Erreur extraction numéro: %s", e)
             return None
 
     def extract_symbols_from_parentheses(self, message: str) -> List[str]:
@@ -76,7 +283,7 @@ class CardPredictor:
             simple_count += temp_str.count(symbol)
             
         total = emoji_count + simple_count
-        print(f"Comptage cartes détaillé: emoji={emoji_count}, simple={simple_count}, total={total} dans '{symbols_str}'")
+        logger.debug("Comptage cartes détaillé: emoji=%s, simple=%s, total=%s dans '%s'", emoji_count, simple_count, total, symbols_str)
         return total
 
     def normalize_suits(self, suits_str: str) -> str:
@@ -106,13 +313,15 @@ class CardPredictor:
         """Check for expired predictions (offset > 2) and mark them as failed"""
         expired_predictions = []
         
-        for pred_num, status in list(self.prediction_status.items()):
-            if status == '⌛' and current_game_number > pred_num + 2:
-                # Marquer comme échouée
-                self.prediction_status[pred_num] = '❌❌'
-                self.status_log.append((pred_num, '❌❌'))
-                expired_predictions.append(pred_num)
-                print(f"❌ Prédiction expirée: #{pred_num} marquée comme échouée (jeu actuel: #{current_game_number})")
+        # Seules les prédictions dont l'échéance (numéro + 2) est dépassée sont retirées du tas
+        while True:
+            pred_num = self._pop_expired(self._expiry_heap, current_game_number)
+            if pred_num is None:
+                break
+            # Marquer comme échouée
+            self._log_status(pred_num, '❌❌')
+            expired_predictions.append(pred_num)
+            logger.info("❌ Prédiction expirée: #%s marquée comme échouée (jeu actuel: #%s)", pred_num, current_game_number)
         
         return expired_predictions
 
@@ -121,7 +330,7 @@ class CardPredictor:
         try:
             # NOUVELLE LOGIQUE: Ignorer complètement les messages ⏰ et 🕐 pour la vérification
             if "⏰" in message or "🕐" in message:
-                print(f"⏰/🕐 détecté dans le message - ignoré pour la vérification")
+                logger.debug("⏰/🕐 détecté dans le message - ignoré pour la vérification")
                 return None, None
 
             # Check for verification tags (uniquement messages normaux)
@@ -131,28 +340,28 @@ class CardPredictor:
             # Extract game number
             game_number = self.extract_game_number(message)
             if game_number is None:
-                print(f"Aucun numéro de jeu trouvé dans: {message}")
+                logger.debug("Aucun numéro de jeu trouvé dans: %s", message)
                 return None, None
 
-            print(f"Numéro de jeu du résultat: {game_number}")
+            logger.debug("Numéro de jeu du résultat: %s", game_number)
 
             # Extract symbol groups
             groups = self.extract_symbols_from_parentheses(message)
             if len(groups) < 2:
-                print(f"Groupes de symboles insuffisants: {groups}")
+                logger.debug("Groupes de symboles insuffisants: %s", groups)
                 return None, None
 
             first_group = groups[0]
             second_group = groups[1]
-            print(f"Groupes extraits: '{first_group}' et '{second_group}'")
+            logger.debug("Groupes extraits: '%s' et '%s'", first_group, second_group)
 
             def is_valid_result():
                 """Check if the result has valid card distribution (2+2)"""
                 count1 = self.count_total_cards(first_group)
                 count2 = self.count_total_cards(second_group)
-                print(f"Comptage cartes: groupe1={count1}, groupe2={count2}")
+                logger.debug("Comptage cartes: groupe1=%s, groupe2=%s", count1, count2)
                 is_valid = count1 == 2 and count2 == 2
-                print(f"Résultat valide (2+2): {is_valid}")
+                logger.debug("Résultat valide (2+2): %s", is_valid)
                 return is_valid
 
             # Vérifier les prédictions en attente dans le bon ordre
@@ -162,18 +371,18 @@ class CardPredictor:
             
             # Vérifier d'abord si c'est un résultat valide (2+2 cartes)
             if not is_valid_result():
-                print(f"❌ Résultat invalide: pas exactement 2+2 cartes, ignoré pour vérification")
+                logger.debug("❌ Résultat invalide: pas exactement 2+2 cartes, ignoré pour vérification")
                 return None, None
             
             # Nouvelle logique: Vérifier d'abord le numéro exact, puis jusqu'à +3
             # Vérifier les offsets de 0 à 3
             for offset in range(4):  # offsets 0, 1, 2, 3
                 predicted_number = game_number - offset
-                print(f"Vérification si le jeu #{game_number} correspond à la prédiction #{predicted_number} (offset {offset})")
+                logger.debug("Vérification si le jeu #%s correspond à la prédiction #%s (offset %s)", game_number, predicted_number, offset)
                 
                 if (predicted_number in self.prediction_status and 
                     self.prediction_status[predicted_number] == '⌛'):
-                    print(f"Prédiction en attente trouvée: #{predicted_number}")
+                    logger.debug("Prédiction en attente trouvée: #%s", predicted_number)
                     
                     # Détermine le statut selon l'offset
                     if offset == 0:
@@ -185,66 +394,58 @@ class CardPredictor:
                     else:  # offset == 3
                         statut = '✅3️⃣'  # 3 jeux après
                         
-                    self.prediction_status[predicted_number] = statut
-                    self.status_log.append((predicted_number, statut))
-                    print(f"✅ Prédiction réussie: #{predicted_number} validée par le jeu #{game_number} (offset {offset})")
+                    self._log_status(predicted_number, statut, offset)
+                    logger.info("✅ Prédiction réussie: #%s validée par le jeu #%s (offset %s)", predicted_number, game_number, offset)
                     return True, predicted_number
             
-            # Si aucune prédiction trouvée dans les offsets 0-3, marquer les anciennes comme échec
-            for pred_num in list(self.prediction_status.keys()):
-                if (self.prediction_status[pred_num] == '⌛' and 
-                    game_number > pred_num + 3):
-                    self.prediction_status[pred_num] = '❌'
-                    self.status_log.append((pred_num, '❌'))
-                    print(f"❌ Prédiction #{pred_num} marquée échec - jeu #{game_number} dépasse prédit+3")
-                    return False, pred_num
+            # Si aucune prédiction trouvée dans les offsets 0-3, marquer la plus ancienne
+            # prédiction dont l'échéance (numéro + 3) est dépassée comme échec
+            pred_num = self._pop_expired(self._failure_heap, game_number)
+            if pred_num is not None:
+                self._log_status(pred_num, '❌')
+                logger.info("❌ Prédiction #%s marquée échec - jeu #%s dépasse prédit+3", pred_num, game_number)
+                return False, pred_num
 
             # Si aucune prédiction trouvée
-            print(f"Aucune prédiction correspondante trouvée pour le jeu #{game_number} dans les offsets 0-3")
-            print(f"Prédictions actuelles en attente: {[k for k, v in self.prediction_status.items() if v == '⌛']}")
+            logger.debug("Aucune prédiction correspondante trouvée pour le jeu #%s dans les offsets 0-3", game_number)
+            if logger.isEnabledFor(logging.DEBUG):  # Tri évité quand le niveau DEBUG est désactivé
+                pending = sorted(n for _, n in self._failure_heap if self.prediction_status.get(n) == '⌛')
+                logger.debug("Prédictions actuelles en attente: %s", pending)
             return None, None
 
         except Exception as e:
-            print(f"Erreur dans verify_prediction: {e}")
+            logger.error("Erreur dans verify_prediction: %s", e)
             return None, None
 
     def get_statistics(self) -> dict:
-        """Get prediction statistics"""
+        """Get prediction statistics (compteurs maintenus, O(1))"""
         try:
-            total_predictions = len(self.status_log)
-            if total_predictions == 0:
-                return {
-                    'total': 0,
-                    'wins': 0,
-                    'losses': 0,
-                    'pending': len([s for s in self.prediction_status.values() if s == '⌛']),
-                    'win_rate': 0.0
-                }
-
-            wins = sum(1 for _, status in self.status_log if '✅' in status)
-            losses = sum(1 for _, status in self.status_log if '❌' in status or '⭕' in status)
-            pending = len([s for s in self.prediction_status.values() if s == '⌛'])
+            total_predictions = self._counters['total']
+            wins = self._counters['wins']
             win_rate = (wins / total_predictions * 100) if total_predictions > 0 else 0.0
 
             return {
                 'total': total_predictions,
                 'wins': wins,
-                'losses': losses,
-                'pending': pending,
-                'win_rate': win_rate
+                'losses': self._counters['losses'],
+                'pending': self._counters['pending'],
+                'win_rate': win_rate,
+                'wins_by_offset': {offset: count for offset, count in enumerate(self._offset_wins)},
+                'last_hour': self._last_hour.snapshot(),
+                'last_24h': self._last_24h.snapshot()
             }
         except Exception as e:
-            print(f"Erreur dans get_statistics: {e}")
+            logger.error("Erreur dans get_statistics: %s", e)
             return {'total': 0, 'wins': 0, 'losses': 0, 'pending': 0, 'win_rate': 0.0}
 
     def get_recent_predictions(self, count: int = 10) -> List[Tuple[int, str]]:
         """Get recent predictions with their status"""
         try:
             recent = []
-            for game_num, suits in self.last_predictions[-count:]:
+            for game_num, suits in list(self.last_predictions)[-count:]:
                 status = self.prediction_status.get(game_num, '⌛')
                 recent.append((game_num, suits, status))
             return recent
         except Exception as e:
-            print(f"Erreur dans get_recent_predictions: {e}")
+            logger.error("Erreur dans get_recent_predictions: %s", e)
             return []
@@ -0,0 +1,207 @@
+"""
+Moteur de requêtes sur les résultats enregistrés (Projet 1)
+Index triés en mémoire (numéro, date & heure, gagnant) tenus à jour avec les
+compteurs de version du stockage: un ajout étend les index, une remise à zéro
+ou une restauration les reconstruit. Les filtres de plage sont résolus par
+recherche dichotomique (bisect) au lieu d'un parcours de tous les résultats.
+"""
+import hashlib
+import time
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+WINNERS = {"joueur": "Joueur", "banquier": "Banquier"}
+
+# Champs renvoyés pour chaque résultat (le message complet reste interne)
+RESULT_FIELDS = ("numero", "date", "heure", "gagnant", "cartes_groupe1")
+
+
+def _time_key(result: Dict[str, Any]) -> str:
+    return f"{result.get('date', '')} {result.get('heure', '')}"
+
+
+def parse_filters(params: Mapping[str, str]) -> Dict[str, Any]:
+    """
+    Valide les paramètres de requête.
+    from / to: YYYY-MM-DD ou 'YYYY-MM-DD HH:MM[:SS]' (bornes incluses)
+    min / max: plage de numéros, gagnant: joueur | banquier
+    offset / limit: pagination, order: asc | desc (par numéro)
+    Lève ValueError si un paramètre est invalide.
+    """
+    filters: Dict[str, Any] = {}
+
+    for name in ("from", "to"):
+        value = (params.get(name) or "").strip().replace("T", " ")
+        if value:
+            if len(value) < 10 or value[4] != "-" or value[7] != "-":
+                raise ValueError(f"Date invalide pour '{name}': {value} (format YYYY-MM-DD)")
+            filters[name] = value
+
+    for name in ("min", "max", "offset", "limit"):
+        value = params.get(name)
+        if value not in (None, ""):
+            try:
+                filters[name] = int(value)
+            except ValueError:
+                raise ValueError(f"Entier attendu pour '{name}': {value}")
+            if filters[name] < 0:
+                raise ValueError(f"Valeur négative pour '{name}': {value}")
+
+    gagnant = (params.get("gagnant") or "").strip().lower()
+    if gagnant:
+        if gagnant not in WINNERS:
+            raise ValueError(f"Gagnant invalide: {gagnant} (joueur ou banquier)")
+        filters["gagnant"] = WINNERS[gagnant]
+
+    order = (params.get("order") or "asc").strip().lower()
+    if order not in ("asc", "desc"):
+        raise ValueError(f"Ordre invalide: {order} (asc ou desc)")
+    filters["order"] = order
+
+    filters["offset"] = filters.get("offset", 0)
+    filters["limit"] = min(filters.get("limit", DEFAULT_LIMIT), MAX_LIMIT)
+    return filters
+
+
+class ResultsQueryEngine:
+    """Index triés sur les résultats du GameResultsManager"""
+
+    def __init__(self, results_manager):
+        self.results_manager = results_manager
+        # Jeton de démarrage: les ETag d'une exécution précédente ne sont jamais réutilisés
+        self._boot = format(int(time.time()), "x")
+        self._version = None
+        self._generation = None
+        self._count = 0
+
+        # Index triés: clés et positions (dans la liste des résultats) en parallèle
+        self._numero_keys: List[int] = []
+        self._numero_pos: List[int] = []
+        self._time_keys: List[str] = []
+        self._time_pos: List[int] = []
+        # Positions par gagnant (croissantes: les résultats sont ajoutés en fin de liste)
+        self._winner_pos: Dict[str, List[int]] = {}
+
+    # ---------- maintenance des index ----------
+
+    def _reset(self):
+        self._count = 0
+        self._numero_keys, self._numero_pos = [], []
+        self._time_keys, self._time_pos = [], []
+        self._winner_pos = {}
+
+    @staticmethod
+    def _insert(keys: List[Any], positions: List[int], key: Any, position: int):
+        if not keys or keys[-1] <= key:
+            # Cas courant: résultats ajoutés dans l'ordre
+            keys.append(key)
+            positions.append(position)
+        else:
+            index = bisect_right(keys, key)
+            keys.insert(index, key)
+            positions.insert(index, position)
+
+    def _index(self, results: List[Dict[str, Any]], start: int):
+        for position in range(start, len(results)):
+            result = results[position]
+            self._insert(self._numero_keys, self._numero_pos, result.get("numero", 0), position)
+            self._insert(self._time_keys, self._time_pos, _time_key(result), position)
+            self._winner_pos.setdefault(result.get("gagnant"), []).append(position)
+        self._count = len(results)
+
+    def _sync(self) -> List[Dict[str, Any]]:
+        """Met les index à jour selon la version du stockage, retourne les résultats"""
+        version, generation, results = self.results_manager.storage_view()
+        if version == self._version and generation == self._generation:
+            return results
+
+        if generation != self._generation or len(results) < self._count:
+            self._reset()
+        self._index(results, self._count)
+        self._version = version
+        self._generation = generation
+        return results
+
+    # ---------- requêtes ----------
+
+    def etag(self, filters: Optional[Dict[str, Any]] = None, resource: str = "") -> str:
+        """ETag faible: change dès que le stockage change (ou que la requête diffère)"""
+        self._sync()
+        query = repr(sorted((filters or {}).items())) + resource
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:8]
+        return f'W/"{self._boot}-{self._generation}-{self._version}-{digest}"'
+
+    @staticmethod
+    def _range(keys: List[Any], positions: List[int], low: Any, high: Any) -> List[int]:
+        start = bisect_left(keys, low) if low is not None else 0
+        end = bisect_right(keys, high) if high is not None else len(keys)
+        return positions[start:end]
+
+    def _candidates(self, filters: Dict[str, Any]) -> List[int]:
+        """Positions satisfaisant tous les filtres (intersection en partant de la plage la plus petite)"""
+        ranges = []
+        if "min" in filters or "max" in filters:
+            ranges.append(self._range(self._numero_keys, self._numero_pos, filters.get("min"), filters.get("max")))
+        if "from" in filters or "to" in filters:
+            # Une borne haute sans heure inclut toute la journée
+            to = filters.get("to")
+            if to is not None and len(to) == 10:
+                to += " \uffff"
+            ranges.append(self._range(self._time_keys, self._time_pos, filters.get("from"), to))
+        if "gagnant" in filters:
+            ranges.append(self._winner_pos.get(filters["gagnant"], []))
+
+        if not ranges:
+            return list(self._numero_pos)
+        if len(ranges) == 1:
+            return list(ranges[0])
+
+        ranges.sort(key=len)
+        selected = set(ranges[0])
+        for other in ranges[1:]:
+            selected.intersection_update(other)
+            if not selected:
+                break
+        return list(selected)
+
+    def _matching(self, filters: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], List[int]]:
+        results = self._sync()
+        positions = self._candidates(filters)
+        positions.sort(key=lambda position: results[position].get("numero", 0),
+                       reverse=filters.get("order") == "desc")
+        return results, positions
+
+    def query(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Résultats filtrés et paginés"""
+        results, positions = self._matching(filters)
+        offset, limit = filters.get("offset", 0), filters.get("limit", DEFAULT_LIMIT)
+        page = positions[offset:offset + limit]
+        return {
+            "total": len(positions),
+            "offset": offset,
+            "limit": limit,
+            "items": [{field: results[position].get(field) for field in RESULT_FIELDS} for position in page]
+        }
+
+    def stats(self, filters: Dict[str, Any]) -> Dict[str, Any]:
+        """Statistiques sur les résultats filtrés (pagination ignorée)"""
+        results, positions = self._matching({**filters, "order": "asc"})
+        total = len(positions)
+        if total == self._count:
+            # Aucun résultat exclu: comptes lus directement dans l'index par gagnant
+            joueur = len(self._winner_pos.get("Joueur", ()))
+            banquier = len(self._winner_pos.get("Banquier", ()))
+        else:
+            joueur = sum(1 for position in positions if results[position].get("gagnant") == "Joueur")
+            banquier = sum(1 for position in positions if results[position].get("gagnant") == "Banquier")
+        return {
+            "total": total,
+            "joueur_victoires": joueur,
+            "banquier_victoires": banquier,
+            "taux_joueur": (joueur / total * 100) if total else 0.0,
+            "taux_banquier": (banquier / total * 100) if total else 0.0,
+            "premier_numero": results[positions[0]].get("numero") if positions else None,
+            "dernier_numero": results[positions[-1]].get("numero") if positions else None
+        }
@@ -0,0 +1,162 @@
+"""
+Compaction et rétention des fichiers de données
+Chaque étape réécrit un état persisté sous sa forme minimale ou supprime les
+artefacts anciens selon une politique (âge maximum + nombre maximum), et retourne
+le nombre d'octets récupérés. Les étapes sont exécutées par petits lots avec un
+budget de temps: un passage reprend là où le précédent s'est arrêté.
+"""
+import asyncio
+import glob
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def file_size(path) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def prune_files(patterns: Sequence[str], max_age_days: Optional[float] = None,
+                max_count: Optional[int] = None) -> int:
+    """
+    Supprime les fichiers correspondant aux motifs au-delà du nombre maximum
+    (les plus récents sont gardés) ou plus anciens que l'âge maximum.
+    Retourne le nombre d'octets libérés.
+    """
+    files = []
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+    files.sort(reverse=True)
+
+    cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+    reclaimed = 0
+    for index, (mtime, size, path) in enumerate(files):
+        if (max_count is not None and index >= max_count) or (cutoff is not None and mtime < cutoff):
+            try:
+                os.remove(path)
+                reclaimed += size
+            except OSError as e:
+                logger.warning("⚠️ Suppression de %s impossible: %s", path, e)
+    return reclaimed
+
+
+def reclaimed_by(func: Callable[[], Any], patterns: Sequence[str]) -> int:
+    """Exécute func et retourne la diminution de taille des fichiers correspondant aux motifs"""
+    def total() -> int:
+        return sum(file_size(path) for pattern in patterns for path in glob.glob(pattern))
+    before = total()
+    func()
+    return before - total()
+
+
+class CompactionStep:
+    """Étape de compaction: fonction sans argument retournant les octets récupérés"""
+
+    def __init__(self, name: str, func: Callable[[], int], in_thread: bool = False):
+        self.name = name
+        self.func = func
+        self.in_thread = in_thread
+        self.last_run: Optional[float] = None
+        self.last_reclaimed = 0
+        self.total_reclaimed = 0
+        self.last_error: Optional[str] = None
+
+
+class DataCompactor:
+    """Exécute les étapes de compaction à tour de rôle sous un budget de temps"""
+
+    def __init__(self):
+        self.steps: List[CompactionStep] = []
+        self._cursor = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self.total_reclaimed = 0
+        self.last_report: Dict[str, Any] = {}
+
+    def add_step(self, name: str, func: Callable[[], int], in_thread: bool = False) -> CompactionStep:
+        """
+        Enregistre une étape.
+        in_thread: uniquement pour les étapes qui ne touchent que des fichiers
+        (les étapes qui modifient un état en mémoire restent dans la boucle d'événements)
+        """
+        step = CompactionStep(name, func, in_thread=in_thread)
+        self.steps.append(step)
+        return step
+
+    async def _run_step(self, step: CompactionStep) -> int:
+        try:
+            if step.in_thread:
+                reclaimed = await asyncio.to_thread(step.func)
+            else:
+                reclaimed = step.func()
+            reclaimed = max(int(reclaimed or 0), 0)
+            step.last_error = None
+        except Exception as e:
+            reclaimed = 0
+            step.last_error = str(e)
+            logger.error("❌ Erreur compaction '%s': %s", step.name, e)
+        step.last_run = time.time()
+        step.last_reclaimed = reclaimed
+        step.total_reclaimed += reclaimed
+        self.total_reclaimed += reclaimed
+        return reclaimed
+
+    async def run(self, budget_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Exécute les étapes à partir de la dernière position, au plus une fois chacune.
+        budget_seconds: arrêt dès que le budget est dépassé (None = passage complet).
+        Retourne {"reclaimed", "steps": {nom: octets}, "remaining", "duration"}.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            started = time.perf_counter()
+            report: Dict[str, int] = {}
+            for _ in range(len(self.steps)):
+                if budget_seconds is not None and report and time.perf_counter() - started >= budget_seconds:
+                    break
+                step = self.steps[self._cursor]
+                self._cursor = (self._cursor + 1) % len(self.steps)
+                report[step.name] = await self._run_step(step)
+
+            reclaimed = sum(report.values())
+            self.last_report = {
+                "reclaimed": reclaimed,
+                "steps": report,
+                "remaining": len(self.steps) - len(report),
+                "duration": round(time.perf_counter() - started, 3)
+            }
+            if reclaimed:
+                logger.info("🗜️ Compaction: %s octets récupérés (%s)", reclaimed, ', '.join(report))
+            return self.last_report
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total_reclaimed": self.total_reclaimed,
+            "last_report": self.last_report,
+            "steps": [{
+                "name": step.name,
+                "last_run": step.last_run,
+                "last_reclaimed": step.last_reclaimed,
+                "total_reclaimed": step.total_reclaimed,
+                "last_error": step.last_error
+            } for step in self.steps]
+        }
+
+
+def format_bytes(size: int) -> str:
+    for unit in ("o", "Ko", "Mo"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}" if unit == "o" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} Go"
@@ -0,0 +1,304 @@
+"""
+Planificateur de tâches périodiques dans la boucle asyncio
+- Horaires de type cron (minute heure jour mois jour_semaine) dans le fuseau du Bénin (UTC+1)
+- Rattrapage des exécutions manquées pendant un arrêt (état persisté dans un fichier JSON)
+- Décalage aléatoire (jitter) pour étaler les tâches programmées à la même minute
+- Pas d'exécutions concurrentes d'une même tâche
+- Durée, date et erreur de la dernière exécution enregistrées pour chaque tâche
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+BENIN_TZ = timezone(timedelta(hours=1))
+
+
+class CronSchedule:
+    """Expression cron à 5 champs: minute heure jour mois jour_semaine (0 = dimanche)"""
+
+    FIELDS = (("minute", 0, 59), ("heure", 0, 23), ("jour", 1, 31), ("mois", 1, 12), ("jour_semaine", 0, 6))
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parts = expression.split()
+        if len(parts) != 5:
+            raise ValueError(f"Expression cron invalide (5 champs attendus): {expression}")
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            self._parse_field(part, name, low, high) for part, (name, low, high) in zip(parts, self.FIELDS)
+        )
+        # Règle cron: si jour et jour_semaine sont restreints, l'un ou l'autre suffit
+        self._any_day = parts[2] == "*"
+        self._any_weekday = parts[4] == "*"
+
+    @staticmethod
+    def _parse_field(field: str, name: str, low: int, high: int) -> Set[int]:
+        values = set()
+        for item in field.split(","):
+            step = 1
+            if "/" in item:
+                item, step_text = item.split("/", 1)
+                step = int(step_text)
+                if step <= 0:
+                    raise ValueError(f"Pas invalide pour le champ {name}: {field}")
+            if item == "*":
+                start, end = low, high
+            elif "-" in item:
+                start, end = (int(value) for value in item.split("-", 1))
+            else:
+                start = int(item)
+                end = high if step > 1 else start
+            if start < low or end > high or start > end:
+                raise ValueError(f"Valeur hors limites pour le champ {name}: {field}")
+            values.update(range(start, end + 1, step))
+        return values
+
+    def _day_matches(self, dt: datetime) -> bool:
+        in_days = dt.day in self.days
+        in_weekdays = (dt.isoweekday() % 7) in self.weekdays
+        if self._any_day:
+            return in_weekdays
+        if self._any_weekday:
+            return in_days
+        return in_days or in_weekdays
+
+    def next_after(self, dt: datetime) -> datetime:
+        """Première occurrence strictement postérieure à dt (même fuseau que dt)"""
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year = candidate.year + (candidate.month == 12)
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"Aucune occurrence pour l'expression cron: {self.expression}")
+
+
+class Job:
+    """Tâche planifiée et historique de sa dernière exécution"""
+
+    def __init__(self, name: str, func: Callable[[], Any], schedule: CronSchedule,
+                 jitter: float = 0, catch_up: bool = True, in_thread: bool = False):
+        self.name = name
+        self.func = func
+        self.schedule = schedule
+        self.jitter = jitter
+        self.catch_up = catch_up
+        self.in_thread = in_thread
+
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+        self.last_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def plan_next(self, after: datetime):
+        self.next_run = self.schedule.next_after(after)
+        if self.jitter:
+            self.next_run += timedelta(seconds=random.uniform(0, self.jitter))
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "schedule": self.schedule.expression,
+            "running": self.running,
+            "next_run": self.next_run.isoformat() if self.next_run else None,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_duration": self.last_duration,
+            "last_error": self.last_error,
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped
+        }
+
+
+class Scheduler:
+    """Exécute les tâches enregistrées selon leur horaire, hors du traitement des messages"""
+
+    def __init__(self, state_file: str = "data/scheduler_state.json", tz: timezone = BENIN_TZ):
+        self.state_file = Path(state_file)
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        self.tz = tz
+        self.jobs: Dict[str, Job] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def add_job(self, name: str, func: Callable[[], Any], cron: str, jitter: float = 0,
+                catch_up: bool = True, in_thread: bool = False) -> Job:
+        """
+        Enregistre une tâche.
+        func: fonction ou coroutine sans argument
+        catch_up: exécuter une fois au démarrage si une occurrence a été manquée pendant l'arrêt
+        in_thread: exécuter une fonction synchrone dans un thread (E/S de fichiers uniquement)
+        """
+        if name in self.jobs:
+            raise ValueError(f"Tâche déjà enregistrée: {name}")
+        job = Job(name, func, CronSchedule(cron), jitter=jitter, catch_up=catch_up, in_thread=in_thread)
+        self.jobs[name] = job
+        if self._loop_task is not None:
+            job.plan_next(self.now())
+            self._wakeup.set()
+        return job
+
+    # ---------- état persisté ----------
+
+    def _load_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning("⚠️ État du planificateur illisible, ignoré: %s", e)
+            return {}
+
+    def _write_state(self, state: Dict[str, Any]):
+        tmp_path = self.state_file.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    async def _save_state(self):
+        state = {name: {"last_run": job.last_run.isoformat() if job.last_run else None,
+                        "last_duration": job.last_duration,
+                        "last_error": job.last_error,
+                        "runs": job.runs,
+                        "failures": job.failures}
+                 for name, job in self.jobs.items()}
+        try:
+            await asyncio.to_thread(self._write_state, state)
+        except Exception as e:
+            logger.error("❌ Erreur sauvegarde état du planificateur: %s", e)
+
+    # ---------- exécution ----------
+
+    def start(self):
+        """Démarre le planificateur (à appeler depuis la boucle d'événements)"""
+        if self._loop_task is not None:
+            return
+        now = self.now()
+        saved = self._load_state()
+        self._wakeup = asyncio.Event()
+
+        for name, job in self.jobs.items():
+            entry = saved.get(name) or {}
+            if entry.get("last_run"):
+                job.last_run = datetime.fromisoformat(entry["last_run"]).astimezone(self.tz)
+                job.last_duration = entry.get("last_duration")
+                job.last_error = entry.get("last_error")
+                job.runs = entry.get("runs", 0)
+                job.failures = entry.get("failures", 0)
+
+            # Rattrapage: une occurrence prévue depuis la dernière exécution est passée
+            if job.catch_up and job.last_run and job.schedule.next_after(job.last_run) <= now:
+                logger.info("⏪ Rattrapage de la tâche '%s' (dernière exécution: %s)", name, job.last_run.strftime('%Y-%m-%d %H:%M'))
+                job.next_run = now
+            else:
+                job.plan_next(now)
+
+        self._loop_task = asyncio.create_task(self._run_loop())
+        logger.info("🗓️ Planificateur démarré: %s tâche(s)", len(self.jobs))
+
+    async def stop(self):
+        """Arrête le planificateur et les exécutions en cours"""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            self._loop_task = None
+        running = [job.task for job in self.jobs.values() if job.running]
+        for task in running:
+            task.cancel()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+    async def _run_loop(self):
+        while True:
+            try:
+                now = self.now()
+                for job in self.jobs.values():
+                    if job.next_run is not None and job.next_run <= now:
+                        job.plan_next(now)
+                        self._launch(job)
+
+                upcoming = [job.next_run for job in self.jobs.values() if job.next_run is not None]
+                delay = (min(upcoming) - self.now()).total_seconds() if upcoming else 3600
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(delay, 0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error("❌ Erreur boucle du planificateur: %s", e)
+                await asyncio.sleep(60)
+
+    def _launch(self, job: Job) -> bool:
+        if job.running:
+            # Exécution précédente non terminée: pas de chevauchement
+            job.skipped += 1
+            logger.info("⏭️ Tâche '%s' toujours en cours, occurrence ignorée", job.name)
+            return False
+        job.task = asyncio.create_task(self._execute(job))
+        return True
+
+    async def _execute(self, job: Job):
+        started = time.perf_counter()
+        job.last_run = self.now()
+        try:
+            if job.in_thread:
+                result = await asyncio.to_thread(job.func)
+            else:
+                result = job.func()
+            if inspect.isawaitable(result):
+                await result
+            job.last_error = None
+        except asyncio.CancelledError:
+            job.last_error = "annulée"
+            raise
+        except Exception as e:
+            job.failures += 1
+            job.last_error = str(e)
+            logger.error("❌ Erreur tâche '%s': %s", job.name, e)
+        finally:
+            job.runs += 1
+            job.last_duration = round(time.perf_counter() - started, 3)
+            await self._save_state()
+
+    def run_now(self, name: str) -> bool:
+        """Déclenche immédiatement une tâche (sauf si elle est déjà en cours)"""
+        job = self.jobs.get(name)
+        if job is None:
+            raise KeyError(f"Tâche inconnue: {name}")
+        return self._launch(job)
+
+    def jobs_info(self) -> List[Dict[str, Any]]:
+        return [job.info() for job in self.jobs.values()]
@@ -0,0 +1,132 @@
+"""
+Sauvegardes compressées et adressées par contenu
+Chaque instantané est un fichier YAML compressé (gzip) nommé par son empreinte SHA-256:
+les instantanés identiques ne sont écrits qu'une fois et une politique de rétention
+(nombre maximum + âge maximum) est appliquée après chaque écriture.
+"""
+import gzip
+import hashlib
+import logging
+import threading
+import time
+import yaml
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:  # libyaml absente: implémentation Python pure
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+
+class SnapshotManager:
+    """Gestionnaire d'instantanés compressés avec déduplication et rétention"""
+
+    def __init__(self, directory: str, max_count: int = 20, max_age_days: int = 14):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_count = max_count
+        self.max_age_days = max_age_days
+
+        # Un seul thread: les écritures sont sérialisées dans l'ordre de soumission
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+        self._lock = threading.Lock()
+
+    def submit(self, data_factory: Callable[[], Any]) -> Future:
+        """
+        Programme un instantané en arrière-plan.
+        data_factory est appelée dans le thread d'écriture: elle ne doit lire que des
+        données qui ne sont plus modifiées par l'appelant.
+        """
+        return self._executor.submit(lambda: self.write(data_factory()))
+
+    def write(self, data: Any) -> Optional[str]:
+        """Écrit un instantané (synchrone) et retourne son empreinte"""
+        try:
+            payload = yaml.dump(data, Dumper=_SafeDumper, allow_unicode=True,
+                                default_flow_style=False).encode("utf-8")
+            digest = hashlib.sha256(payload).hexdigest()[:16]
+
+            with self._lock:
+                existing = self._find(digest)
+                if existing:
+                    # Contenu identique déjà sauvegardé: rafraîchir la date uniquement
+                    existing.touch()
+                    logger.debug("ℹ️ Instantané %s déjà présent (dédupliqué)", digest)
+                else:
+                    path = self.directory / f"{digest}.yaml.gz"
+                    tmp_path = path.with_suffix(".tmp")
+                    with open(tmp_path, "wb") as f:
+                        f.write(gzip.compress(payload, compresslevel=6))
+                    tmp_path.replace(path)
+                    logger.info("✅ Instantané créé: %s (%s → %s octets)", path.name, len(payload), path.stat().st_size)
+                self._prune_locked()
+            return digest
+        except Exception as e:
+            logger.error("❌ Erreur création instantané: %s", e)
+            return None
+
+    def _find(self, ref: str) -> Optional[Path]:
+        """Retrouve un instantané par empreinte (ou préfixe d'empreinte)"""
+        matches = sorted(self.directory.glob(f"{ref}*.yaml.gz"))
+        return matches[0] if len(matches) == 1 else None
+
+    def list_snapshots(self) -> List[Dict[str, Any]]:
+        """Liste les instantanés, du plus récent au plus ancien"""
+        snapshots = []
+        for path in self.directory.glob("*.yaml.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue  # Supprimé entre-temps (rétention)
+            snapshots.append({
+                "id": path.name.split(".")[0],
+                "path": str(path),
+                "size": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).strftime("%Y-%m-%d %H:%M:%S"),
+                "mtime": stat.st_mtime
+            })
+        return sorted(snapshots, key=lambda s: s["mtime"], reverse=True)
+
+    def prune(self) -> int:
+        """Applique la politique de rétention, retourne le nombre de fichiers supprimés"""
+        with self._lock:
+            return self._prune_locked()
+
+    def _prune_locked(self) -> int:
+        """prune() avec le verrou déjà pris (thread d'écriture)"""
+        removed = 0
+        cutoff = time.time() - self.max_age_days * 86400
+        for index, snapshot in enumerate(self.list_snapshots()):
+            if index >= self.max_count or snapshot["mtime"] < cutoff:
+                try:
+                    Path(snapshot["path"]).unlink()
+                    removed += 1
+                except OSError as e:
+                    logger.warning("⚠️ Suppression instantané %s impossible: %s", snapshot['id'], e)
+        if removed:
+            logger.info("🧹 Rétention: %s ancien(s) instantané(s) supprimé(s)", removed)
+        return removed
+
+    def load(self, ref: str = "latest") -> Any:
+        """Charge un instantané ('latest' ou empreinte / préfixe d'empreinte)"""
+        if ref == "latest":
+            snapshots = self.list_snapshots()
+            if not snapshots:
+                raise FileNotFoundError("Aucun instantané disponible")
+            path = Path(snapshots[0]["path"])
+        else:
+            path = self._find(ref)
+            if path is None:
+                raise FileNotFoundError(f"Instantané introuvable ou ambigu: {ref}")
+
+        with open(path, "rb") as f:
+            return yaml.load(gzip.decompress(f.read()), Loader=_SafeLoader)
+
+    def flush(self):
+        """Attend la fin des écritures en cours"""
+        self._executor.submit(lambda: None).result()
@@ -0,0 +1,147 @@
+"""
+Instantané unifié de l'état en mémoire du bot pour un redémarrage à chaud
+Un seul fichier binaire compressé regroupe les résultats, les prédictions Excel,
+le journal de déduplication, la table des messages transférés et l'état du prédicteur.
+Au démarrage, chaque composant est restauré depuis l'instantané sauf si ses fichiers
+sources ont été modifiés depuis (instantané périmé): il est alors rechargé depuis ses fichiers.
+"""
+import asyncio
+import logging
+import os
+import pickle
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+class StateSnapshot:
+    """Sauvegarde / restauration de l'état de plusieurs composants dans un fichier binaire"""
+
+    MAGIC = b"DUOSTATE"
+    VERSION = 1
+
+    def __init__(self, path: str = "data/state.snapshot"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._components: Dict[str, Dict[str, Any]] = {}
+        self.last_saved_at: Optional[float] = None
+
+    def register(self, name: str, export_state: Callable[[], Any], import_state: Callable[[Any], None],
+                 sources: Sequence[str] = (), fallback: Optional[Callable[[], None]] = None):
+        """
+        Enregistre un composant.
+        sources: fichiers faisant autorité pour ce composant (contrôle de péremption)
+        fallback: rechargement depuis les fichiers sources si l'instantané n'est pas utilisable
+        """
+        self._components[name] = {
+            "export": export_state,
+            "import": import_state,
+            "sources": [str(source) for source in sources],
+            "fallback": fallback
+        }
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[float]:
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+
+    def capture(self) -> bytes:
+        """Sérialise l'état courant (à appeler depuis la boucle d'événements)"""
+        components = {}
+        for name, component in self._components.items():
+            components[name] = {
+                "state": component["export"](),
+                "sources": {source: self._mtime(source) for source in component["sources"]}
+            }
+        return pickle.dumps({"created_at": time.time(), "components": components},
+                            protocol=pickle.HIGHEST_PROTOCOL)
+
+    def write(self, payload: bytes):
+        """Compresse et écrit l'instantané de façon atomique (appelable depuis un thread)"""
+        header = self.MAGIC + bytes([self.VERSION])
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header + zlib.compress(payload, 1))
+        os.replace(tmp_path, self.path)
+        self.last_saved_at = time.time()
+
+    def save(self) -> bool:
+        """Capture et écrit l'instantané (synchrone, utilisé à l'arrêt)"""
+        try:
+            payload = self.capture()
+            self.write(payload)
+            logger.info("💾 Instantané d'état sauvegardé (%s octets)", len(payload))
+            return True
+        except Exception as e:
+            logger.error("❌ Erreur sauvegarde instantané d'état: %s", e)
+            return False
+
+    async def save_async(self) -> bool:
+        """Capture dans la boucle, compression et écriture dans un thread"""
+        try:
+            payload = self.capture()
+            await asyncio.to_thread(self.write, payload)
+            return True
+        except Exception as e:
+            logger.error("❌ Erreur sauvegarde instantané d'état: %s", e)
+            return False
+
+    def _read(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        with open(self.path, "rb") as f:
+            data = f.read()
+        header = self.MAGIC + bytes([self.VERSION])
+        if not data.startswith(header):
+            logger.warning("⚠️ Instantané d'état ignoré (format ou version inconnus)")
+            return None
+        return pickle.loads(zlib.decompress(data[len(header):]))
+
+    def _is_stale(self, sources: Dict[str, Optional[float]], component: Dict[str, Any]) -> bool:
+        """Un composant est périmé si un fichier source a changé depuis la capture"""
+        for source in component["sources"]:
+            if source not in sources or self._mtime(source) != sources[source]:
+                return True
+        return False
+
+    def restore(self) -> Dict[str, str]:
+        """
+        Restaure chaque composant depuis l'instantané ou, à défaut, depuis ses fichiers.
+        Retourne {nom: 'snapshot' | 'sources' | 'empty'}
+        """
+        started = time.perf_counter()
+        try:
+            snapshot = self._read()
+        except Exception as e:
+            logger.warning("⚠️ Instantané d'état illisible, rechargement depuis les fichiers: %s", e)
+            snapshot = None
+
+        saved = snapshot["components"] if snapshot else {}
+        report = {}
+        for name, component in self._components.items():
+            entry = saved.get(name)
+            if entry is not None and not self._is_stale(entry["sources"], component):
+                try:
+                    component["import"](entry["state"])
+                    report[name] = "snapshot"
+                    continue
+                except Exception as e:
+                    logger.warning("⚠️ Restauration de '%s' impossible: %s", name, e)
+
+            if component["fallback"]:
+                component["fallback"]()
+                report[name] = "sources"
+            else:
+                report[name] = "empty"
+
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info("♻️ État restauré en %.1f ms: %s", elapsed, report)
+        return report
+
+    def components(self) -> List[str]:
+        return list(self._components)
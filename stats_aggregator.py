@@ -0,0 +1,107 @@
+"""
+Statistiques des résultats maintenues à chaque enregistrement (Projet 1)
+Totaux, victoires Joueur / Banquier, répartition par heure, séries de victoires
+et fréquences des combinaisons de couleurs: chaque ajout met les compteurs à jour
+en temps constant et la lecture ne parcourt jamais la liste des résultats.
+"""
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+WINNERS = ("Joueur", "Banquier")
+
+# Normalisation des symboles de couleur (variantes emoji → symbole simple)
+SUIT_ALIASES = (("❤️", "♥"), ("❤", "♥"), ("♥️", "♥"), ("♠️", "♠"), ("♦️", "♦"), ("♣️", "♣"))
+SUIT_ORDER = "♠♥♦♣"
+
+
+def suit_combination(cards: str) -> Optional[str]:
+    """Combinaison de couleurs d'un groupe de cartes, dans un ordre canonique (ex: '♠♥♣')"""
+    if not cards:
+        return None
+    for alias, suit in SUIT_ALIASES:
+        cards = cards.replace(alias, suit)
+    suits = "".join(suit for suit in SUIT_ORDER if suit in cards)
+    return suits or None
+
+
+class ResultsStatsAggregator:
+    """Compteurs incrémentaux sur les résultats enregistrés"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Remise à zéro (changement de journée)"""
+        self.total = 0
+        self.wins = {winner: 0 for winner in WINNERS}
+        self.hourly = [{winner: 0 for winner in WINNERS} for _ in range(24)]
+        self.suit_combinations: Counter = Counter()
+        self.current_streak_winner: Optional[str] = None
+        self.current_streak = 0
+        self.longest_streaks = {winner: 0 for winner in WINNERS}
+        self.last_numero: Optional[int] = None
+        self._summary: Optional[Dict[str, Any]] = None
+
+    def rebuild(self, results: Iterable[Dict[str, Any]]):
+        """Recalcule les compteurs (chargement, restauration ou remplacement des données)"""
+        self.reset()
+        for result in results:
+            self.add(result)
+
+    def add(self, result: Dict[str, Any]):
+        """Met à jour les compteurs avec un nouveau résultat"""
+        winner = result.get("gagnant")
+        self.total += 1
+        self.last_numero = result.get("numero", self.last_numero)
+        self._summary = None
+
+        if winner not in self.wins:
+            return
+        self.wins[winner] += 1
+
+        hour = self._hour(result.get("heure"))
+        if hour is not None:
+            self.hourly[hour][winner] += 1
+
+        combination = suit_combination(result.get("cartes_groupe1", ""))
+        if combination:
+            self.suit_combinations[combination] += 1
+
+        if winner == self.current_streak_winner:
+            self.current_streak += 1
+        else:
+            self.current_streak_winner = winner
+            self.current_streak = 1
+        if self.current_streak > self.longest_streaks[winner]:
+            self.longest_streaks[winner] = self.current_streak
+
+    @staticmethod
+    def _hour(heure: Any) -> Optional[int]:
+        try:
+            hour = int(str(heure).split(":", 1)[0])
+        except (TypeError, ValueError):
+            return None
+        return hour if 0 <= hour < 24 else None
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Statistiques courantes (mêmes clés que l'ancien get_stats, plus les détails)
+        Le dictionnaire est mis en cache jusqu'au prochain ajout.
+        """
+        if self._summary is None:
+            total = self.total
+            joueur, banquier = self.wins["Joueur"], self.wins["Banquier"]
+            self._summary = {
+                "total": total,
+                "joueur_victoires": joueur,
+                "banquier_victoires": banquier,
+                "taux_joueur": (joueur / total * 100) if total > 0 else 0.0,
+                "taux_banquier": (banquier / total * 100) if total > 0 else 0.0,
+                "par_heure": {f"{hour:02d}h": dict(counts) for hour, counts in enumerate(self.hourly)
+                              if counts["Joueur"] or counts["Banquier"]},
+                "serie_actuelle": {"gagnant": self.current_streak_winner, "longueur": self.current_streak},
+                "plus_longues_series": dict(self.longest_streaks),
+                "combinaisons": dict(self.suit_combinations.most_common()),
+                "dernier_numero": self.last_numero
+            }
+        return self._summary
@@ -0,0 +1,99 @@
+"""
+Enregistrement des mises à jour du canal source pour les rejouer hors ligne
+Chaque message reçu ou édité est ajouté en fin de journal NDJSON (un fichier par jour):
+{"id": 123, "chat": -100..., "date": 1735689600, "recv": 1735689601.25, "edit": 0, "text": "..."}
+Les journaux des jours précédents sont compressés (gzip) par la compaction.
+Activé avec la variable d'environnement CAPTURE_UPDATES=1.
+"""
+import gzip
+import json
+import logging
+import os
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateRecorder:
+    """Ajoute les mises à jour du canal au journal du jour"""
+
+    def __init__(self, directory: str = "data/captures"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._day: Optional[str] = None
+        self._file = None
+        self.recorded = 0
+
+    def path_for(self, day: str) -> Path:
+        return self.directory / f"updates-{day}.ndjson"
+
+    def _current_file(self):
+        today = date.today().isoformat()
+        if today != self._day:
+            self.close()
+            self._day = today
+            self._file = open(self.path_for(today), "a", encoding="utf-8")
+        return self._file
+
+    def record(self, message_id: int, chat_id: int, text: str, edited: bool = False,
+               sent_at: Optional[float] = None):
+        """Ajoute une mise à jour (sent_at: date du message Telegram en secondes epoch)"""
+        try:
+            entry = {
+                "id": message_id,
+                "chat": chat_id,
+                "date": int(sent_at) if sent_at is not None else None,
+                "recv": round(time.time(), 3),
+                "edit": 1 if edited else 0,
+                "text": text
+            }
+            f = self._current_file()
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+            f.write("\n")
+            f.flush()
+            self.recorded += 1
+        except Exception as e:
+            logger.error("❌ Erreur enregistrement mise à jour: %s", e)
+
+    def record_event(self, event, edited: bool = False):
+        """Ajoute une mise à jour Telethon (NewMessage / MessageEdited)"""
+        message = event.message
+        sent_at = message.date.timestamp() if getattr(message, "date", None) else None
+        self.record(message.id, event.chat_id, message.message or "", edited=edited, sent_at=sent_at)
+
+    def compress_old(self) -> int:
+        """Compresse les journaux des jours précédents, retourne le nombre d'octets récupérés"""
+        reclaimed = 0
+        today = self.path_for(date.today().isoformat()).name
+        for path in self.directory.glob("updates-*.ndjson"):
+            if path.name == today:
+                continue
+            size = path.stat().st_size
+            target = path.with_name(path.name + ".gz")
+            with open(path, "rb") as source, gzip.open(target, "wb", compresslevel=6) as dest:
+                dest.write(source.read())
+            path.unlink()
+            reclaimed += size - target.stat().st_size
+        return reclaimed
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_updates(path: str) -> Iterator[Dict[str, Any]]:
+    """Lit un journal de mises à jour (.ndjson ou .ndjson.gz)"""
+    opener = gzip.open if str(path).endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def capture_enabled() -> bool:
+    return os.getenv("CAPTURE_UPDATES", "").strip().lower() in ("1", "true", "yes", "oui")
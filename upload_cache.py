@@ -0,0 +1,118 @@
+"""
+Cache des fichiers déjà envoyés sur Telegram
+Un fichier identique (même empreinte SHA-256, même nom affiché) n'est téléversé qu'une
+seule fois: les envois suivants réutilisent le document Telegram du premier message,
+ce qui ne transmet que des métadonnées. Un même téléversement sert aussi à envoyer le
+fichier à plusieurs discussions.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from telethon import errors
+from telethon.tl.types import DocumentAttributeFilename
+
+from file_digest import FileDigests
+
+logger = logging.getLogger(__name__)
+
+# Erreurs indiquant que la référence Telegram n'est plus utilisable: nouveau téléversement
+STALE_REFERENCE_ERRORS = (
+    errors.FileReferenceExpiredError,
+    errors.FilePartMissingError,
+    errors.MediaEmptyError,
+)
+
+
+class UploadCache:
+    """Réutilise les fichiers téléversés, indexés par empreinte du contenu"""
+
+    def __init__(self, client, max_entries: int = 32):
+        self.client = client
+        self.max_entries = max_entries
+        # clé (empreinte:nom) -> {"document", "input_file", "uploaded_at", "sends"}
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._digests = FileDigests()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.uploads = 0
+        self.reuses = 0
+
+    def file_digest(self, path: str) -> str:
+        """Empreinte SHA-256 du fichier (mémorisée tant que le fichier ne change pas)"""
+        return self._digests.digest(path)
+
+    def _remember(self, key: str, entry: Dict[str, Any]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            self._locks.pop(old_key, None)
+
+    async def _upload(self, path: str, file_name: str):
+        input_file = await self.client.upload_file(path, file_name=file_name)
+        self.uploads += 1
+        logger.info("📤 Fichier téléversé: %s (%s octets)", file_name, os.path.getsize(path))
+        return input_file
+
+    async def send(self, chats: Union[int, Iterable[int]], path: str, caption: Optional[str] = None,
+                   file_name: Optional[str] = None, **kwargs) -> List[Any]:
+        """
+        Envoie un fichier à une ou plusieurs discussions.
+        Le fichier n'est téléversé que s'il n'a jamais été envoyé (ou si la référence
+        Telegram a expiré); sinon le document existant est réutilisé.
+        Retourne la liste des messages envoyés.
+        """
+        chat_ids = [chats] if isinstance(chats, int) else list(chats)
+        file_name = file_name or os.path.basename(path)
+        digest = await asyncio.to_thread(self.file_digest, path)
+        key = f"{digest}:{file_name}"
+        attributes = [DocumentAttributeFilename(file_name)]
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        messages = []
+        async with lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+            for chat_id in chat_ids:
+                message = None
+
+                if entry is not None and entry.get("document") is not None:
+                    try:
+                        message = await self.client.send_file(chat_id, entry["document"], caption=caption, **kwargs)
+                        self.reuses += 1
+                    except STALE_REFERENCE_ERRORS as e:
+                        logger.warning("⚠️ Référence expirée pour %s, nouveau téléversement: %s", file_name, e)
+                        entry = None
+
+                if message is None:
+                    if entry is None or entry.get("input_file") is None:
+                        entry = {"input_file": await self._upload(path, file_name), "document": None,
+                                 "uploaded_at": time.time(), "sends": 0}
+                    try:
+                        message = await self.client.send_file(chat_id, entry["input_file"], caption=caption,
+                                                              attributes=attributes, force_document=True, **kwargs)
+                    except STALE_REFERENCE_ERRORS:
+                        # Parties téléversées expirées côté serveur: un seul nouvel essai
+                        entry["input_file"] = await self._upload(path, file_name)
+                        message = await self.client.send_file(chat_id, entry["input_file"], caption=caption,
+                                                              attributes=attributes, force_document=True, **kwargs)
+                    # Les envois suivants (autres discussions comprises) réutilisent ce document
+                    entry["document"] = getattr(message, "document", None)
+                    self._remember(key, entry)
+
+                entry["sends"] += 1
+                messages.append(message)
+
+        return messages
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "uploads": self.uploads,
+            "reuses": self.reuses
+        }
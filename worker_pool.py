@@ -0,0 +1,395 @@
+"""
+Mode superviseur: répartition des canaux supplémentaires sur plusieurs processus
+Le processus principal garde la connexion Telegram; chaque canal est attribué à un processus
+de travail selon son identifiant (toujours le même pour un canal). Le processus de travail
+possède les fichiers du canal (data/channels/<id>/): il enregistre les parties et planifie
+les prédictions Excel. Les envois Telegram sont renvoyés au processus principal, qui les
+effectue puis confirme chaque envoi réussi au processus de travail.
+
+Création des processus: un fork ne copie que le thread appelant, un verrou tenu par un autre
+thread (journal, exécuteur asyncio) resterait pris à jamais dans l'enfant. prefork() crée donc,
+pendant l'import de main.py et avant le premier thread, un processus intermédiaire qui ne lance
+aucun thread. C'est lui qui crée les processus de travail après l'élection (start()), surveille
+leur fin (process.sentinel) et les relance; le processus principal en est averti aussitôt et
+fait échouer les requêtes en cours du processus arrêté.
+
+Chaque processus de travail a ses propres tubes (un seul écrivain, un seul lecteur, sans verrou
+partagé): un processus tué pendant une lecture ne bloque pas son remplaçant.
+
+Protocole (dictionnaires sur des tubes multiprocessing):
+- principal → travail: {"type": "message", "request", "channel", "display", "text"}
+                       {"type": "ack", "channel", "action", "message_id"}   (sans réponse)
+                       {"type": "reset", "request", "channel", "display"}
+                       {"type": "import", "request", "channel", "display", "path"}
+                       {"type": "info", "request"}
+                       None (arrêt)
+- travail → principal: {"request", ...réponse} ou {"request", "error"}
+- intermédiaire ↔ principal: {"type": "start"} / {"type": "stop", "timeout"}
+                             {"event": "started", "index", "pid"} / {"event": "exited", "index", "exitcode"}
+"""
+import asyncio
+import atexit
+import itertools
+import logging
+import multiprocessing
+import multiprocessing.connection
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from channel_registry import ChannelRegistry
+from log_setup import setup_worker_logging
+from predictor import CardPredictor
+
+logger = logging.getLogger(__name__)
+
+
+def _handle_request(registry: ChannelRegistry, predictor: CardPredictor, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    kind = request["type"]
+    if kind == "message":
+        ctx = registry.context_for(request["channel"], request.get("display"))
+        text = request["text"]
+        success, info = ctx.results_manager.process_message(text)
+        ctx.processed += 1
+        actions = []
+        if ctx.display_channel:
+            game_number = predictor.extract_game_number(text)
+            if game_number:
+                actions = ctx.excel_manager.plan_actions(game_number, text, ctx.display_channel)
+        return {
+            "success": success,
+            "info": info,
+            "stats": ctx.results_manager.get_stats() if success else None,
+            "actions": actions
+        }
+    if kind == "ack":
+        ctx = registry.get(request["channel"])
+        if ctx is not None:
+            ctx.excel_manager.apply_action(request["action"], request.get("message_id"))
+        return None
+    if kind == "reset":
+        # Remise à zéro quotidienne: même déroulé que daily_reset_channel() dans main.py,
+        # le fichier du rapport est écrit ici et envoyé par le processus principal
+        ctx = registry.context_for(request["channel"], request.get("display"))
+        manager = ctx.results_manager
+        stats = manager.get_stats()
+        report = None
+        import_result = None
+        if stats["total"] > 0:
+            snapshot = manager.storage_snapshot()
+            report = manager.export_cached("xlsx", snapshot)
+            import_result = ctx.excel_manager.import_records(manager.iter_export_rows(snapshot[2]), replace_mode=True)
+        manager.reset_results()
+        return {"stats": stats, "report": report, "import": import_result}
+    if kind == "import":
+        ctx = registry.context_for(request["channel"], request.get("display"))
+        return {"result": ctx.excel_manager.import_excel(request["path"], replace_mode=True)}
+    if kind == "info":
+        return {"pid": os.getpid(), "channels": registry.info()}
+    raise ValueError(f"Requête inconnue: {kind}")
+
+
+def _worker_main(index: int, inbox, outbox, base_dir: str):
+    """Boucle d'un processus de travail: traite les requêtes dans l'ordre de réception"""
+    setup_worker_logging()
+    registry = ChannelRegistry(base_dir=base_dir)
+    predictor = CardPredictor()
+    logger.info("✅ Processus de travail %s démarré (pid %s)", index, os.getpid())
+    while True:
+        try:
+            request = inbox.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        try:
+            reply = _handle_request(registry, predictor, request)
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        if request.get("request") is not None:
+            outbox.send({"request": request["request"], **(reply or {})})
+    logger.info("🛑 Processus de travail %s arrêté", index)
+
+
+def _supervisor_main(control, inboxes: List, outboxes: List, base_dir: str, inherited: List):
+    """
+    Processus intermédiaire (sans thread): crée les processus de travail sur demande,
+    signale leur fin au processus principal et les relance jusqu'à l'arrêt
+    inherited: extrémités des tubes propres au processus principal, copiées par le fork
+    (fermées ici pour que la fin du processus principal soit vue comme une fin de fichier)
+    """
+    for connection in inherited:
+        connection.close()
+    context = multiprocessing.get_context("fork")
+    workers: Dict[int, multiprocessing.Process] = {}
+
+    def run_worker(index: int):
+        control.close()
+        _worker_main(index, inboxes[index], outboxes[index], base_dir)
+
+    def spawn(index: int):
+        process = context.Process(target=run_worker, name=f"channel-worker-{index}", args=(index,), daemon=True)
+        process.start()
+        workers[index] = process
+        control.send({"event": "started", "index": index, "pid": process.pid})
+
+    stop_timeout = None
+    while stop_timeout is None:
+        sentinels = {process.sentinel: index for index, process in workers.items()}
+        ready = multiprocessing.connection.wait([control, *sentinels])
+        for handle in sorted(ready, key=lambda handle: handle is not control):
+            if handle is control:
+                try:
+                    command = control.recv()
+                except EOFError:
+                    command = {"type": "stop", "timeout": 0}  # Processus principal disparu
+                if command["type"] == "start":
+                    for index in range(len(inboxes)):
+                        if index not in workers:
+                            spawn(index)
+                elif command["type"] == "stop":
+                    stop_timeout = command.get("timeout", 10.0)
+            elif stop_timeout is None:
+                index = sentinels[handle]
+                process = workers.pop(index)
+                process.join()
+                control.send({"event": "exited", "index": index, "exitcode": process.exitcode})
+                spawn(index)
+
+    for process in workers.values():
+        process.join(stop_timeout)
+        if process.is_alive():
+            process.terminate()
+
+
+class WorkerHandle:
+    """Processus de travail vu du processus principal: tube d'envoi et compteurs"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.pid: Optional[int] = None
+        self.alive = False
+        self.inbox = None
+        self.outbox = None
+        self.queue: "queue.Queue" = queue.Queue()
+        self.writer: Optional[threading.Thread] = None
+        self.sent = 0
+        self.restarts = 0
+
+    def info(self, pending: int) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "pid": self.pid,
+            "alive": self.alive,
+            "sent": self.sent,
+            "pending": pending,
+            "restarts": self.restarts
+        }
+
+
+class ChannelWorkerPool:
+    """Répartit les messages des canaux supplémentaires sur N processus de travail"""
+
+    def __init__(self, processes: int, base_dir: str = "data/channels", timeout: float = 60.0):
+        self.processes = processes
+        self.base_dir = base_dir
+        self.timeout = timeout
+        self._context = multiprocessing.get_context("fork") if self.supported() else None
+        self._workers = [WorkerHandle(index) for index in range(processes)]
+        self._supervisor = None
+        self._control = None
+        self._reader: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[int, tuple] = {}
+        self._ids = itertools.count(1)
+        self._stopped = False
+
+    @staticmethod
+    def supported() -> bool:
+        """
+        Les processus sont créés par fork: avec spawn, main.py serait réexécuté
+        dans chaque processus de travail (nouvelle connexion Telegram)
+        """
+        return "fork" in multiprocessing.get_all_start_methods()
+
+    def prefork(self):
+        """Crée le processus intermédiaire (à l'import de main.py, avant tout thread)"""
+        if threading.active_count() > 1:
+            logger.warning("⚠️ Processus intermédiaire créé alors que %s threads sont actifs",
+                           threading.active_count())
+        inboxes = [self._context.Pipe(duplex=False) for _ in self._workers]
+        outboxes = [self._context.Pipe(duplex=False) for _ in self._workers]
+        self._control, supervisor_end = self._context.Pipe()
+        self._supervisor = self._context.Process(
+            target=_supervisor_main, name="channel-workers",
+            args=(supervisor_end, [reader for reader, _ in inboxes], [writer for _, writer in outboxes],
+                  self.base_dir, [self._control, *(writer for _, writer in inboxes), *(reader for reader, _ in outboxes)]))
+        self._supervisor.start()
+        # Le processus principal ne garde que ses extrémités des tubes
+        supervisor_end.close()
+        for worker, (inbox_reader, inbox_writer), (outbox_reader, outbox_writer) in zip(self._workers, inboxes, outboxes):
+            inbox_reader.close()
+            outbox_writer.close()
+            worker.inbox = inbox_writer
+            worker.outbox = outbox_reader
+        # Sortie sans stop() (configuration invalide, instance restée en attente): le processus
+        # intermédiaire n'est pas un démon, multiprocessing attendrait sa fin indéfiniment
+        atexit.register(self.stop, 0)
+
+    def start(self):
+        """Démarre les processus de travail (après l'élection, depuis la boucle asyncio)"""
+        self._loop = asyncio.get_running_loop()
+        for worker in self._workers:
+            worker.writer = threading.Thread(target=self._write_requests, args=(worker,),
+                                             name=f"worker-requests-{worker.index}", daemon=True)
+            worker.writer.start()
+        self._reader = threading.Thread(target=self._read_replies, name="worker-replies", daemon=True)
+        self._reader.start()
+        self._control.send({"type": "start"})
+
+    def _write_requests(self, worker: WorkerHandle):
+        """Thread d'envoi: un processus de travail lent ne bloque jamais la boucle asyncio"""
+        while True:
+            payload = worker.queue.get()
+            try:
+                worker.inbox.send(payload)
+            except OSError as e:
+                logger.error("❌ Envoi au processus de travail %s impossible: %s", worker.index, e)
+                break
+            if payload is None:
+                break
+
+    def _read_replies(self):
+        """Réponses des processus de travail et avis du processus intermédiaire (fin d'un processus)"""
+        sources = {worker.outbox: worker for worker in self._workers}
+        handles = [self._control, *sources]
+        while self._control in handles:
+            for handle in multiprocessing.connection.wait(handles):
+                try:
+                    message = handle.recv()
+                except (EOFError, OSError):
+                    handles.remove(handle)
+                    if handle is self._control:
+                        message = {"event": "closed"}
+                    else:
+                        continue
+                try:
+                    if handle is self._control:
+                        self._loop.call_soon_threadsafe(self._on_event, message)
+                    else:
+                        self._loop.call_soon_threadsafe(self._resolve, message)
+                except RuntimeError:
+                    return  # Boucle asyncio fermée (arrêt du bot)
+
+    def _on_event(self, event: Dict[str, Any]):
+        if event["event"] == "started":
+            worker = self._workers[event["index"]]
+            worker.pid, worker.alive = event["pid"], True
+        elif event["event"] == "exited":
+            worker = self._workers[event["index"]]
+            worker.alive = False
+            worker.restarts += 1
+            logger.warning("⚠️ Processus de travail %s arrêté (code %s), relance", worker.index, event["exitcode"])
+            self._fail_pending(worker.index, f"Processus de travail {worker.index} arrêté")
+        elif event["event"] == "closed":
+            for worker in self._workers:
+                worker.alive = False
+            if not self._stopped:
+                logger.error("❌ Processus intermédiaire des processus de travail arrêté")
+            self._fail_pending(None, "Processus de travail indisponibles")
+
+    def _fail_pending(self, index: Optional[int], reason: str):
+        for request_id, (worker_index, future) in list(self._pending.items()):
+            if index is None or worker_index == index:
+                del self._pending[request_id]
+                if not future.done():
+                    future.set_exception(RuntimeError(reason))
+
+    def _resolve(self, reply: Dict[str, Any]):
+        entry = self._pending.pop(reply.pop("request"), None)
+        if entry is None or entry[1].done():
+            return
+        future = entry[1]
+        if "error" in reply:
+            future.set_exception(RuntimeError(reply["error"]))
+        else:
+            future.set_result(reply)
+
+    def shard(self, channel_id: int) -> int:
+        return abs(int(channel_id)) % self.processes
+
+    def _post(self, index: int, payload: Dict[str, Any]):
+        worker = self._workers[index]
+        worker.queue.put(payload)
+        worker.sent += 1
+
+    async def _request(self, index: int, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        future = self._loop.create_future()
+        self._pending[request_id] = (index, future)
+        self._post(index, {**payload, "request": request_id})
+        try:
+            return await asyncio.wait_for(future, timeout or self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def process(self, channel_id: int, display_channel: Optional[int], text: str) -> Dict[str, Any]:
+        """Enregistre un message du canal: {"success", "info", "stats", "actions"}"""
+        return await self._request(self.shard(channel_id), {"type": "message", "channel": channel_id,
+                                                            "display": display_channel, "text": text})
+
+    def acknowledge(self, channel_id: int, action: Dict[str, Any], message_id: Optional[int] = None):
+        """Confirme un envoi effectué pour le canal (lancement ou mise à jour d'une prédiction)"""
+        self._post(self.shard(channel_id), {"type": "ack", "channel": channel_id, "action": action,
+                                            "message_id": message_id})
+
+    async def daily_reset(self, channel_id: int, display_channel: Optional[int],
+                          timeout: float = 600.0) -> Dict[str, Any]:
+        """
+        Remise à zéro quotidienne du canal: {"stats", "report", "import"}
+        report: fichier Excel de la journée (None sans partie), import: résultat de l'import dans le Projet 2
+        """
+        return await self._request(self.shard(channel_id), {"type": "reset", "channel": channel_id,
+                                                            "display": display_channel}, timeout)
+
+    async def import_excel(self, channel_id: int, display_channel: Optional[int], path: str,
+                           timeout: float = 600.0) -> Dict[str, Any]:
+        """Import d'un fichier Excel dans les prédictions du canal (résultat de import_excel())"""
+        reply = await self._request(self.shard(channel_id), {"type": "import", "channel": channel_id,
+                                                             "display": display_channel,
+                                                             "path": os.path.abspath(path)}, timeout)
+        return reply["result"]
+
+    async def channels_info(self) -> List[Dict[str, Any]]:
+        """Statistiques des canaux tenus par l'ensemble des processus de travail"""
+        replies = await asyncio.gather(*(self._request(worker.index, {"type": "info"}) for worker in self._workers),
+                                       return_exceptions=True)
+        return [channel for reply in replies if isinstance(reply, dict) for channel in reply["channels"]]
+
+    def stats(self) -> List[Dict[str, Any]]:
+        pending = [index for index, _ in self._pending.values()]
+        return [worker.info(pending.count(worker.index)) for worker in self._workers]
+
+    def stop(self, timeout: float = 10.0):
+        """Arrête les processus après le traitement des requêtes déjà transmises (bloquant)"""
+        if self._stopped or self._supervisor is None:
+            return
+        self._stopped = True
+        try:
+            # Le processus intermédiaire cesse de relancer avant que les processus ne s'arrêtent
+            self._control.send({"type": "stop", "timeout": timeout})
+        except OSError:
+            pass
+        for worker in self._workers:
+            if worker.writer is not None:
+                worker.queue.put(None)
+                worker.writer.join(timeout)
+            else:
+                try:
+                    worker.inbox.send(None)
+                except OSError:
+                    pass
+        self._supervisor.join(timeout + 5)
+        if self._supervisor.is_alive():
+            self._supervisor.terminate()
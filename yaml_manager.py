@@ -2,7 +2,9 @@
 Gestionnaire de données YAML pour le bot Telegram de prédiction
 Remplace complètement la base de données PostgreSQL par des fichiers YAML
 """
+import logging
 import os
+import gzip
 import yaml
 import json
 import hashlib
@@ -10,6 +12,12 @@ from datetime import datetime, date, time, timedelta
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
+
+# Champs conservés dans le journal de déduplication (forme minimale)
+MESSAGE_LOG_FIELDS = ('message_hash', 'channel_id', 'processed_at')
+
 
 class YAMLDataManager:
     """Gestionnaire de données basé sur YAML"""
@@ -22,25 +30,63 @@ class YAMLDataManager:
         # Fichiers de données
         self.config_file = self.data_dir / "bot_config.yaml"
         self.predictions_file = self.data_dir / "predictions.yaml"
-        self.auto_predictions_file = self.data_dir / "auto_predictions.yaml"
+        self.auto_predictions_file = self.data_dir / "auto_predictions.yaml"  # Ancien fichier unique
+        self.auto_predictions_dir = self.data_dir / "auto_predictions"  # Un fichier par jour
         self.message_log_file = self.data_dir / "message_log.yaml"
+        self.predictions_archive_file = self.data_dir / "predictions_archive.yaml"
+        self.archives_dir = self.data_dir / "archives"  # Archives de prédictions compressées
+        
+        # Prédictions en mémoire indexées par game_number + index secondaire par statut
+        self._predictions: Optional[Dict[int, Dict[str, Any]]] = None
+        self._status_index: Dict[str, set] = {}
+        self._next_id = 1
+        self._archived = {'total': 0, 'success': 0}  # Compteurs des prédictions archivées
+        
+        # Planification du jour en mémoire: (date ISO, planification)
+        self._today_schedule: Optional[tuple] = None
+        
+        # Journal de déduplication en mémoire (chargé au premier accès)
+        self._message_log: Optional[List[Dict[str, Any]]] = None
+        self._message_hashes: set = set()
         
         # Initialiser les fichiers s'ils n'existent pas
         self._init_files()
-        print("✅ Gestionnaire YAML initialisé")
+        logger.info("✅ Gestionnaire YAML initialisé")
     
     def _init_files(self):
         """Initialise les fichiers YAML s'ils n'existent pas"""
         default_structures = {
             self.config_file: {},
             self.predictions_file: [],
-            self.auto_predictions_file: {},
             self.message_log_file: []
         }
         
         for file_path, default_content in default_structures.items():
             if not file_path.exists():
                 self._save_yaml(file_path, default_content)
+        
+        self.auto_predictions_dir.mkdir(exist_ok=True)
+        self._migrate_auto_predictions()
+    
+    def _migrate_auto_predictions(self):
+        """Découpe l'ancien fichier auto_predictions.yaml en un fichier par jour"""
+        if not self.auto_predictions_file.exists():
+            return
+        try:
+            auto_predictions = self._load_yaml(self.auto_predictions_file)
+            if isinstance(auto_predictions, dict):
+                for date_str, schedule in auto_predictions.items():
+                    shard = self._schedule_shard(str(date_str))
+                    if not shard.exists():
+                        self._save_yaml(shard, schedule or {})
+            self.auto_predictions_file.unlink()
+            logger.info("📦 Planifications migrées vers %s/ (%s jours)", self.auto_predictions_dir, len(auto_predictions or {}))
+        except Exception as e:
+            logger.error("❌ Erreur migration planifications: %s", e)
+    
+    def _schedule_shard(self, date_str: str) -> Path:
+        """Fichier de planification d'un jour (YYYY-MM-DD)"""
+        return self.auto_predictions_dir / f"{date_str}.yaml"
     
     def _load_yaml(self, file_path: Path) -> Any:
         """Charge un fichier YAML"""
@@ -50,7 +96,7 @@ class YAMLDataManager:
                     return yaml.safe_load(f) or {}
             return {}
         except Exception as e:
-            print(f"❌ Erreur chargement {file_path}: {e}")
+            logger.error("❌ Erreur chargement %s: %s", file_path, e)
             return {}
     
     def _save_yaml(self, file_path: Path, data: Any):
@@ -59,7 +105,7 @@ class YAMLDataManager:
             with open(file_path, 'w', encoding='utf-8') as f:
                 yaml.dump(data, f, allow_unicode=True, default_flow_style=False, indent=2)
         except Exception as e:
-            print(f"❌ Erreur sauvegarde {file_path}: {e}")
+            logger.error("❌ Erreur sauvegarde %s: %s", file_path, e)
     
     def set_config(self, key: str, value: Any):
         """Sauvegarde une valeur de configuration"""
@@ -71,7 +117,7 @@ class YAMLDataManager:
             }
             self._save_yaml(self.config_file, config)
         except Exception as e:
-            print(f"❌ Erreur set_config: {e}")
+            logger.error("❌ Erreur set_config: %s", e)
     
     def get_config(self, key: str, default=None):
         """Récupère une valeur de configuration"""
@@ -81,25 +127,87 @@ class YAMLDataManager:
                 return config[key]['value']
             return default
         except Exception as e:
-            print(f"❌ Erreur get_config: {e}")
+            logger.error("❌ Erreur get_config: %s", e)
             return default
     
+    def _get_predictions(self) -> Dict[int, Dict[str, Any]]:
+        """Retourne les prédictions actives (lecture du YAML au premier accès)"""
+        if self._predictions is None:
+            self._set_predictions_state(self._load_yaml(self.predictions_file))
+        return self._predictions
+    
+    def reload_predictions(self):
+        """Relit les prédictions depuis le fichier (ignore l'état en mémoire)"""
+        self._predictions = None
+        self._get_predictions()
+    
+    def _set_predictions_state(self, data: Any):
+        """Construit le stockage indexé depuis le fichier (nouveau format ou ancienne liste)"""
+        if isinstance(data, list):
+            # Ancien format: liste de prédictions
+            entries = data
+            next_id = len(data) + 1
+            archived = {'total': 0, 'success': 0}
+        elif isinstance(data, dict) and 'predictions' in data:
+            entries = list((data.get('predictions') or {}).values())
+            next_id = data.get('next_id', len(entries) + 1)
+            archived = data.get('archived') or {'total': 0, 'success': 0}
+        else:
+            entries, next_id, archived = [], 1, {'total': 0, 'success': 0}
+        
+        self._predictions = {}
+        self._status_index = {}
+        for prediction in entries:
+            game_number = prediction.get('game_number')
+            if game_number is None or game_number in self._predictions:
+                continue
+            self._predictions[game_number] = prediction
+            self._index_add(game_number, prediction.get('status'))
+        self._next_id = max(next_id, max((p.get('id', 0) for p in entries), default=0) + 1)
+        self._archived = dict(archived)
+    
+    def _index_add(self, game_number: int, status: Optional[str]):
+        self._status_index.setdefault(status, set()).add(game_number)
+    
+    def _index_remove(self, game_number: int, status: Optional[str]):
+        numbers = self._status_index.get(status)
+        if numbers is not None:
+            numbers.discard(game_number)
+            if not numbers:
+                del self._status_index[status]
+    
+    def _save_predictions(self):
+        self._save_yaml(self.predictions_file, {
+            'next_id': self._next_id,
+            'archived': self._archived,
+            'predictions': self._get_predictions()
+        })
+    
+    def export_predictions_state(self) -> Dict[str, Any]:
+        """État des prédictions pour l'instantané de redémarrage"""
+        return {
+            'next_id': self._next_id,
+            'archived': self._archived,
+            'predictions': self._get_predictions()
+        }
+    
+    def import_predictions_state(self, state: Dict[str, Any]):
+        """Restaure les prédictions depuis un instantané"""
+        self._set_predictions_state(state)
+    
     def save_prediction(self, game_number: int, suit_combination: str, 
                        message_id: Optional[int] = None, chat_id: Optional[int] = None, 
                        prediction_type: str = 'manual'):
         """Sauvegarde une prédiction manuelle"""
         try:
-            predictions = self._load_yaml(self.predictions_file)
-            if not isinstance(predictions, list):
-                predictions = []
+            predictions = self._get_predictions()
             
             # Vérifier si la prédiction existe déjà
-            existing = any(p.get('game_number') == game_number for p in predictions)
-            if existing:
+            if game_number in predictions:
                 return
             
             prediction = {
-                'id': len(predictions) + 1,
+                'id': self._next_id,
                 'game_number': game_number,
                 'suit_combination': suit_combination,
                 'status': '⌛',
@@ -110,185 +218,219 @@ class YAMLDataManager:
                 'prediction_type': prediction_type
             }
             
-            predictions.append(prediction)
-            self._save_yaml(self.predictions_file, predictions)
+            self._next_id += 1
+            predictions[game_number] = prediction
+            self._index_add(game_number, '⌛')
+            self._save_predictions()
         except Exception as e:
-            print(f"❌ Erreur save_prediction: {e}")
-    
-    def update_prediction_status(self, game_number: int, status: str):
-        """Met à jour le statut d'une prédiction"""
-        try:
-            predictions = self._load_yaml(self.predictions_file)
-            if not isinstance(predictions, list):
-                return
-            
-            for prediction in predictions:
-                if prediction.get('game_number') == game_number:
-                    prediction['status'] = status
-                    prediction['verified_at'] = datetime.now().isoformat()
-                    break
-            
-            self._save_yaml(self.predictions_file, predictions)
-        except Exception as e:
-            print(f"❌ Erreur update_prediction_status: {e}")
+            logger.error("❌ Erreur save_prediction: %s", e)
     
     def get_pending_predictions(self) -> List[Dict]:
         """Récupère les prédictions en attente"""
         try:
-            predictions = self._load_yaml(self.predictions_file)
-            if not isinstance(predictions, list):
-                return []
-            
-            return [p for p in predictions if p.get('status') == '⌛']
+            predictions = self._get_predictions()
+            return [predictions[game_number] for game_number in sorted(self._status_index.get('⌛', ()))]
         except Exception as e:
-            print(f"❌ Erreur get_pending_predictions: {e}")
+            logger.error("❌ Erreur get_pending_predictions: %s", e)
             return []
     
     def update_prediction_status(self, game_number: int, new_status: str):
         """Met à jour le statut d'une prédiction existante"""
         try:
-            predictions = self._load_yaml(self.predictions_file)
-            if not isinstance(predictions, list):
-                predictions = []
-            
-            # Trouver et mettre à jour la prédiction
-            updated = False
-            for prediction in predictions:
-                if prediction.get('game_number') == game_number:
-                    old_status = prediction.get('status', 'inconnu')
-                    prediction['status'] = new_status
-                    prediction['verified_at'] = datetime.now().isoformat()
-                    updated = True
-                    print(f"📁 Prédiction #{game_number}: {old_status} → {new_status}")
-                    break
+            prediction = self._get_predictions().get(game_number)
             
-            if updated:
-                self._save_yaml(self.predictions_file, predictions)
-                return True
-            else:
-                print(f"⚠️ Prédiction #{game_number} non trouvée dans YAML")
+            if prediction is None:
+                logger.warning("⚠️ Prédiction #%s non trouvée dans YAML", game_number)
                 return False
+            
+            old_status = prediction.get('status', 'inconnu')
+            self._index_remove(game_number, prediction.get('status'))
+            prediction['status'] = new_status
+            prediction['verified_at'] = datetime.now().isoformat()
+            self._index_add(game_number, new_status)
+            logger.debug("📁 Prédiction #%s: %s → %s", game_number, old_status, new_status)
+            
+            self._save_predictions()
+            return True
                 
         except Exception as e:
-            print(f"❌ Erreur update_prediction_status: {e}")
+            logger.error("❌ Erreur update_prediction_status: %s", e)
             return False
     
-    def save_auto_prediction_schedule(self, schedule_data: Dict[str, Any]):
-        """Sauvegarde la planification automatique complète"""
+    def compact_predictions(self) -> int:
+        """
+        Déplace les prédictions vérifiées (statut différent de ⌛) vers le fichier d'archive
+        pour garder l'ensemble actif petit. Retourne le nombre de prédictions archivées.
+        """
         try:
-            # Ajouter la date courante pour organiser par jour
-            today = date.today().isoformat()
-            auto_predictions = self._load_yaml(self.auto_predictions_file)
+            predictions = self._get_predictions()
+            verified = [game_number for status, numbers in self._status_index.items()
+                        if status != '⌛' for game_number in numbers]
+            if not verified:
+                return 0
             
-            if not isinstance(auto_predictions, dict):
-                auto_predictions = {}
+            archived_entries = []
+            for game_number in sorted(verified):
+                prediction = predictions.pop(game_number)
+                self._index_remove(game_number, prediction.get('status'))
+                archived_entries.append(prediction)
+                self._archived['total'] += 1
+                if str(prediction.get('status', '')).startswith('✅'):
+                    self._archived['success'] += 1
             
-            # Remplacer la planification du jour
-            auto_predictions[today] = schedule_data
+            # Ajout en fin de fichier: les listes YAML concaténées forment une seule liste
+            with open(self.predictions_archive_file, 'a', encoding='utf-8') as f:
+                yaml.dump(archived_entries, f, allow_unicode=True, default_flow_style=False, indent=2)
             
-            self._save_yaml(self.auto_predictions_file, auto_predictions)
+            self._save_predictions()
+            logger.info("🗜️ Compaction: %s prédictions vérifiées archivées", len(archived_entries))
+            return len(archived_entries)
         except Exception as e:
-            print(f"❌ Erreur save_auto_prediction_schedule: {e}")
+            logger.error("❌ Erreur compact_predictions: %s", e)
+            return 0
+    
+    def save_auto_prediction_schedule(self, schedule_data: Dict[str, Any]):
+        """Sauvegarde la planification automatique complète"""
+        try:
+            # Chaque jour a son propre fichier: seul celui du jour est réécrit
+            today = date.today().isoformat()
+            self._today_schedule = (today, schedule_data)
+            self._save_yaml(self._schedule_shard(today), schedule_data)
+        except Exception as e:
+            logger.error("❌ Erreur save_auto_prediction_schedule: %s", e)
     
     def load_auto_prediction_schedule(self) -> Dict[str, Any]:
-        """Charge la planification automatique du jour"""
+        """Charge la planification automatique du jour (fichier du jour uniquement, mis en cache)"""
         try:
             today = date.today().isoformat()
-            auto_predictions = self._load_yaml(self.auto_predictions_file)
-            
-            if not isinstance(auto_predictions, dict):
-                return {}
-            
-            return auto_predictions.get(today, {})
+            if self._today_schedule is None or self._today_schedule[0] != today:
+                schedule = self._load_yaml(self._schedule_shard(today))
+                self._today_schedule = (today, schedule if isinstance(schedule, dict) else {})
+            return self._today_schedule[1]
         except Exception as e:
-            print(f"❌ Erreur load_auto_prediction_schedule: {e}")
+            logger.error("❌ Erreur load_auto_prediction_schedule: %s", e)
             return {}
     
     def update_auto_prediction(self, numero: str, updates: Dict[str, Any]):
         """Met à jour une prédiction automatique"""
         try:
-            today = date.today().isoformat()
-            auto_predictions = self._load_yaml(self.auto_predictions_file)
-            
-            if not isinstance(auto_predictions, dict):
-                auto_predictions = {}
+            schedule = self.load_auto_prediction_schedule()
             
-            if today not in auto_predictions:
-                auto_predictions[today] = {}
-            
-            if numero in auto_predictions[today]:
-                auto_predictions[today][numero].update(updates)
-                self._save_yaml(self.auto_predictions_file, auto_predictions)
+            if numero in schedule:
+                schedule[numero].update(updates)
+                self._save_yaml(self._schedule_shard(self._today_schedule[0]), schedule)
         except Exception as e:
-            print(f"❌ Erreur update_auto_prediction: {e}")
+            logger.error("❌ Erreur update_auto_prediction: %s", e)
+    
+    def _get_message_log(self) -> List[Dict[str, Any]]:
+        """Retourne le journal des messages traités (lecture du YAML au premier accès)"""
+        if self._message_log is None:
+            message_log = self._load_yaml(self.message_log_file)
+            self._set_message_log(message_log if isinstance(message_log, list) else [])
+        return self._message_log
+    
+    def reload_message_log(self):
+        """Relit le journal des messages depuis le fichier (ignore l'état en mémoire)"""
+        self._message_log = None
+        self._get_message_log()
+    
+    def _set_message_log(self, message_log: List[Dict[str, Any]]):
+        self._message_log = message_log
+        self._message_hashes = {msg.get('message_hash') for msg in message_log}
+    
+    def export_state(self) -> List[Dict[str, Any]]:
+        """État en mémoire pour l'instantané de redémarrage"""
+        return self._get_message_log()
+    
+    def import_state(self, state: List[Dict[str, Any]]):
+        """Restaure le journal de déduplication depuis un instantané"""
+        self._set_message_log(state if isinstance(state, list) else [])
     
     def is_message_processed(self, message_content: str, channel_id: int) -> bool:
         """Vérifie si un message a déjà été traité"""
         try:
             message_hash = hashlib.sha256(f"{channel_id}:{message_content}".encode()).hexdigest()
-            message_log = self._load_yaml(self.message_log_file)
-            
-            if not isinstance(message_log, list):
-                return False
-            
-            return any(msg.get('message_hash') == message_hash for msg in message_log)
+            self._get_message_log()
+            return message_hash in self._message_hashes
         except Exception as e:
-            print(f"❌ Erreur is_message_processed: {e}")
+            logger.error("❌ Erreur is_message_processed: %s", e)
             return False
     
     def mark_message_processed(self, message_content: str, channel_id: int):
         """Marque un message comme traité"""
         try:
             message_hash = hashlib.sha256(f"{channel_id}:{message_content}".encode()).hexdigest()
-            message_log = self._load_yaml(self.message_log_file)
-            
-            if not isinstance(message_log, list):
-                message_log = []
+            message_log = self._get_message_log()
             
             # Vérifier si déjà traité
-            if any(msg.get('message_hash') == message_hash for msg in message_log):
+            if message_hash in self._message_hashes:
                 return
             
+            # Seule l'empreinte sert à la déduplication: le contenu n'est pas conservé
             message_entry = {
-                'id': len(message_log) + 1,
                 'message_hash': message_hash,
                 'channel_id': channel_id,
-                'content': message_content,
                 'processed_at': datetime.now().isoformat()
             }
             
             message_log.append(message_entry)
+            self._message_hashes.add(message_hash)
             
             # Garder seulement les 1000 derniers messages pour éviter que le fichier devienne trop gros
             if len(message_log) > 1000:
-                message_log = message_log[-1000:]
+                self._set_message_log(message_log[-1000:])
             
-            self._save_yaml(self.message_log_file, message_log)
+            self._save_yaml(self.message_log_file, self._message_log)
         except Exception as e:
-            print(f"❌ Erreur mark_message_processed: {e}")
+            logger.error("❌ Erreur mark_message_processed: %s", e)
+    
+    def compact_message_log(self) -> int:
+        """Réécrit le journal sous sa forme minimale, retourne le nombre d'octets récupérés"""
+        message_log = self._get_message_log()
+        if all(set(entry) <= set(MESSAGE_LOG_FIELDS) for entry in message_log):
+            return 0
+        size_before = self.message_log_file.stat().st_size if self.message_log_file.exists() else 0
+        self._set_message_log([{field: entry[field] for field in MESSAGE_LOG_FIELDS if field in entry}
+                               for entry in message_log])
+        self._save_yaml(self.message_log_file, self._message_log)
+        return size_before - self.message_log_file.stat().st_size
+    
+    def rotate_predictions_archive(self, max_bytes: int = 1024 * 1024) -> int:
+        """
+        Compresse l'archive des prédictions dans data/archives/ lorsqu'elle dépasse max_bytes
+        Retourne le nombre d'octets récupérés.
+        """
+        if not self.predictions_archive_file.exists():
+            return 0
+        size_before = self.predictions_archive_file.stat().st_size
+        if size_before <= max_bytes:
+            return 0
+        self.archives_dir.mkdir(exist_ok=True)
+        target = self.archives_dir / f"predictions_archive_{datetime.now().strftime('%Y%m%d_%H%M%S')}.yaml.gz"
+        with open(self.predictions_archive_file, 'rb') as f:
+            compressed = gzip.compress(f.read(), compresslevel=6)
+        with open(target, 'wb') as f:
+            f.write(compressed)
+        self.predictions_archive_file.unlink()
+        logger.info("📦 Archive des prédictions compressée: %s", target.name)
+        return size_before - len(compressed)
     
     def get_stats(self) -> Dict[str, Any]:
         """Retourne les statistiques du bot"""
         try:
-            # Statistiques des prédictions manuelles
-            predictions = self._load_yaml(self.predictions_file)
-            if not isinstance(predictions, list):
-                predictions = []
+            # Statistiques des prédictions manuelles (index par statut + compteurs d'archive)
+            predictions = self._get_predictions()
+            success = sum(len(numbers) for status, numbers in self._status_index.items()
+                          if str(status).startswith('✅'))
             
             manual_stats = {
-                'total': len(predictions),
-                'success': len([p for p in predictions if p.get('status', '').startswith('✅')]),
-                'pending': len([p for p in predictions if p.get('status') == '⌛'])
+                'total': len(predictions) + self._archived['total'],
+                'success': success + self._archived['success'],
+                'pending': len(self._status_index.get('⌛', ()))
             }
             
             # Statistiques des prédictions automatiques
-            today = date.today().isoformat()
-            auto_predictions = self._load_yaml(self.auto_predictions_file)
-            
-            if not isinstance(auto_predictions, dict):
-                auto_predictions = {}
-            
-            today_schedule = auto_predictions.get(today, {})
+            today_schedule = self.load_auto_prediction_schedule()
             
             auto_stats = {
                 'total': len(today_schedule),
@@ -301,26 +443,31 @@ class YAMLDataManager:
                 'auto': auto_stats
             }
         except Exception as e:
-            print(f"❌ Erreur get_stats: {e}")
+            logger.error("❌ Erreur get_stats: %s", e)
             return {'manual': {}, 'auto': {}}
     
-    def cleanup_old_data(self, days_to_keep: int = 30):
-        """Nettoie les anciennes données (optionnel)"""
+    def cleanup_old_data(self, days_to_keep: int = 30) -> int:
+        """Nettoie les anciennes données, retourne le nombre d'octets libérés"""
+        reclaimed = 0
         try:
             cutoff_date = datetime.now().date() - timedelta(days=days_to_keep)
             
-            # Nettoyer les anciennes prédictions automatiques
-            auto_predictions = self._load_yaml(self.auto_predictions_file)
-            if isinstance(auto_predictions, dict):
-                cleaned = {
-                    date_str: data for date_str, data in auto_predictions.items()
-                    if datetime.fromisoformat(date_str).date() >= cutoff_date
-                }
-                if len(cleaned) != len(auto_predictions):
-                    self._save_yaml(self.auto_predictions_file, cleaned)
-                    print(f"🧹 Nettoyage: {len(auto_predictions) - len(cleaned)} anciennes planifications supprimées")
+            # Nettoyer les anciennes prédictions automatiques: suppression des fichiers de jours entiers
+            removed = 0
+            for shard in self.auto_predictions_dir.glob("*.yaml"):
+                try:
+                    shard_date = date.fromisoformat(shard.stem)
+                except ValueError:
+                    continue
+                if shard_date < cutoff_date:
+                    reclaimed += shard.stat().st_size
+                    shard.unlink()
+                    removed += 1
+            if removed:
+                logger.info("🧹 Nettoyage: %s anciennes planifications supprimées", removed)
         except Exception as e:
-            print(f"❌ Erreur cleanup_old_data: {e}")
+            logger.error("❌ Erreur cleanup_old_data: %s", e)
+        return reclaimed
 
 
 # Instance globale
@@ -333,7 +480,7 @@ def init_yaml_manager():
         yaml_manager = YAMLDataManager()
         return yaml_manager
     except Exception as e:
-        print(f"❌ Erreur initialisation gestionnaire YAML: {e}")
+        logger.error("❌ Erreur initialisation gestionnaire YAML: %s", e)
         return None
 
 # Alias pour compatibilité avec l'ancien code